@@ -0,0 +1,22 @@
+# ==============================================================================
+# File: benchmarks/_stats.py
+# Mô tả: Hàm thống kê dùng chung cho các script benchmark.
+# ==============================================================================
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Phân vị q (0-100) theo phương pháp nearest-rank."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list[float], scale: float = 1e6, unit: str = "µs") -> str:
+    """Tóm tắt p50/p99/max của các mẫu thời gian (giây) theo đơn vị cho trước."""
+    return (
+        f"p50={percentile(samples, 50) * scale:.1f}{unit} "
+        f"p99={percentile(samples, 99) * scale:.1f}{unit} "
+        f"max={max(samples, default=0.0) * scale:.1f}{unit}"
+    )
@@ -0,0 +1,94 @@
+# ==============================================================================
+# File: benchmarks/bench_event_log.py
+# Mô tả: Đo nhật ký sự kiện: tốc độ ghi qua GameUseCase, quét header, quét và
+# giải mã toàn bộ qua mmap, dựng chỉ mục START và phát lại ván; đồng thời kiểm
+# tra ván phát lại khớp với ván đã chơi.
+#
+# Chạy: python -m benchmarks.bench_event_log --rounds 200000
+# ==============================================================================
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from blackjack.adapters.event_log import EventLogReader, FileGameEventLog
+from blackjack.adapters.memory_repository import MemoryGameRepository
+from blackjack.entities import Game, GameState
+from blackjack.use_cases import GameUseCase
+
+
+def hands(game: Game) -> tuple:
+    return (
+        bytes(game.dealer.hand.codes),
+        *(bytes(game.players[pid].hand.codes) for pid in game.player_order),
+    )
+
+
+def write_log(path: str, rounds: int, channels: int, players: int) -> dict:
+    """Chơi `rounds` ván xoay vòng qua các kênh; trả về tay bài ván cuối mỗi kênh."""
+    log = FileGameEventLog(path, fsync_on_close=False)
+    use_case = GameUseCase(MemoryGameRepository(), events=log)
+    rng = random.Random(1)
+    samples = {}
+    for n in range(rounds):
+        channel_id = 1 + n % channels
+        for i in range(players):
+            use_case.join_game(channel_id, 1000 + i, f"Người chơi {i}")
+        game = use_case.start_new_game(
+            channel_id, {1000 + i: f"Người chơi {i}" for i in range(players)}
+        )
+        while game.state == GameState.PLAYERS_TURN:
+            player = game.get_current_player()
+            action = "hit" if player.hand.value < rng.choice((15, 16, 17)) else "stand"
+            use_case.player_action(channel_id, player.id, action)
+        samples[channel_id] = hands(game)
+        use_case.end_game(channel_id)
+    log.close()
+    return samples
+
+
+def timed(label: str, fn, count: int):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.3f}s  {count / elapsed / 1e6:7.2f}M sự kiện/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nhật ký sự kiện.")
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--channels", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.log")
+        started = time.perf_counter()
+        samples = write_log(path, args.rounds, args.channels, args.players)
+        write_time = time.perf_counter() - started
+
+        with EventLogReader(path) as reader:
+            count = sum(1 for _ in reader.headers())
+            print(
+                f"{count} sự kiện, {reader.size / 1e6:.1f} MB; ghi (kèm chơi) "
+                f"{write_time:.2f}s = {count / write_time / 1e3:.0f}K sự kiện/s"
+            )
+            timed("quét header", lambda: sum(1 for _ in reader.headers()), count)
+            timed("quét + giải mã", lambda: sum(1 for _ in reader), count)
+            timed("dựng chỉ mục START", lambda: reader.start_offsets(1), count)
+
+            started = time.perf_counter()
+            for channel_id, expected in samples.items():
+                if hands(reader.replay_round(channel_id)) != expected:
+                    raise SystemExit(f"Phát lại kênh {channel_id} không khớp!")
+            elapsed = time.perf_counter() - started
+            print(
+                f"phát lại ván cuối của {len(samples)} kênh: "
+                f"{elapsed / len(samples) * 1e3:.2f}ms/kênh (khớp)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# ==============================================================================
+# File: benchmarks/bench_hint.py
+# Mô tả: Đo độ trễ của /hint (GameUseCase.get_hint) khi có hàng nghìn yêu cầu
+# đồng thời trên cùng một event loop.
+#
+# Chạy: python -m benchmarks.bench_hint [số_kênh] [số_yêu_cầu_đồng_thời]
+# ==============================================================================
+import asyncio
+import sys
+import time
+
+from blackjack.adapters.memory_repository import MemoryGameRepository
+from blackjack.entities import GameState
+from blackjack.strategy import StrategyTable
+from blackjack.use_cases import GameUseCase
+
+from ._stats import summarize
+
+
+def setup(num_channels: int) -> tuple[GameUseCase, list[tuple[int, int]]]:
+    started = time.perf_counter()
+    use_case = GameUseCase(MemoryGameRepository(), strategy=StrategyTable.build())
+    print(f"Tính bảng chiến thuật + tạo bàn: {time.perf_counter() - started:.3f}s")
+    targets = []
+    for channel_id in range(1, num_channels + 1):
+        players = {channel_id * 10 + i: f"P{i}" for i in range(3)}
+        game = use_case.start_new_game(channel_id, players)
+        if game.state == GameState.PLAYERS_TURN:
+            targets.extend((channel_id, user_id) for user_id in players)
+    return use_case, targets
+
+
+async def run(use_case: GameUseCase, targets: list, concurrency: int, rounds: int):
+    service, end_to_end = [], []
+
+    async def client(index: int):
+        channel_id, user_id = targets[index % len(targets)]
+        for _ in range(rounds):
+            submitted = time.perf_counter()
+            await asyncio.sleep(0)  # nhường event loop như một lệnh Discord thật
+            started = time.perf_counter()
+            use_case.get_hint(channel_id, user_id)
+            done = time.perf_counter()
+            service.append(done - started)
+            end_to_end.append(done - submitted)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = concurrency * rounds
+    print(f"{total:,} gợi ý, {concurrency:,} client: {total / elapsed:,.0f} gợi ý/s")
+    print(f"  tra bảng:      {summarize(service)}")
+    print(f"  qua event loop: {summarize(end_to_end, 1e3, 'ms')}")
+
+
+if __name__ == "__main__":
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    use_case, targets = setup(channels)
+    asyncio.run(run(use_case, targets, concurrency, rounds=20))
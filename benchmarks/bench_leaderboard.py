@@ -0,0 +1,86 @@
+# ==============================================================================
+# File: benchmarks/bench_leaderboard.py
+# Mô tả: Đo bảng xếp hạng (RankedSet) với một triệu người chơi: dựng từ dữ liệu
+# đã lưu, cập nhật điểm, top-N và "hạng của tôi", so với cách ngây thơ (sắp xếp
+# lại / đếm toàn bộ mỗi lần hỏi) và kiểm tra hai cách cho cùng kết quả.
+#
+# Chạy: python -m benchmarks.bench_leaderboard --users 1000000
+# ==============================================================================
+import argparse
+import random
+import time
+
+from blackjack.leaderboard import RankedSet
+
+
+def naive_top(scores: dict, n: int) -> list[tuple[int, int]]:
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+def naive_rank(scores: dict, member: int) -> int:
+    score = scores[member]
+    return sum(1 for m, s in scores.items() if s > score or (s == score and m < member))
+
+
+def per_op(label: str, elapsed: float, count: int):
+    print(f"{label:<30} {elapsed / count * 1e6:10.2f}µs/lần  ({count} lần)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bảng xếp hạng.")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--naive-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    scores = {user_id: rng.randrange(-50_000, 50_000) for user_id in range(args.users)}
+
+    started = time.perf_counter()
+    ranked = RankedSet(scores.items(), seed=1)
+    print(f"dựng {args.users} người chơi: {time.perf_counter() - started:.2f}s")
+
+    # Cập nhật như sau mỗi ván: điểm đổi một lượng nhỏ
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        user_id = rng.randrange(args.users)
+        scores[user_id] += rng.randrange(-100, 151)
+        ranked.update(user_id, scores[user_id])
+    per_op("cập nhật điểm", time.perf_counter() - started, args.updates)
+
+    started = time.perf_counter()
+    for _ in range(args.queries):
+        ranked.range(0, 10)
+    per_op("top 10", time.perf_counter() - started, args.queries)
+
+    members = [rng.randrange(args.users) for _ in range(args.queries)]
+    started = time.perf_counter()
+    for user_id in members:
+        ranked.rank(user_id)
+    per_op("hạng của tôi", time.perf_counter() - started, args.queries)
+
+    started = time.perf_counter()
+    for offset in range(0, args.queries * 10, 10):
+        ranked.range(offset % args.users, offset % args.users + 10)
+    per_op("trang 10 người bất kỳ", time.perf_counter() - started, args.queries)
+
+    # Cách ngây thơ: O(n log n) / O(n) mỗi lần hỏi
+    started = time.perf_counter()
+    for _ in range(args.naive_queries):
+        expected_top = naive_top(scores, 10)
+    per_op("top 10 (sắp xếp lại)", time.perf_counter() - started, args.naive_queries)
+
+    started = time.perf_counter()
+    for user_id in members[: args.naive_queries]:
+        if naive_rank(scores, user_id) != ranked.rank(user_id):
+            raise SystemExit(f"Hạng của {user_id} không khớp!")
+    per_op("hạng của tôi (đếm)", time.perf_counter() - started, args.naive_queries)
+
+    if ranked.range(0, 10) != expected_top:
+        raise SystemExit("Top 10 không khớp!")
+    print("kết quả khớp với cách ngây thơ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# ==============================================================================
+# File: benchmarks/bench_presenter.py
+# Mô tả: Đo thời gian vẽ embed của DiscordPresenter cho bàn 7 và 25 người chơi,
+# so sánh khi không dùng lại cache (presenter mới mỗi lần vẽ) và khi có cache.
+#
+# Chạy: python -m benchmarks.bench_presenter
+# ==============================================================================
+import time
+
+from blackjack.adapters.discord_presenter import DiscordPresenter
+from blackjack.entities import _HAND_VERSIONS, Game, GameState
+
+
+def play_round(num_players: int) -> tuple[Game, int]:
+    """Chơi một ván, trả về các trạng thái cần vẽ sau mỗi hành động."""
+    game = Game(channel_id=1)
+    for i in range(num_players):
+        game.add_player(1000 + i, f"Người chơi {i}")
+    game.start_game()
+    actions = 0
+    while game.state == GameState.PLAYERS_TURN:
+        player = game.get_current_player()
+        if player.hand.value < 16:
+            game.player_hit(player.id)
+        else:
+            game.player_stand(player.id)
+        actions += 1
+    return game, actions
+
+
+def render_all(presenter: DiscordPresenter, game: Game):
+    presenter.create_channel_embed(game)
+    presenter.create_game_embed(game)
+    presenter.create_final_result_embed(game)
+
+
+def bench(num_players: int, repeats: int = 300):
+    game, _ = play_round(num_players)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        render_all(DiscordPresenter(), game)
+    cold = (time.perf_counter() - started) / repeats
+
+    presenter = DiscordPresenter()
+    render_all(presenter, game)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        render_all(presenter, game)
+    warm = (time.perf_counter() - started) / repeats
+
+    # Giữa ván: chỉ một tay bài đổi giữa hai lần vẽ
+    player = next(iter(game.players.values()))
+    started = time.perf_counter()
+    for _ in range(repeats):
+        player.hand.version = next(_HAND_VERSIONS)
+        render_all(presenter, game)
+    one_changed = (time.perf_counter() - started) / repeats
+
+    print(
+        f"{num_players:>2} người chơi: không cache {cold * 1e6:7.1f}µs"
+        f" | cache, không đổi {warm * 1e6:7.1f}µs"
+        f" | cache, đổi 1 tay {one_changed * 1e6:7.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    for players in (7, 25):
+        bench(players)
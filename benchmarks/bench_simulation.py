@@ -0,0 +1,58 @@
+# ==============================================================================
+# File: benchmarks/bench_simulation.py
+# Mô tả: Đối chiếu từng ván của bộ mô phỏng vector với lớp Game trên cùng các
+# shoe có seed, sau đó so sánh tốc độ (ván/giây) của hai cách.
+#
+# Chạy: python -m benchmarks.bench_simulation
+# ==============================================================================
+import time
+
+import numpy as np
+
+from blackjack.entities import GameResult
+from blackjack.simulation import (
+    make_shoes,
+    simulate_shoes,
+    simulate_shoes_rounds,
+    simulate_shoes_scalar,
+)
+
+
+def check_parity(num_rounds: int, num_players: int, stand_on: int, seed: int):
+    """So từng ván (cùng thứ tự bài) giữa bản vector và lớp Game."""
+    shoes = make_shoes(num_rounds, num_players, np.random.default_rng(seed))
+    vector = simulate_shoes_rounds(shoes, num_players, stand_on)
+    scalar = simulate_shoes_scalar(shoes, num_players, stand_on)
+    for index, (row, outcomes) in enumerate(zip(vector, scalar)):
+        got = [GameResult(value) for value in row.tolist()]
+        if got != outcomes:
+            # Không dùng assert để vẫn kiểm tra khi chạy với python -O
+            raise AssertionError(
+                f"Ván {index} lệch (seed={seed}): vector {got}, Game {outcomes}"
+            )
+    counts = simulate_shoes(shoes, num_players, stand_on).counts
+    print(f"parity ok: {num_players} người chơi, stand_on={stand_on}, {counts}")
+
+
+def throughput(num_rounds: int, num_players: int):
+    shoes = make_shoes(num_rounds, num_players, np.random.default_rng(0))
+
+    started = time.perf_counter()
+    simulate_shoes_scalar(shoes, num_players)
+    scalar = num_rounds / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    simulate_shoes(shoes, num_players)
+    vector = num_rounds / (time.perf_counter() - started)
+
+    print(
+        f"{num_players} người chơi: scalar {scalar:,.0f} ván/s, "
+        f"vector {vector:,.0f} ván/s (x{vector / scalar:.0f})"
+    )
+
+
+if __name__ == "__main__":
+    for players, stand_on, seed in [(1, 17, 1), (1, 12, 2), (3, 15, 3), (7, 17, 4)]:
+        check_parity(5_000, players, stand_on, seed)
+    for players in (1, 7):
+        throughput(50_000, players)
@@ -0,0 +1,115 @@
+# ==============================================================================
+# File: benchmarks/bench_snapshot.py
+# Mô tả: Kiểm tra mã hóa/giải mã snapshot Game (round-trip) và so sánh kích
+# thước, thời gian với pickle và JSON cho bàn 1, 7 và 50 người chơi.
+#
+# Chạy: python -m benchmarks.bench_snapshot
+# ==============================================================================
+import json
+import pickle
+import timeit
+
+from blackjack.entities import Game, GameState, Hand, Player
+from blackjack.snapshot import decode_game, encode_game
+
+
+def make_game(num_players: int, finished: bool) -> Game:
+    game = Game(channel_id=123456789012345678)
+    for i in range(num_players):
+        game.add_player(100000000000000000 + i, f"Người chơi {i}")
+    game.start_game()
+    while game.state == GameState.PLAYERS_TURN:
+        player = game.get_current_player()
+        if finished or player is not game.players[game.player_order[-1]]:
+            if player.hand.value < 16:
+                game.player_hit(player.id)
+            else:
+                game.player_stand(player.id)
+        else:
+            break
+    return game
+
+
+def game_to_json(game: Game) -> str:
+    def hand(h: Hand) -> list[str]:
+        return [str(card) for card in h.cards]
+
+    def player(p: Player) -> dict:
+        return {
+            "id": p.id,
+            "name": p.name,
+            "hand": hand(p.hand),
+            "stand": p.is_standing,
+        }
+
+    return json.dumps(
+        {
+            "channel_id": game.channel_id,
+            "state": game.state.value,
+            "current_player_index": game.current_player_index,
+            "deck": list(game.deck.cards),
+            "dealer": hand(game.dealer.hand),
+            "players": [player(p) for p in game.players.values()],
+            "results": {str(k): v.value for k, v in game.results.items()},
+            "player_order": game.player_order,
+        },
+        ensure_ascii=False,
+    )
+
+
+def game_from_json(data: str) -> dict:
+    # Chỉ parse về dict, chưa dựng lại Game nên thời gian decode là cận dưới.
+    return json.loads(data)
+
+
+def assert_same(a: Game, b: Game):
+    assert a.channel_id == b.channel_id
+    assert a.state == b.state
+    assert a.current_player_index == b.current_player_index
+    assert a.player_order == b.player_order
+    assert a.results == b.results
+    assert a.deck.cards == b.deck.cards
+    assert (a.deck.num_decks, a.deck.cut_card) == (b.deck.num_decks, b.deck.cut_card)
+    for pa, pb in zip([a.dealer, *a.players.values()], [b.dealer, *b.players.values()]):
+        assert (pa.id, pa.name, pa.is_standing) == (pb.id, pb.name, pb.is_standing)
+        assert pa.hand.codes == pb.hand.codes
+        assert (pa.hand.value, pa.hand.aces) == (pb.hand.value, pb.hand.aces)
+
+
+def check_round_trip():
+    for players in (1, 2, 7, 50):
+        for finished in (False, True):
+            game = make_game(players, finished)
+            assert_same(game, decode_game(encode_game(game)))
+    for bad in (b"", b"XYZ\x01", encode_game(make_game(3, True))[:-1]):
+        try:
+            decode_game(bad)
+        except ValueError:
+            continue
+        raise AssertionError("decode_game phải báo lỗi với dữ liệu hỏng")
+    print("round-trip ok")
+
+
+def bench(num_players: int, number: int = 2000):
+    game = make_game(num_players, finished=True)
+    codecs = {
+        "snapshot": (encode_game, decode_game),
+        "pickle": (pickle.dumps, pickle.loads),
+        "json": (game_to_json, game_from_json),
+    }
+    print(f"\n{num_players} người chơi:")
+    for name, (encode, decode) in codecs.items():
+        blob = encode(game)
+        size = len(blob.encode() if isinstance(blob, str) else blob)
+        enc = timeit.timeit(lambda: encode(game), number=number) / number
+        dec = timeit.timeit(lambda: decode(blob), number=number) / number
+        print(
+            f"  {name:<9} {size:>7,} bytes  encode {enc * 1e6:8.1f}µs"
+            f"  decode {dec * 1e6:8.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    check_round_trip()
+    for players in (1, 7, 50):
+        bench(players)
@@ -0,0 +1,79 @@
+# ==============================================================================
+# File: benchmarks/bench_timers.py
+# Mô tả: So sánh chi phí đặt/hủy timeout lượt chơi giữa cách cũ (mỗi lần đổi
+# lượt tạo một asyncio.Task sleep rồi hủy task trước) và TimerWheel.
+#
+# Chạy: python -m benchmarks.bench_timers [số_kênh] [số_lần_đổi_lượt]
+# ==============================================================================
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from blackjack.adapters.timer_wheel import TimerWheel
+
+TURN_TIMEOUT = 60
+
+
+async def on_timeout(channel_id: int):
+    pass
+
+
+async def _sleep_then(channel_id: int):
+    await asyncio.sleep(TURN_TIMEOUT)
+    await on_timeout(channel_id)
+
+
+async def with_tasks(channels: int, turns: int) -> float:
+    timeouts = {}
+    started = time.perf_counter()
+    for _ in range(turns):
+        for channel_id in range(channels):
+            old = timeouts.pop(channel_id, None)
+            if old:
+                old.cancel()
+            timeouts[channel_id] = asyncio.create_task(_sleep_then(channel_id))
+        await asyncio.sleep(0)  # để các task được khởi chạy/hủy như thực tế
+    elapsed = time.perf_counter() - started
+    for task in timeouts.values():
+        task.cancel()
+    await asyncio.sleep(0)
+    return elapsed
+
+
+async def with_wheel(channels: int, turns: int) -> float:
+    wheel = TimerWheel(tick=1.0)
+    timeouts = {}
+    started = time.perf_counter()
+    for _ in range(turns):
+        for channel_id in range(channels):
+            old = timeouts.pop(channel_id, None)
+            if old:
+                old.cancel()
+            timeouts[channel_id] = wheel.schedule(TURN_TIMEOUT, on_timeout, channel_id)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    wheel.close()
+    return elapsed
+
+
+def measure(name: str, bench, channels: int, turns: int):
+    elapsed = asyncio.run(bench(channels, turns))
+    # Đo bộ nhớ ở một lần chạy riêng vì tracemalloc làm chậm đáng kể.
+    tracemalloc.start()
+    asyncio.run(bench(channels, turns))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ops = channels * turns
+    print(
+        f"{name:<14} {ops / elapsed:>12,.0f} lần đặt+hủy/s"
+        f"  ({elapsed * 1e6 / ops:.2f}µs/lần, đỉnh bộ nhớ {peak / 1e6:.1f}MB)"
+    )
+
+
+if __name__ == "__main__":
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"{channels:,} kênh x {turns} lần đổi lượt")
+    measure("asyncio.Task", with_tasks, channels, turns)
+    measure("TimerWheel", with_wheel, channels, turns)
@@ -0,0 +1,51 @@
+# ==============================================================================
+# File: benchmarks/bench_tournament.py
+# Mô tả: Đo khả năng mở rộng của giải đấu chiến thuật theo số process (1, 2, 4...
+# tới số CPU) và kiểm tra mọi số process cho cùng kết quả với cùng seed.
+#
+# Chạy: python -m benchmarks.bench_tournament --rounds 200000
+# ==============================================================================
+import argparse
+import os
+import time
+
+from blackjack.tournament import run_tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark giải đấu chiến thuật.")
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--strategies", nargs="+", default=["basic", "stand:17"])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    baseline = expected = None
+    for workers in counts:
+        started = time.perf_counter()
+        results, _ = run_tournament(
+            args.strategies, args.rounds, seed=args.seed, workers=workers
+        )
+        elapsed = time.perf_counter() - started
+        rate = args.rounds * len(results) / elapsed
+        baseline = baseline or rate
+        print(
+            f"{workers:>3} process: {elapsed:7.2f}s  {rate:10,.0f} ván/s"
+            f"  x{rate / baseline:.2f}"
+        )
+        summary = [(r.name, r.counts, dict(r.payouts)) for r in results]
+        if expected is None:
+            expected = summary
+        elif summary != expected:
+            raise SystemExit(f"Kết quả với {workers} process khác với 1 process!")
+    print("kết quả giống nhau với mọi số process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# ==============================================================================
+# File: benchmarks/loadtest.py
+# Mô tả: Kiểm thử tải không cần kết nối Discord. Dùng các lớp giả lập cho
+# commands.Context, discord.Interaction và kênh để chạy các lệnh của
+# BlackjackCog (blackjack, join, start, hit, stand, end) trên hàng nghìn kênh
+# đồng thời; báo cáo thông lượng, phân vị độ trễ từng lệnh, độ trễ event loop
+# và bộ nhớ.
+#
+# Chạy: python -m benchmarks.loadtest --channels 2000 --players 4 --rounds 3
+#       (thêm --shards 4 để chạy logic game trong 4 process worker)
+# ==============================================================================
+import argparse
+import asyncio
+import gc
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from blackjack.adapters.discord_presenter import DiscordPresenter
+from blackjack.adapters.memory_repository import MemoryGameRepository
+from blackjack.adapters.outbound import OutboundDispatcher
+from blackjack.adapters.sharding import ShardedGameUseCase
+from blackjack.entities import GameState
+from blackjack.shoe import ShoeManager
+from blackjack.strategy import StrategyTable
+from blackjack.use_cases import GameUseCase
+from blackjack_cog import BlackjackCog
+
+from ._stats import percentile
+
+
+# --- Giả lập Discord ---
+class FakePermissions:
+    def __init__(self, manage_channels: bool):
+        self.manage_channels = manage_channels
+
+
+class FakeUser:
+    def __init__(self, user_id: int, admin: bool = False):
+        self.id = user_id
+        self.display_name = f"Người chơi {user_id}"
+        self.mention = f"<@{user_id}>"
+        self.guild_permissions = FakePermissions(admin)
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel"):
+        self.channel = channel
+
+    async def edit(self, **kwargs):
+        await self.channel.network()
+        self.channel.edits += 1
+
+
+class FakeChannel:
+    """Kênh giả: đếm số tin gửi/sửa và mô phỏng độ trễ mạng."""
+
+    def __init__(self, channel_id: int, latency: float):
+        self.id = channel_id
+        self.latency = latency
+        self.sends = 0
+        self.edits = 0
+
+    async def network(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send(self, *args, **kwargs):
+        await self.network()
+        self.sends += 1
+        return FakeMessage(self)
+
+
+class FakeResponse:
+    def __init__(self, channel: FakeChannel):
+        self.channel = channel
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, *args, **kwargs):
+        self._done = True
+        await self.channel.send(*args, **kwargs)
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, channel: FakeChannel):
+        self.channel = channel
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, channel: FakeChannel, user: FakeUser):
+        self.channel = channel
+        self.user = user
+        self.response = FakeResponse(channel)
+        self.followup = FakeFollowup(channel)
+
+
+class FakeContext:
+    """Thay cho commands.Context; có interaction nếu mô phỏng slash command."""
+
+    def __init__(self, channel: FakeChannel, user: FakeUser, interaction=None):
+        self.channel = channel
+        self.author = user
+        self.interaction = interaction
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+
+class FakeBot:
+    async def get_context(self, interaction: FakeInteraction) -> FakeContext:
+        return FakeContext(interaction.channel, interaction.user, interaction)
+
+
+# --- Kịch bản ---
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.shard_dir = None
+        if args.shards:
+            self.shard_dir = tempfile.TemporaryDirectory()
+            use_case = ShardedGameUseCase(
+                args.shards,
+                self.shard_dir.name,
+                num_decks=args.decks,
+                penetration=0.75,
+                strategy=StrategyTable.for_decks(args.decks),
+            )
+        else:
+            use_case = GameUseCase(
+                MemoryGameRepository(),
+                strategy=StrategyTable.for_decks(args.decks),
+                shoes=ShoeManager(num_decks=args.decks, penetration=0.75),
+            )
+        self.cog = BlackjackCog(FakeBot(), use_case, DiscordPresenter())
+        for command in self.cog.get_commands():
+            command.cog = self.cog
+        if not args.discord_limits:
+            # Mặc định đo chi phí phía bot, không bị giới hạn tốc độ của Discord
+            self.cog.outbound.close()
+            self.cog.outbound = OutboundDispatcher(
+                global_rate=1e9, channel_rate=1e9, channel_burst=1_000_000
+            )
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors = 0
+        self.lag: list[float] = []
+        self.channels: list[FakeChannel] = []
+
+    async def command(self, name: str, channel: FakeChannel, user: FakeUser):
+        """Gọi một lệnh (prefix hoặc slash) và ghi lại độ trễ."""
+        slash = self.rng.random() < self.args.slash_ratio
+        started = time.perf_counter()
+        try:
+            if slash:
+                interaction = FakeInteraction(channel, user)
+                handler = getattr(self.cog, f"slash_{name}")
+                await handler.callback(self.cog, interaction)
+            else:
+                name = "end_game_command" if name == "end" else name
+                await getattr(self.cog, name)(FakeContext(channel, user))
+        except Exception:
+            self.errors += 1
+        self.latencies[name.replace("_game_command", "")].append(
+            time.perf_counter() - started
+        )
+
+    async def play_channel(self, channel_id: int):
+        args = self.args
+        channel = FakeChannel(channel_id, args.send_latency)
+        self.channels.append(channel)
+        repo = self.cog.use_case.repo
+        base = channel_id * 1000
+        starter = FakeUser(base, admin=True)
+        users = [starter] + [FakeUser(base + i) for i in range(1, args.players)]
+        by_id = {user.id: user for user in users}
+
+        for _ in range(args.rounds):
+            await self.command("blackjack", channel, starter)
+            for user in users[1:]:
+                await self.command("join", channel, user)
+            await self.command("start", channel, starter)
+            abort = self.rng.random() < args.end_rate
+            while True:
+                game = repo.get_game(channel_id)
+                if not game or game.state != GameState.PLAYERS_TURN:
+                    break
+                if abort:
+                    await self.command("end", channel, starter)
+                    break
+                player = game.get_current_player()
+                action = "hit" if player.hand.value < args.stand_on else "stand"
+                await self.command(action, channel, by_id[player.id])
+            if args.think_time:
+                await asyncio.sleep(self.rng.uniform(0, args.think_time))
+
+    async def monitor_lag(self, interval: float = 0.01):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.lag.append(loop.time() - started - interval)
+
+    async def drain(self):
+        """Chờ các tin nhắn còn trong hàng đợi gửi đi."""
+        while len(self.cog.outbound):
+            await asyncio.sleep(0.01)
+
+    async def run(self):
+        args = self.args
+        use_case = self.cog.use_case
+        if self.shard_dir:
+            await use_case.start()
+        monitor = asyncio.create_task(self.monitor_lag())
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(self.play_channel(cid) for cid in range(1, args.channels + 1))
+        )
+        elapsed = time.perf_counter() - started
+        await self.drain()
+        drained = time.perf_counter() - started
+        monitor.cancel()
+        self.cog.cog_unload()
+        if self.shard_dir:
+            use_case.close()
+            self.shard_dir.cleanup()
+        else:
+            use_case.shoes.close()
+        return elapsed, drained
+
+
+def report(test: LoadTest, elapsed: float, drained: float, rss_before: int):
+    args = test.args
+    total = sum(len(samples) for samples in test.latencies.values())
+    sends = sum(channel.sends for channel in test.channels)
+    edits = sum(channel.edits for channel in test.channels)
+    print(
+        f"{args.channels:,} kênh x {args.rounds} ván x {args.players} người chơi"
+        f" (slash {args.slash_ratio:.0%}, độ trễ gửi {args.send_latency * 1e3:.0f}ms)"
+    )
+    print(
+        f"Lệnh: {total:,} trong {elapsed:.2f}s = {total / elapsed:,.0f} lệnh/s"
+        f" | lỗi: {test.errors}"
+    )
+    print(f"Tin gửi: {sends:,} (+{edits:,} lần sửa), gửi xong sau {drained:.2f}s")
+    print(f"{'lệnh':<10}{'số lần':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, samples in sorted(test.latencies.items()):
+        row = [percentile(samples, q) * 1e3 for q in (50, 95, 99)]
+        row.append(max(samples) * 1e3)
+        cells = "".join(f"{value:>8.2f}ms" for value in row)
+        print(f"{name:<10}{len(samples):>10,}{cells}")
+    lag = [value * 1e3 for value in test.lag] or [0.0]
+    print(
+        f"Độ trễ event loop: p50={percentile(lag, 50):.2f}ms"
+        f" p99={percentile(lag, 99):.2f}ms max={max(lag):.2f}ms"
+    )
+    # ru_maxrss tính bằng KiB trên Linux
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"Bộ nhớ: RSS đỉnh {rss_after / 1024:.1f}MiB"
+        f" (+{(rss_after - rss_before) / 1024:.1f}MiB khi chạy)"
+    )
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        print(
+            f"tracemalloc: hiện tại {current / 2**20:.1f}MiB, đỉnh {peak / 2**20:.1f}MiB"
+            f" (~{peak / args.channels / 1024:.1f}KiB mỗi kênh)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kiểm thử tải BlackjackCog.")
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--stand-on", type=int, default=17)
+    parser.add_argument("--slash-ratio", type=float, default=0.5)
+    parser.add_argument("--end-rate", type=float, default=0.05)
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--send-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--discord-limits",
+        action="store_true",
+        help="giữ giới hạn tốc độ gửi như khi chạy thật",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=0, help="số process worker chạy logic game"
+    )
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    test = LoadTest(args)
+    elapsed, drained = asyncio.run(test.run())
+    report(test, elapsed, drained, rss_before)
+
+
+if __name__ == "__main__":
+    main()
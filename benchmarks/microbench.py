@@ -0,0 +1,283 @@
+# ==============================================================================
+# File: benchmarks/microbench.py
+# Mô tả: Bộ microbenchmark cho các đường nóng của entities và presenter. Ghi kết
+# quả ra JSON để so sánh giữa các commit và báo các trường hợp chậm đi.
+#
+# Chạy:
+#   python -m benchmarks.microbench --output base.json
+#   python -m benchmarks.microbench --compare base.json [--threshold 0.10]
+#   python -m benchmarks.microbench --filter presenter
+#
+# Chỉ so sánh kết quả đo trên cùng một máy và cùng phiên bản Python.
+# ==============================================================================
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Optional
+
+from blackjack.adapters.discord_presenter import DiscordPresenter
+from blackjack.entities import Deck, Game, GameState, Hand
+from blackjack.strategy import HIT
+
+SEED = 20240601
+
+
+class Case:
+    """Một phép đo: prepare() tạo trạng thái (không tính giờ), run(state) được đo."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Any], Any],
+        prepare: Optional[Callable[[], Any]] = None,
+        ops: int = 1,
+    ):
+        self.name = name
+        self.run = run
+        self.prepare = prepare or (lambda: None)
+        self.ops = ops  # số thao tác trong một lần run, để quy ra thời gian/thao tác
+
+
+def _game(num_players: int, started: bool = True) -> Game:
+    game = Game(channel_id=1, deck=Deck(num_players // 4 + 1))
+    for i in range(num_players):
+        game.add_player(1000 + i, f"Người chơi {i}")
+    if started:
+        game.start_game()
+    return game
+
+
+def _mid_turn(num_players: int) -> Game:
+    """Ván đang ở lượt người chơi đầu tiên, không ai dằn bài."""
+    game = _game(num_players)
+    game.state = GameState.PLAYERS_TURN
+    game.current_player_index = 0
+    for player in game.players.values():
+        player.is_standing = False
+    return game
+
+
+def _finished(num_players: int) -> Game:
+    game = _game(num_players)
+    while game.state == GameState.PLAYERS_TURN:
+        game.player_stand(game.get_current_player().id)
+    return game
+
+
+def _deal_all(deck: Deck):
+    deal = deck.deal
+    for _ in range(52):
+        deal()
+
+
+def _add_cards(state):
+    hand, cards = state
+    for card in cards:
+        hand.add_card(card)
+
+
+def _presenter_cases(num_players: int) -> list[Case]:
+    cases = []
+    warm = DiscordPresenter()
+
+    def add(method: str, make_game: Callable[[], Game], call):
+        # cold: presenter mới (cache rỗng); warm: dùng lại presenter đã vẽ ván này
+        cases.append(
+            Case(
+                f"presenter.{method}[{num_players}].cold",
+                call,
+                lambda: (DiscordPresenter(), make_game()),
+            )
+        )
+
+        shared = []
+
+        def prepare_warm():
+            if not shared:
+                shared.append(make_game())
+                call((warm, shared[0]))
+            return warm, shared[0]
+
+        cases.append(
+            Case(f"presenter.{method}[{num_players}].warm", call, prepare_warm)
+        )
+
+    in_play = lambda: _game(num_players)  # noqa: E731
+    add("create_game_embed", in_play, lambda s: s[0].create_game_embed(s[1]))
+    add("create_channel_embed", in_play, lambda s: s[0].create_channel_embed(s[1]))
+    add(
+        "create_player_dm_embed",
+        in_play,
+        lambda s: s[0].create_player_dm_embed(s[1], s[1].players[1000]),
+    )
+    add(
+        "create_final_result_embed",
+        lambda: _finished(num_players),
+        lambda s: s[0].create_final_result_embed(s[1]),
+    )
+    add(
+        "create_hint_embed",
+        in_play,
+        lambda s: s[0].create_hint_embed(s[1], s[1].players[1000], HIT, -0.12),
+    )
+    add(
+        "create_waiting_embed",
+        lambda: _game(num_players, started=False),
+        lambda s: s[0].create_waiting_embed(s[1]),
+    )
+    return cases
+
+
+def build_cases() -> list[Case]:
+    cases = [
+        Case("deck.init[1]", lambda _: Deck()),
+        Case("deck.init[6]", lambda _: Deck(6)),
+        Case("deck.shuffle[6]", lambda deck: deck.shuffle(), lambda: Deck(6)),
+        Case("deck.deal", _deal_all, Deck, ops=52),
+        Case(
+            "hand.add_card",
+            _add_cards,
+            lambda: (Hand(), [Deck().deal() for _ in range(3)]),
+            ops=3,
+        ),
+    ]
+    for n in (1, 2, 7, 25, 50):
+        cases.append(
+            Case(
+                f"game.start_game[{n}]",
+                lambda game: game.start_game(),
+                lambda n=n: _game(n, started=False),
+            )
+        )
+    for n in (7, 50):
+        cases.append(
+            Case(
+                f"game._next_player_turn[{n}]",
+                lambda game: game._next_player_turn(),
+                lambda n=n: _mid_turn(n),
+            )
+        )
+        cases.append(
+            Case(
+                f"game._end_game[{n}]",
+                lambda game: game._end_game(),
+                lambda n=n: _mid_turn(n),
+            )
+        )
+    for n in (7, 25):
+        cases.extend(_presenter_cases(n))
+    return cases
+
+
+def measure(case: Case, number: int, repeat: int) -> dict:
+    """Đo `repeat` lần, mỗi lần chạy `number` trạng thái đã chuẩn bị sẵn."""
+    random.seed(SEED)
+    samples = []
+    run = case.run
+    for _ in range(repeat):
+        states = [case.prepare() for _ in range(number)]
+        gc.disable()
+        started = time.perf_counter()
+        for state in states:
+            run(state)
+        elapsed = time.perf_counter() - started
+        gc.enable()
+        samples.append(elapsed / number / case.ops)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fmt(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:8.1f}ns"
+    return f"{seconds * 1e6:8.2f}µs"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """In bảng so sánh với baseline; trả về tên các phép đo chậm hơn ngưỡng."""
+    regressions = []
+    base = baseline["results"]
+    print(f"\nSo với {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, result in results.items():
+        if name not in base:
+            print(f"  {name:<48} (mới)")
+            continue
+        ratio = result["min"] / base[name]["min"]
+        median_ratio = result["median"] / base[name]["median"]
+        flag = ""
+        # Chỉ báo chậm khi cả min và median cùng vượt ngưỡng, để bớt nhiễu máy
+        if ratio > 1 + threshold and median_ratio > 1 + threshold:
+            flag = "  << CHẬM HƠN"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  nhanh hơn"
+        print(
+            f"  {name:<48}{_fmt(base[name]['min'])} -> {_fmt(result['min'])}"
+            f"  x{ratio:5.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark entities/presenter.")
+    parser.add_argument("--filter", default="", help="chỉ chạy phép đo chứa chuỗi")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="file JSON baseline để so sánh")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = {}
+    for case in build_cases():
+        if args.filter not in case.name:
+            continue
+        result = measure(case, args.number, args.repeat)
+        results[case.name] = result
+        print(f"{case.name:<48}{_fmt(result['min'])} (median {_fmt(result['median'])})")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} phép đo chậm hơn {args.threshold:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
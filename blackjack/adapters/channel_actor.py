@@ -0,0 +1,125 @@
+# ==============================================================================
+# File: blackjack/adapters/channel_actor.py
+# Mô tả: Mô hình actor cho từng kênh. Mọi thay đổi game của một kênh được đưa
+# vào hộp thư (mailbox) của kênh đó và được một task duy nhất xử lý lần lượt,
+# nên các lệnh hit/stand/timeout/end không bao giờ chen nhau giữa các await.
+# Không có khóa toàn cục: các kênh khác nhau chạy độc lập.
+# ==============================================================================
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger("blackjack-bot.actors")
+
+# Một bước xử lý: coroutine không tham số, trả về True nếu bàn chơi cần vẽ lại.
+Step = Callable[[], Awaitable[bool]]
+RenderHook = Callable[[int, Any], Awaitable[None]]
+
+
+class _Mailbox:
+    __slots__ = ("queue", "task")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+
+class ChannelActors:
+    """Quản lý actor của các kênh: tạo khi cần, tự thu hồi khi rảnh."""
+
+    def __init__(
+        self,
+        on_render: Optional[RenderHook] = None,
+        idle_timeout: float = 60.0,
+        max_batch: int = 32,
+    ):
+        self.on_render = on_render
+        self.idle_timeout = idle_timeout
+        self.max_batch = max_batch
+        self._mailboxes: dict[int, _Mailbox] = {}
+
+    def __len__(self) -> int:
+        """Số actor đang hoạt động."""
+        return len(self._mailboxes)
+
+    def submit(self, channel_id: int, step: Step, ctx: Any = None) -> asyncio.Future:
+        """Đưa một bước vào hộp thư của kênh; trả về Future chứa kết quả của bước."""
+        mailbox = self._mailboxes.get(channel_id)
+        if mailbox is None:
+            mailbox = _Mailbox()
+            self._mailboxes[channel_id] = mailbox
+            mailbox.task = asyncio.create_task(self._consume(channel_id, mailbox))
+        future = asyncio.get_running_loop().create_future()
+        mailbox.queue.put_nowait((step, ctx, future))
+        return future
+
+    async def run(self, channel_id: int, step: Step, ctx: Any = None) -> bool:
+        """Như submit nhưng chờ bước xử lý xong (lỗi của bước được ném lại)."""
+        return await self.submit(channel_id, step, ctx)
+
+    async def _consume(self, channel_id: int, mailbox: _Mailbox):
+        queue = mailbox.queue
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # Không có await giữa kiểm tra và xóa nên không thể mất tin.
+                    del self._mailboxes[channel_id]
+                    return
+                continue
+
+            batch = self._drain(queue, first)
+            render_ctx, outcomes = await self._run_batch(batch)
+            if render_ctx is not None and self.on_render is not None:
+                await self._render(channel_id, render_ctx)
+            # Trả kết quả sau khi vẽ lại, để thời gian của lệnh gồm cả phần vẽ bàn
+            self._resolve(outcomes)
+
+    def _drain(self, queue: asyncio.Queue, first: tuple) -> list[tuple]:
+        """Gom các tin đang chờ để xử lý một lô và chỉ vẽ lại bàn một lần."""
+        batch = [first]
+        while len(batch) < self.max_batch and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    @staticmethod
+    async def _run_batch(batch: list[tuple]) -> tuple[Any, list[tuple]]:
+        """Chạy lần lượt các bước; trả về ctx để vẽ lại (nếu có) và kết quả từng bước."""
+        render_ctx = None
+        outcomes = []
+        for step, ctx, future in batch:
+            if future.cancelled():
+                continue
+            try:
+                changed = await step()
+            except Exception as e:
+                outcomes.append((future, e))
+                continue
+            if changed and ctx is not None:
+                render_ctx = ctx
+            outcomes.append((future, changed))
+        return render_ctx, outcomes
+
+    async def _render(self, channel_id: int, ctx: Any):
+        try:
+            await self.on_render(channel_id, ctx)
+        except Exception:
+            logger.exception(f"Lỗi khi vẽ lại bàn chơi ở channel {channel_id}")
+
+    @staticmethod
+    def _resolve(outcomes: list[tuple]):
+        for future, outcome in outcomes:
+            if future.cancelled():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def close(self):
+        """Dừng mọi actor (ví dụ khi gỡ Cog)."""
+        for mailbox in self._mailboxes.values():
+            if mailbox.task:
+                mailbox.task.cancel()
+        self._mailboxes.clear()
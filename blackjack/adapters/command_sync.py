@@ -0,0 +1,69 @@
+# ==============================================================================
+# File: blackjack/adapters/command_sync.py
+# Mô tả: Chỉ đồng bộ slash command lên Discord khi định nghĩa lệnh thay đổi.
+# Dấu vân tay (sha256 của payload các lệnh) được lưu trên đĩa theo application
+# id; khởi động lại hoặc kết nối lại không phải gọi tree.sync() nữa.
+# ==============================================================================
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+from discord import app_commands
+
+logger = logging.getLogger("blackjack-bot.command_sync")
+
+
+def command_fingerprint(tree: app_commands.CommandTree) -> str:
+    """Băm payload mà tree.sync() sẽ gửi (lệnh toàn cục), không phụ thuộc thứ tự."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda data: (data.get("type", 1), data["name"]),
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _read_cache(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Không đọc được cache đồng bộ lệnh {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(path: str, data: dict):
+    # Ghi ra file tạm rồi thay thế để không để lại file hỏng khi bị ngắt giữa chừng
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+async def sync_if_changed(
+    tree: app_commands.CommandTree,
+    application_id: Optional[int],
+    cache_path: str,
+    force: bool = False,
+) -> bool:
+    """Gọi tree.sync() nếu định nghĩa lệnh khác lần đồng bộ trước; trả về True nếu có."""
+    fingerprint = command_fingerprint(tree)
+    key = str(application_id)
+    cache = _read_cache(cache_path)
+    if not force and cache.get(key) == fingerprint:
+        logger.info("Slash commands không đổi, bỏ qua đồng bộ.")
+        return False
+
+    synced = await tree.sync()
+    logger.info(f"Đã đồng bộ {len(synced)} slash commands.")
+    cache[key] = fingerprint
+    try:
+        _write_cache(cache_path, cache)
+    except OSError as e:
+        logger.warning(f"Không ghi được cache đồng bộ lệnh {cache_path}: {e}")
+    return True
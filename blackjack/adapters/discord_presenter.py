@@ -4,22 +4,100 @@
 # mà Discord có thể hiển thị (cụ thể là discord.Embed).
 # ==============================================================================
 import discord
-from ..entities import Game, GameState, GameResult, Player
+from ..entities import (
+    NUM_CARD_CODES,
+    Card,
+    Game,
+    GameState,
+    GameResult,
+    Player,
+    ShoeStats,
+)
+from ..leaderboard import CHIPS, WINS, PlayerStats
+from ..strategy import HIT
 from settings import COMMAND_PREFIX
 
+# Chuỗi hiển thị của từng lá bài, tạo một lần thay vì định dạng mỗi lần vẽ
+_CARD_LABELS = tuple(f"[{Card.from_code(code)}]" for code in range(NUM_CARD_CODES))
+_HIDDEN_LABELS = tuple(f"{label} [?]" for label in _CARD_LABELS)
+
+_RESULT_SUFFIX = {
+    GameResult.PLAYER_WINS: "\n🎉 **Thắng!**",
+    GameResult.DEALER_WINS: "\n😢 **Thua!**",
+}
+_MEDALS = ("🥇", "🥈", "🥉")
+_METRIC_TITLES = {WINS: "số ván thắng", CHIPS: "chip thắng/thua"}
+
+_VALUE_CLASS_LABELS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+
+_RESULT_OUTCOME = {
+    GameResult.PLAYER_WINS: "🎉 Thắng!",
+    GameResult.DEALER_WINS: "😢 Thua!",
+}
+
 
 class DiscordPresenter:
     """Tạo các tin nhắn discord.Embed để hiển thị trạng thái game."""
 
+    # Số mục tối đa của mỗi bộ nhớ đệm hiển thị; vượt quá thì xóa sạch
+    CACHE_LIMIT = 10_000
+
+    def __init__(self):
+        # Các cache được khóa theo Hand.version nên chỉ tay bài vừa đổi bị vẽ lại
+        self._hand_cache: dict[int, str] = {}
+        self._field_cache: dict[tuple, tuple[str, str]] = {}
+        self._line_cache: dict[tuple, str] = {}
+
+    def _remember(self, cache: dict, key, value):
+        if len(cache) >= self.CACHE_LIMIT:
+            cache.clear()
+        cache[key] = value
+
     def _format_hand(self, player: Player, hide_one_card: bool = False) -> str:
         """Định dạng bài trên tay của người chơi."""
+        hand = player.hand
         if hide_one_card:
             # Chỉ hiển thị lá bài đầu tiên của nhà cái
-            return f"[{str(player.hand.cards[0])}] [?]"
+            return _HIDDEN_LABELS[hand.codes[0]]
 
-        cards_str = " ".join([f"[{str(card)}]" for card in player.hand.cards])
+        cards_str = self._hand_cache.get(hand.version)
+        if cards_str is None:
+            cards_str = " ".join([_CARD_LABELS[code] for code in hand.codes])
+            self._remember(self._hand_cache, hand.version, cards_str)
         return cards_str
 
+    def _player_field(self, game: Game, player: Player) -> tuple[str, str]:
+        """Tên và nội dung field của một người chơi trong embed toàn bàn."""
+        status = self._get_player_status(game, player)
+        game_over = game.state == GameState.GAME_OVER
+        result = game.results.get(player.id)
+        key = (player.hand.version, player.name, status, game_over, result)
+        field = self._field_cache.get(key)
+        if field is None:
+            field_name = f"**{player.name}** (Điểm: {player.hand.value}{status})"
+            field_value = f"`{self._format_hand(player)}`"
+            if game_over:
+                field_value += _RESULT_SUFFIX.get(result, "\n🤝 **Hòa!**")
+            field = (field_name, field_value)
+            self._remember(self._field_cache, key, field)
+        return field
+
+    def _result_line(self, game: Game, player: Player) -> str:
+        """Một dòng kết quả của người chơi trong embed kết quả cuối."""
+        result = game.results.get(player.id)
+        chips = game.payouts.get(player.id)
+        key = (player.hand.version, player.name, result, chips)
+        line = self._line_cache.get(key)
+        if line is None:
+            hand_str = self._format_hand(player)
+            score = player.hand.value
+            outcome = _RESULT_OUTCOME.get(result, "🤝 Hòa!")
+            if chips is not None:
+                outcome += f" ({chips:+} chip)"
+            line = f"**{player.name}** (Điểm: {score}) `{hand_str}`: {outcome}\n"
+            self._remember(self._line_cache, key, line)
+        return line
+
     def _get_player_status(self, game: Game, player: Player) -> str:
         """Lấy trạng thái hiện tại của người chơi (ví dụ: BUSTED, BLACKJACK)."""
         if player.hand.value > 21:
@@ -52,7 +130,7 @@ class DiscordPresenter:
         dealer_value = (
             game.dealer.hand.value
             if not hide_dealer_card
-            else game.dealer.hand.cards[0].value
+            else Card.from_code(game.dealer.hand.codes[0]).value
         )
         dealer_status = ""
         if game.state == GameState.GAME_OVER:
@@ -68,23 +146,9 @@ class DiscordPresenter:
         )
         embed.add_field(name="-" * 30, value="", inline=False)
 
-        # Hiển thị bài của người chơi
+        # Hiển thị bài của người chơi (dùng lại field của tay bài chưa đổi)
         for player in game.players.values():
-            player_hand_str = self._format_hand(player)
-            player_status = self._get_player_status(game, player)
-
-            field_name = f"**{player.name}** (Điểm: {player.hand.value}{player_status})"
-            field_value = f"`{player_hand_str}`"
-
-            if game.state == GameState.GAME_OVER:
-                result = game.results.get(player.id)
-                if result == GameResult.PLAYER_WINS:
-                    field_value += "\n🎉 **Thắng!**"
-                elif result == GameResult.DEALER_WINS:
-                    field_value += "\n😢 **Thua!**"
-                else:
-                    field_value += "\n🤝 **Hòa!**"
-
+            field_name, field_value = self._player_field(game, player)
             embed.add_field(name=field_name, value=field_value, inline=True)
 
         # Hướng dẫn
@@ -117,7 +181,7 @@ class DiscordPresenter:
         dealer_value = (
             game.dealer.hand.value
             if not hide_dealer_card
-            else game.dealer.hand.cards[0].value
+            else Card.from_code(game.dealer.hand.codes[0]).value
         )
         dealer_status = ""
         if game.state == GameState.GAME_OVER:
@@ -184,7 +248,7 @@ class DiscordPresenter:
         dealer_value = (
             game.dealer.hand.value
             if not hide_dealer_card
-            else game.dealer.hand.cards[0].value
+            else Card.from_code(game.dealer.hand.codes[0]).value
         )
 
         embed.add_field(
@@ -250,20 +314,9 @@ class DiscordPresenter:
         )
 
         # Hiển thị kết quả chi tiết của từng người chơi
-        results_text = ""
-        for player in game.players.values():
-            result = game.results.get(player.id)
-            hand_str = self._format_hand(player)
-            score = player.hand.value
-            if result == GameResult.PLAYER_WINS:
-                outcome = "🎉 Thắng!"
-            elif result == GameResult.DEALER_WINS:
-                outcome = "😢 Thua!"
-            else:
-                outcome = "🤝 Hòa!"
-            results_text += (
-                f"**{player.name}** (Điểm: {score}) `{hand_str}`: {outcome}\n"
-            )
+        results_text = "".join(
+            [self._result_line(game, player) for player in game.players.values()]
+        )
 
         embed.add_field(
             name="📊 Kết quả",
@@ -275,6 +328,34 @@ class DiscordPresenter:
 
         return embed
 
+    def create_hint_embed(
+        self, game: Game, player: Player, action: str, ev: float
+    ) -> discord.Embed:
+        """Tạo embed gợi ý rút/dằn cho người chơi."""
+        if action == HIT:
+            advice = f"👉 Nên **rút** (`{COMMAND_PREFIX}hit`)"
+        else:
+            advice = f"✋ Nên **dằn** (`{COMMAND_PREFIX}stand`)"
+
+        embed = discord.Embed(title="💡 Gợi ý", color=discord.Color.teal())
+        embed.add_field(
+            name=f"**Bài của bạn** (Điểm: {player.hand.value})",
+            value=f"`{self._format_hand(player)}`",
+            inline=False,
+        )
+        embed.add_field(
+            name=f"**Nhà Cái** (Điểm: {Card.from_code(game.dealer.hand.codes[0]).value})",
+            value=f"`{self._format_hand(game.dealer, hide_one_card=True)}`",
+            inline=False,
+        )
+        embed.add_field(
+            name=advice,
+            value=f"Giá trị kỳ vọng: **{ev:+.2f}** lần tiền cược",
+            inline=False,
+        )
+        embed.set_footer(text="Gợi ý theo chiến thuật cơ bản, không đảm bảo thắng.")
+        return embed
+
     def create_waiting_embed(self, game: Game) -> discord.Embed:
         """Tạo embed cho phòng chờ."""
         embed = discord.Embed(
@@ -288,3 +369,71 @@ class DiscordPresenter:
 
         embed.add_field(name="Người chơi đã tham gia:", value=player_list, inline=False)
         return embed
+
+    def _format_score(self, metric: str, score: int) -> str:
+        return f"{score} ván thắng" if metric == WINS else f"{score:+} chip"
+
+    def create_leaderboard_embed(
+        self, scope: str, metric: str, rows: list[tuple[int, PlayerStats, int]]
+    ) -> discord.Embed:
+        """Tạo embed bảng xếp hạng từ các dòng (user_id, thành tích, điểm)."""
+        embed = discord.Embed(
+            title=f"🏆 Bảng xếp hạng {scope} - {_METRIC_TITLES[metric]}",
+            color=discord.Color.gold(),
+        )
+        lines = []
+        for i, (_, stats, score) in enumerate(rows):
+            place = _MEDALS[i] if i < len(_MEDALS) else f"**{i + 1}.**"
+            lines.append(
+                f"{place} {stats.name} - {self._format_score(metric, score)}"
+                f" ({stats.wins}/{stats.rounds} ván thắng)"
+            )
+        embed.description = "\n".join(lines) or "Chưa có ai chơi ván nào."
+        return embed
+
+    def format_rank(
+        self, name: str, scope: str, metric: str, rank: tuple[int, int, int]
+    ) -> str:
+        """Dòng "hạng của tôi" trong bảng xếp hạng."""
+        position, total, score = rank
+        return (
+            f"📈 {name}: hạng **{position}**/{total} trên bảng {scope} "
+            f"({self._format_score(metric, score)})"
+        )
+
+    def create_shoe_embed(
+        self, stats: ShoeStats, suspects: list[tuple[int, float]]
+    ) -> discord.Embed:
+        """Tạo embed thống kê shoe của kênh (cho admin)."""
+        embed = discord.Embed(title="🂠 Thống kê shoe", color=discord.Color.dark_grey())
+        embed.add_field(
+            name="Còn lại",
+            value=f"{stats.remaining}/{stats.total} lá "
+            f"({stats.remaining / NUM_CARD_CODES:.1f} bộ)",
+            inline=True,
+        )
+        embed.add_field(
+            name="Đã chia",
+            value=f"{stats.dealt_ratio:.0%} (lá cắt ở {stats.penetration:.0%})",
+            inline=True,
+        )
+        embed.add_field(
+            name="Hi-Lo",
+            value=f"Running **{stats.running_count:+d}**, "
+            f"true **{stats.true_count:+.1f}**",
+            inline=True,
+        )
+        composition = " ".join(
+            f"{label}:{count}"
+            for label, count in zip(_VALUE_CLASS_LABELS, stats.composition)
+        )
+        embed.add_field(name="Thành phần", value=f"`{composition}`", inline=False)
+        if suspects:
+            embed.add_field(
+                name="⚠️ Nghi đếm bài (cược cao/thấp theo true count)",
+                value="\n".join(f"<@{uid}> x{spread:.1f}" for uid, spread in suspects),
+                inline=False,
+            )
+        if stats.needs_shuffle:
+            embed.set_footer(text="Đã chạm lá cắt: ván sau dùng shoe mới.")
+        return embed
@@ -0,0 +1,166 @@
+# ==============================================================================
+# File: blackjack/adapters/event_log.py
+# Mô tả: Lớp Adapter - Nhật ký sự kiện game trên một file chỉ ghi nối tiếp
+# (IGameEventLog), và bộ đọc dùng mmap để quét/phát lại hàng triệu sự kiện
+# (kiểm toán, giải quyết khiếu nại) mà không nạp cả file vào RAM.
+# ==============================================================================
+import logging
+import mmap
+import os
+from typing import Iterable, Iterator, Optional
+
+from ..entities import Game
+from ..events import (
+    LENGTH_SIZE,
+    HEADER_SIZE,
+    EventType,
+    GameEvent,
+    decode_event,
+    decode_header,
+    encode_event,
+    replay,
+)
+from ..interfaces import IGameEventLog
+
+logger = logging.getLogger("blackjack-bot.events")
+
+
+class FileGameEventLog(IGameEventLog):
+    """Ghi nối tiếp các sự kiện vào file; mỗi lần append đẩy xuống OS (không fsync)."""
+
+    def __init__(self, path: str, fsync_on_close: bool = True):
+        self.path = path
+        self.fsync_on_close = fsync_on_close
+        if os.path.exists(path):
+            self._truncate_torn_tail()
+        self._file = open(path, "ab")
+
+    def _truncate_torn_tail(self):
+        # Bản ghi cuối bị cắt cụt (bot chết giữa lần ghi) sẽ làm hỏng mọi bản
+        # ghi nối sau nó, nên cắt bỏ trước khi ghi tiếp
+        with EventLogReader(self.path) as reader:
+            end, size = reader.valid_end(), reader.size
+        if end < size:
+            logger.warning(
+                f"Cắt bỏ {size - end} byte hỏng ở cuối nhật ký sự kiện {self.path}."
+            )
+            os.truncate(self.path, end)
+
+    def append(self, event: GameEvent):
+        self._file.write(encode_event(event))
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self.fsync_on_close:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+
+class EventLogReader:
+    """Đọc nhật ký sự kiện qua mmap (ảnh chụp của file tại thời điểm mở)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        # mmap không ánh xạ được file rỗng
+        self._buffer = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else b""
+        )
+        # channel_id -> offset các sự kiện START, theo thứ tự ghi
+        self._starts: Optional[dict[int, list[int]]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    def headers(self, start: int = 0) -> Iterator[tuple[int, int, int, int]]:
+        """Duyệt (offset, offset kế tiếp, loại, channel_id), không giải mã payload."""
+        buffer, size = self._buffer, self.size
+        offset = start
+        while offset + LENGTH_SIZE + HEADER_SIZE <= size:
+            length, kind, channel_id, _, _ = decode_header(buffer, offset)
+            end = offset + LENGTH_SIZE + length
+            if length < HEADER_SIZE or end > size:
+                break
+            yield offset, end, kind, channel_id
+            offset = end
+        if offset < size:
+            logger.warning(f"Nhật ký {self.path} có bản ghi hỏng tại {offset}.")
+
+    def valid_end(self) -> int:
+        """Offset ngay sau bản ghi nguyên vẹn cuối cùng."""
+        end = 0
+        for _, end, _, _ in self.headers():
+            pass
+        return end
+
+    def event_at(self, offset: int) -> GameEvent:
+        return decode_event(self._buffer, offset)[0]
+
+    def __iter__(self) -> Iterator[GameEvent]:
+        return self.scan()
+
+    def scan(
+        self,
+        channel_id: Optional[int] = None,
+        types: Optional[Iterable[EventType]] = None,
+        start: int = 0,
+    ) -> Iterator[GameEvent]:
+        """Các sự kiện (lọc theo kênh/loại trên header, chỉ giải mã bản ghi khớp)."""
+        wanted = frozenset(types) if types is not None else None
+        for offset, _, kind, cid in self.headers(start):
+            if channel_id is not None and cid != channel_id:
+                continue
+            if wanted is not None and kind not in wanted:
+                continue
+            yield self.event_at(offset)
+
+    def start_offsets(self, channel_id: int) -> list[int]:
+        """Offset các sự kiện START của kênh (chỉ mục dựng ở lần gọi đầu)."""
+        if self._starts is None:
+            starts: dict[int, list[int]] = {}
+            for offset, _, kind, cid in self.headers():
+                if kind == EventType.START:
+                    starts.setdefault(cid, []).append(offset)
+            self._starts = starts
+        return self._starts.get(channel_id, [])
+
+    def replay_channel(self, channel_id: int) -> Optional[Game]:
+        """Dựng lại trạng thái hiện tại của kênh (None nếu không có game dở)."""
+        starts = self.start_offsets(channel_id)
+        return replay(self.scan(channel_id, start=starts[-1] if starts else 0))
+
+    def replay_round(self, channel_id: int, index: int = -1) -> Game:
+        """Dựng lại ván thứ `index` của kênh tại thời điểm kết thúc (trước END)."""
+        starts = self.start_offsets(channel_id)
+        try:
+            start = starts[index]
+        except IndexError:
+            raise ValueError(f"Kênh {channel_id} không có ván thứ {index}.") from None
+
+        def round_events():
+            events = self.scan(channel_id, start=start)
+            yield next(events)  # chính sự kiện START của ván
+            for event in events:
+                if event.type in (EventType.START, EventType.END):
+                    return
+                yield event
+
+        game = replay(round_events())
+        if game is None:
+            raise ValueError(f"Không phát lại được ván tại offset {start}.")
+        return game
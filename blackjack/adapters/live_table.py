@@ -0,0 +1,103 @@
+# ==============================================================================
+# File: blackjack/adapters/live_table.py
+# Mô tả: Chế độ "bàn chơi sống": mỗi ván có đúng một tin nhắn được sửa tại chỗ
+# thay vì gửi embed mới sau mỗi hành động. Các lần cập nhật được gom lại
+# (debounce): nếu nhiều hành động đến trong cùng một khoảng ngắn, chỉ trạng
+# thái mới nhất được gửi lên Discord.
+# ==============================================================================
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Optional
+
+import discord
+
+from .outbound import OutboundDispatcher
+
+logger = logging.getLogger("blackjack-bot.live_table")
+
+
+class _LiveTable:
+    __slots__ = ("channel", "message", "pending", "task", "turn")
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.message: Optional[discord.Message] = None
+        self.pending: Optional[dict[str, Any]] = None  # nội dung mới nhất chưa gửi
+        self.task: Optional[asyncio.Task] = None
+        self.turn: Optional[int] = None  # người chơi của lượt đã được ping
+
+
+class LiveTableMessages:
+    """Giữ tin nhắn bàn chơi của từng kênh và gom các lần sửa theo debounce."""
+
+    def __init__(
+        self, debounce: float = 0.5, outbound: Optional[OutboundDispatcher] = None
+    ):
+        self.debounce = debounce
+        # Nếu có, mọi lần gửi/sửa đi qua bộ điều phối để chung giới hạn tốc độ
+        self.outbound = outbound
+        self._tables: dict[int, _LiveTable] = {}
+
+    def __len__(self) -> int:
+        """Số bàn chơi đang có tin nhắn sống."""
+        return len(self._tables)
+
+    def update(self, channel_id: int, channel, **kwargs) -> asyncio.Task:
+        """Đặt nội dung mới cho tin nhắn bàn chơi; chỉ bản mới nhất được gửi."""
+        table = self._tables.get(channel_id)
+        if table is None:
+            table = _LiveTable(channel)
+            self._tables[channel_id] = table
+        table.pending = kwargs
+        if table.task is None or table.task.done():
+            table.task = asyncio.create_task(self._flush(channel_id, table))
+        return table.task
+
+    def new_turn(self, channel_id: int, player_id: int) -> bool:
+        """Ghi nhận lượt của player_id; True nếu đây là lượt mới cần ping riêng.
+
+        Discord không thông báo mention trong tin nhắn được sửa, nên mỗi lượt mới
+        vẫn cần một tin ping ngắn bên cạnh bàn chơi.
+        """
+        table = self._tables.get(channel_id)
+        if table is None or table.turn == player_id:
+            return False
+        table.turn = player_id
+        return True
+
+    def finish(self, channel_id: int) -> Optional[asyncio.Task]:
+        """Kết thúc bàn chơi: lần sửa đang chờ vẫn được gửi, ván sau dùng tin mới."""
+        table = self._tables.pop(channel_id, None)
+        return table.task if table else None
+
+    async def _flush(self, channel_id: int, table: _LiveTable):
+        while table.pending is not None:
+            await asyncio.sleep(self.debounce)
+            kwargs, table.pending = table.pending, None
+            try:
+                await self._publish(channel_id, table, kwargs)
+            except discord.HTTPException as e:
+                logger.warning(f"Lỗi cập nhật bàn chơi ở channel {channel_id}: {e}")
+
+    async def _call(self, channel_id: int, func, kwargs: dict[str, Any]):
+        if self.outbound is None:
+            return await func(**kwargs)
+        return await self.outbound.submit(channel_id, partial(func, **kwargs))
+
+    async def _publish(self, channel_id: int, table: _LiveTable, kwargs: dict):
+        if table.message is not None:
+            try:
+                await self._call(channel_id, table.message.edit, kwargs)
+                return
+            except discord.NotFound:
+                # Tin nhắn đã bị xóa: gửi lại một tin mới
+                table.message = None
+        table.message = await self._call(channel_id, table.channel.send, kwargs)
+
+    def close(self):
+        """Hủy mọi lần sửa đang chờ (ví dụ khi gỡ Cog)."""
+        for table in self._tables.values():
+            if table.task:
+                table.task.cancel()
+        self._tables.clear()
@@ -2,23 +2,103 @@
 # File: blackjack/adapters/memory_repository.py
 # Mô tả: Lớp Adapter - Cung cấp một triển khai cụ thể cho IGameRepository.
 # Ở đây, chúng ta lưu trạng thái game vào một dictionary trong bộ nhớ.
+# Game bị bỏ quên được dọn theo TTL (tính từ lần lưu cuối) và theo số lượng tối
+# đa (bỏ game lâu không hoạt động nhất trước); listener được báo khi một game
+# bị loại để dọn các bảng phụ.
 # ==============================================================================
-from typing import Optional, Dict
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
 from ..entities import Game
 from ..interfaces import IGameRepository
 
+logger = logging.getLogger("blackjack-bot.memory")
+
+EVICT_TTL = "ttl"
+EVICT_CAPACITY = "capacity"
+
+# listener(channel_id, game, lý do) được gọi sau khi game bị loại
+EvictionListener = Callable[[int, Game, str], None]
+
 
 class MemoryGameRepository(IGameRepository):
     """Lưu trữ trạng thái các ván game trong bộ nhớ (dictionary)."""
 
-    _games: Dict[int, Game] = {}
+    def __init__(
+        self,
+        max_games: int = 0,
+        ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_games = max_games  # 0 = không giới hạn
+        self.ttl = ttl  # giây; 0 = không hết hạn
+        self.clock = clock
+        # Thứ tự theo lần lưu cuối: game đầu tiên là game lâu không hoạt động nhất
+        self._games: OrderedDict[int, Game] = OrderedDict()
+        self._last_active: dict[int, float] = {}
+        self._listeners: list[EvictionListener] = []
 
     def get_game(self, channel_id: int) -> Optional[Game]:
         return self._games.get(channel_id)
 
     def save_game(self, game: Game):
-        self._games[game.channel_id] = game
+        channel_id = game.channel_id
+        self._games[channel_id] = game
+        self._games.move_to_end(channel_id)
+        self._last_active[channel_id] = self.clock()
+        if self.max_games and len(self._games) > self.max_games:
+            self._evict(next(iter(self._games)), EVICT_CAPACITY)
 
     def delete_game(self, channel_id: int):
         if channel_id in self._games:
             del self._games[channel_id]
+            del self._last_active[channel_id]
+
+    def all_games(self) -> Iterable[Game]:
+        return self._games.values()
+
+    def last_active(self, channel_id: int) -> Optional[float]:
+        """Thời điểm (theo clock) game của kênh được lưu lần cuối."""
+        return self._last_active.get(channel_id)
+
+    def add_eviction_listener(self, listener: EvictionListener):
+        self._listeners.append(listener)
+
+    def evict(self, channel_id: int, reason: str) -> bool:
+        """Loại game của kênh (nếu có) và báo cho listener như khi hết hạn."""
+        if channel_id not in self._games:
+            return False
+        self._evict(channel_id, reason)
+        return True
+
+    def _evict(self, channel_id: int, reason: str):
+        game = self._games.pop(channel_id)
+        del self._last_active[channel_id]
+        logger.info(f"Loại game ở channel {channel_id} ({reason}).")
+        for listener in self._listeners:
+            try:
+                listener(channel_id, game, reason)
+            except Exception:
+                logger.exception(f"Lỗi trong listener khi loại game {channel_id}")
+
+    def evict_expired(self) -> int:
+        """Loại các game quá TTL; chỉ duyệt các game hết hạn nên là O(số bị loại)."""
+        if not self.ttl:
+            return 0
+        deadline = self.clock() - self.ttl
+        evicted = 0
+        while self._games:
+            channel_id = next(iter(self._games))
+            if self._last_active[channel_id] > deadline:
+                break
+            self._evict(channel_id, EVICT_TTL)
+            evicted += 1
+        return evicted
+
+    async def run_sweeper(self, interval: float = 60.0):
+        """Vòng lặp nền: định kỳ loại các game quá TTL."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_expired()
@@ -0,0 +1,236 @@
+# ==============================================================================
+# File: blackjack/adapters/metrics.py
+# Mô tả: Metrics dạng văn bản của Prometheus, phục vụ ngay trên event loop của
+# bot (asyncio.start_server, không cần thư viện ngoài). Ghi nhận một mẫu chỉ là
+# một lần bisect và vài phép cộng nên có thể để bật trên đường nóng; các gauge
+# được tính lúc Prometheus đến lấy (scrape).
+# ==============================================================================
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger("blackjack-bot.metrics")
+
+# Mốc histogram mặc định (giây): từ 0.5ms tới 5s
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Hàm gauge trả về một giá trị, hoặc dict {bộ nhãn: giá trị}
+GaugeValue = Union[float, dict[tuple, float]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Một chuỗi histogram (một bộ nhãn)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # ô cuối là +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """Histogram có nhãn; mỗi bộ nhãn một Histogram, tạo khi dùng lần đầu."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, Histogram] = {}
+
+    def labels(self, *values) -> Histogram:
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = Histogram(self.buckets)
+        return series
+
+    def observe(self, value: float, *labels):
+        self.labels(*labels).observe(value)
+
+    def render(self, lines: list[str]):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                le = _labels(self.labelnames, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _labels(self.labelnames, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {series.count}")
+            labels = _labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {series.sum}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+
+
+class _Gauge:
+    def __init__(self, name: str, help: str, fn, labelnames: tuple):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = labelnames
+
+    def render(self, lines: list[str]):
+        try:
+            value = self.fn()
+        except Exception:
+            logger.exception(f"Lỗi khi tính gauge {self.name}")
+            return
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} gauge")
+        if isinstance(value, dict):
+            for values, number in value.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, values)} {number}")
+        else:
+            lines.append(f"{self.name} {value}")
+
+
+class MetricsRegistry:
+    """Tập hợp các metric và xuất ra định dạng văn bản của Prometheus."""
+
+    def __init__(self):
+        self._metrics: dict[str, Union[HistogramFamily, _Gauge]] = {}
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        family = HistogramFamily(name, help, labelnames, buckets)
+        self._register(family)
+        return family
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], GaugeValue],
+        labelnames: tuple = (),
+    ):
+        """Gauge tính bằng fn() mỗi lần scrape."""
+        self._register(_Gauge(name, help, fn, labelnames))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} đã được đăng ký.")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            metric.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+class LoopLagMonitor:
+    """Đo độ trễ event loop: ngủ `interval` giây và ghi lại phần thức dậy muộn."""
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 0.5):
+        self.interval = interval
+        self.last = 0.0
+        self._histogram = registry.histogram(
+            "blackjack_event_loop_lag_seconds", "Độ trễ của event loop."
+        ).labels()
+        registry.gauge(
+            "blackjack_event_loop_lag_last_seconds",
+            "Độ trễ event loop đo được gần nhất.",
+            lambda: self.last,
+        )
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - started - self.interval)
+            self._histogram.observe(self.last)
+
+
+class MetricsServer:
+    """HTTP server tối giản: GET /metrics trả về metrics, /healthz trả về ok."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "0.0.0.0", port=8080):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Metrics đang phục vụ tại http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5.0)
+            # Bỏ qua phần header của request
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 5.0)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request.decode("latin-1").split()
+            method = parts[0] if parts else ""
+            path = parts[1].split("?", 1)[0] if len(parts) > 1 else ""
+            if method != "GET":
+                status, content_type, body = "405 Method Not Allowed", "text/plain", ""
+            elif path == "/metrics":
+                status, content_type = "200 OK", CONTENT_TYPE
+                body = self.registry.render()
+            elif path == "/healthz":
+                status, content_type, body = "200 OK", "text/plain", "ok\n"
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", ""
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
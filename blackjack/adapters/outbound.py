@@ -0,0 +1,186 @@
+# ==============================================================================
+# File: blackjack/adapters/outbound.py
+# Mô tả: Bộ điều phối tin nhắn gửi đi. Lệnh chỉ xếp tin vào hàng đợi của kênh
+# rồi trả về ngay; một task cho mỗi kênh gửi lần lượt theo thứ tự, giữ nhịp
+# bằng token bucket toàn cục và token bucket theo kênh (giới hạn route của
+# Discord). Tin trạng thái bàn chơi bị thay thế khi chưa kịp gửi thì được gộp.
+# ==============================================================================
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger("blackjack-bot.outbound")
+
+# Một lần gửi: hàm không tham số trả về coroutine (ví dụ partial(ctx.send, ...)).
+Send = Callable[[], Awaitable[Any]]
+# Hook sau mỗi lần gửi: (thời gian chờ trong hàng, thời gian gửi) tính bằng giây.
+SendHook = Callable[[float, float], None]
+
+
+class TokenBucket:
+    """Token bucket: tối đa `burst` lượt liền nhau, hồi `rate` lượt mỗi giây."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate phải > 0 và burst phải >= 1.")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    async def acquire(self):
+        """Chờ tới khi có token rồi lấy một token."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._refill(loop.time())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _Outbound:
+    __slots__ = ("send", "key", "future", "queued_at")
+
+    def __init__(
+        self, send: Send, key: Optional[str], future: asyncio.Future, queued_at: float
+    ):
+        self.send = send
+        self.key = key
+        self.future = future
+        self.queued_at = queued_at
+
+
+class _Lane:
+    __slots__ = ("queue", "bucket", "wakeup", "task")
+
+    def __init__(self, bucket: TokenBucket):
+        self.queue: deque[_Outbound] = deque()
+        self.bucket = bucket
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+def _log_failure(future: asyncio.Future):
+    # Đánh dấu lỗi đã được xử lý để asyncio không cảnh báo với tin không ai chờ
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Lỗi khi gửi tin nhắn: {future.exception()}")
+
+
+class OutboundDispatcher:
+    """Hàng đợi gửi theo kênh, có giới hạn tốc độ và gộp tin trạng thái."""
+
+    def __init__(
+        self,
+        global_rate: float = 45.0,
+        channel_rate: float = 1.0,
+        channel_burst: int = 5,
+        on_send: Optional[SendHook] = None,
+    ):
+        self.channel_rate = channel_rate
+        self.on_send = on_send
+        self.channel_burst = channel_burst
+        self._global = TokenBucket(global_rate, global_rate)
+        self._lanes: dict[int, _Lane] = {}
+
+    def __len__(self) -> int:
+        """Số tin đang chờ gửi."""
+        return sum(len(lane.queue) for lane in self._lanes.values())
+
+    def submit(
+        self, channel_id: int, send: Send, key: Optional[str] = None
+    ) -> asyncio.Future:
+        """Xếp một lần gửi vào hàng đợi của kênh; trả về Future chứa kết quả.
+
+        Nếu `key` khác None và trong hàng đã có tin cùng key chưa gửi, tin cũ được
+        bỏ khỏi vị trí cũ và tin mới xếp cuối hàng (để không vượt lên trước các
+        tin gửi sau tin cũ); hai bên dùng chung một Future.
+        """
+        lane = self._lanes.get(channel_id)
+        if lane is None:
+            lane = _Lane(TokenBucket(self.channel_rate, self.channel_burst))
+            self._lanes[channel_id] = lane
+        loop = asyncio.get_running_loop()
+        if key is not None:
+            for item in lane.queue:
+                if item.key == key:
+                    lane.queue.remove(item)
+                    item.send = send
+                    lane.queue.append(item)
+                    return item.future
+        future = loop.create_future()
+        future.add_done_callback(_log_failure)
+        lane.queue.append(_Outbound(send, key, future, loop.time()))
+        lane.wakeup.set()
+        if lane.task is None or lane.task.done():
+            lane.task = asyncio.create_task(self._drain(channel_id, lane))
+        return future
+
+    def discard(self, channel_id: int, key: str) -> bool:
+        """Bỏ tin cùng `key` đang chờ trong hàng của kênh (nếu chưa được gửi)."""
+        lane = self._lanes.get(channel_id)
+        if lane is None:
+            return False
+        for item in lane.queue:
+            if item.key == key:
+                lane.queue.remove(item)
+                item.future.cancel()
+                return True
+        return False
+
+    async def _drain(self, channel_id: int, lane: _Lane):
+        loop = asyncio.get_running_loop()
+        queue = lane.queue
+        # Giữ kênh tới khi bucket hồi đầy, để giới hạn theo kênh không bị đặt lại sớm
+        idle = lane.bucket.burst / lane.bucket.rate
+        while True:
+            if not queue:
+                lane.wakeup.clear()
+                try:
+                    await asyncio.wait_for(lane.wakeup.wait(), idle)
+                except asyncio.TimeoutError:
+                    if not queue:
+                        # Không có await giữa kiểm tra và xóa nên không thể mất tin.
+                        del self._lanes[channel_id]
+                        return
+                continue
+            await lane.bucket.acquire()
+            await self._global.acquire()
+            if not queue:
+                # discard() đã bỏ tin cuối cùng trong lúc chờ token
+                continue
+            # Lấy tin sau khi có token để tin gộp vào trong lúc chờ vẫn còn trong hàng
+            item = queue.popleft()
+            if item.future.cancelled():
+                continue
+            started = loop.time()
+            try:
+                result = await item.send()
+            except Exception as e:
+                if not item.future.cancelled():
+                    item.future.set_exception(e)
+                continue
+            finally:
+                if self.on_send is not None:
+                    self.on_send(started - item.queued_at, loop.time() - started)
+            if not item.future.cancelled():
+                item.future.set_result(result)
+
+    def close(self):
+        """Hủy mọi tin đang chờ (ví dụ khi gỡ Cog)."""
+        for lane in self._lanes.values():
+            if lane.task:
+                lane.task.cancel()
+            for item in lane.queue:
+                item.future.cancel()
+        self._lanes.clear()
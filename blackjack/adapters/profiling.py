@@ -0,0 +1,217 @@
+# ==============================================================================
+# File: blackjack/adapters/profiling.py
+# Mô tả: Công cụ chẩn đoán độ trễ khi chạy thật:
+# - Profiler lấy mẫu: một luồng nền chụp stack của luồng event loop định kỳ
+#   (sys._current_frames) và ghi ra file collapsed stack (dùng cho flamegraph),
+#   hoặc chạy cProfile trên luồng event loop và ghi file pstats.
+# - Trace từng lệnh: cộng dồn thời gian theo giai đoạn (use_case, render, send)
+#   qua ContextVar, để ghi log các lệnh chậm hơn ngưỡng.
+# ==============================================================================
+import asyncio
+import cProfile
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+logger = logging.getLogger("blackjack-bot.profiling")
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+
+
+# --- Trace theo giai đoạn ---
+class CommandTrace:
+    """Thời gian của một lệnh, chia theo giai đoạn."""
+
+    __slots__ = ("name", "channel_id", "started", "phases")
+
+    def __init__(self, name: str, channel_id: Optional[int]):
+        self.name = name
+        self.channel_id = channel_id
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def format(self, total: float) -> str:
+        parts = [f"{p} {s * 1e3:.1f}ms" for p, s in self.phases.items()]
+        parts.append(f"khác {(total - sum(self.phases.values())) * 1e3:.1f}ms")
+        return ", ".join(parts)
+
+
+# Trace của lệnh đang chạy (None nếu không trace)
+current_trace: ContextVar[Optional[CommandTrace]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+class trace_phase:
+    """Context manager cộng thời gian khối lệnh vào giai đoạn của trace hiện tại."""
+
+    __slots__ = ("phase", "trace", "started")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.trace = current_trace.get()
+        if self.trace is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace is not None:
+            self.trace.add(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+class TracedProxy:
+    """Bọc một đối tượng: mọi lời gọi phương thức được tính vào giai đoạn `phase`."""
+
+    def __init__(self, target, phase: str):
+        self._target = target
+        self._phase = phase
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        phase = self._phase
+
+        @wraps(attr)
+        def traced(*args, **kwargs):
+            trace = current_trace.get()
+            if trace is None:
+                return attr(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            finally:
+                trace.add(phase, time.perf_counter() - started)
+            if inspect.iscoroutine(result):
+                # Phương thức async (ví dụ gọi qua IPC): tính cả thời gian chờ
+                return _traced_await(result, trace, phase)
+            return result
+
+        return traced
+
+
+async def _traced_await(coro, trace: "CommandTrace", phase: str):
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        trace.add(phase, time.perf_counter() - started)
+
+
+# --- Profiler ---
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Luồng nền lấy mẫu stack của một luồng khác mỗi `interval` giây."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="blackjack-profiler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+def write_collapsed(samples: Counter, path: str):
+    """Ghi các stack theo định dạng collapsed ("a;b;c số_mẫu") cho flamegraph."""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilerController:
+    """Bật profiling trong một khoảng thời gian rồi ghi kết quả ra thư mục."""
+
+    def __init__(
+        self, output_dir: str, interval: float = 0.005, max_seconds: float = 300
+    ):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, seconds: float, mode: str = SAMPLE) -> asyncio.Task:
+        """Bắt đầu profiling (chạy nền); Task trả về đường dẫn file kết quả."""
+        if self.active:
+            raise RuntimeError("Đang có một phiên profiling chạy.")
+        if mode not in MODES:
+            raise ValueError(f"Chế độ profiling phải là một trong {', '.join(MODES)}.")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(
+                f"Thời gian profiling phải trong khoảng (0, {self.max_seconds}] giây."
+            )
+        self._task = asyncio.create_task(self._profile(seconds, mode))
+        return self._task
+
+    async def _profile(self, seconds: float, mode: str) -> str:
+        loop = asyncio.get_running_loop()
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        logger.info(f"Bắt đầu profiling ({mode}) trong {seconds}s.")
+        if mode == CPROFILE:
+            # cProfile chỉ theo dõi luồng gọi enable(): chính là luồng event loop
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            path = os.path.join(self.output_dir, f"profile-{stamp}.pstats")
+            await loop.run_in_executor(None, profile.dump_stats, path)
+        else:
+            sampler = SamplingProfiler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                samples = await loop.run_in_executor(None, sampler.stop)
+            path = os.path.join(self.output_dir, f"profile-{stamp}.collapsed")
+            await loop.run_in_executor(None, write_collapsed, samples, path)
+        logger.info(f"Đã ghi kết quả profiling vào {path}.")
+        return path
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
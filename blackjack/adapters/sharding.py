@@ -0,0 +1,614 @@
+# ==============================================================================
+# File: blackjack/adapters/sharding.py
+# Mô tả: Chia logic game của các kênh cho nhiều process worker theo consistent
+# hashing. Mỗi worker chạy một GameUseCase với SqliteGameRepository và shoe
+# riêng; process Discord (coordinator) chuyển hành động qua multiprocessing
+# pipe và nhận lại snapshot của game (đã sẵn để vẽ). Coordinator giữ bản sao
+# các game trong bộ nhớ, nên đọc game, /hint, sổ cái chip và bảng xếp hạng (vốn
+# dùng chung giữa các kênh) vẫn chạy tại chỗ. Worker chết được khởi động lại và
+# nạp lại game của nó từ bản sao, nên không mất ván nào. Game bị bỏ quên được
+# loại theo TTL ở cả worker lẫn bản sao; bên nào loại trước thì báo cho bên kia.
+# ==============================================================================
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ..entities import Game, GameState, ShoeStats
+from ..leaderboard import GLOBAL, Leaderboards
+from ..ledger import ChipLedger
+from ..shoe import BetSpreadMonitor, ShoeManager
+from ..snapshot import decode_game, encode_game
+from ..strategy import StrategyTable
+from ..use_cases import GameUseCase
+from .event_log import FileGameEventLog
+from .memory_repository import MemoryGameRepository
+from .sqlite_repository import SqliteGameRepository
+
+logger = logging.getLogger("blackjack-bot.sharding")
+
+# Các lỗi nghiệp vụ được chuyển nguyên kiểu từ worker về coordinator
+_ERRORS = {
+    error.__name__: error for error in (ValueError, PermissionError, RuntimeError)
+}
+# Chờ trước khi khởi động lại worker vừa chết (tránh vòng lặp chết/khởi động)
+RESTART_DELAY = 0.5
+_SHARD_FILE = re.compile(r"shard-(\d+)\.db$")
+# Lý do loại game ở bản sao khi chính worker đã loại (không cần báo ngược lại)
+EVICT_WORKER = "worker-ttl"
+
+
+def _hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class HashRing:
+    """Consistent hashing: mỗi node có `replicas` điểm trên vòng băm 64 bit.
+
+    Đổi số node chỉ chuyển khoảng 1/N số kênh sang node khác.
+    """
+
+    def __init__(self, nodes: int, replicas: int = 64):
+        if nodes < 1:
+            raise ValueError("Cần ít nhất một node.")
+        self.nodes = nodes
+        points = sorted(
+            (_hash(f"{node}:{replica}".encode()), node)
+            for node in range(nodes)
+            for replica in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: int) -> int:
+        """Node phụ trách key (điểm đầu tiên theo chiều kim đồng hồ)."""
+        i = bisect.bisect(self._points, _hash(key.to_bytes(8, "little")))
+        return self._owners[i % len(self._owners)]
+
+
+class WorkerLost(RuntimeError):
+    """Worker chết (hoặc đang khởi động lại) trước khi trả lời yêu cầu."""
+
+
+def _ignore_result(future: asyncio.Future):
+    # Yêu cầu không ai chờ: đánh dấu lỗi (nếu có) đã được xử lý
+    if not future.cancelled():
+        future.exception()
+
+
+# --- Phía worker ---
+def _restore(use_case: GameUseCase, snapshots: list[bytes]) -> int:
+    """Thay toàn bộ game của worker bằng các snapshot (bản sao của coordinator)."""
+    games = {}
+    for data in snapshots:
+        game = decode_game(data)
+        games[game.channel_id] = game
+    repo = use_case.repo
+    for game in list(repo.all_games()):
+        if game.channel_id not in games:
+            repo.delete_game(game.channel_id)
+            use_case.shoes.discard(game.channel_id)
+    for game in games.values():
+        repo.save_game(game)
+    repo.flush()
+    return len(games)
+
+
+def _handle(use_case: GameUseCase, request: tuple) -> tuple:
+    """Xử lý một yêu cầu; trả lời (req_id, lỗi, channel_id, snapshot, kết quả phụ)."""
+    req_id, method, channel_id, args = request
+    try:
+        extra = None
+        if method == "join":
+            # Kèm true count lúc tham gia cho BetSpreadMonitor ở coordinator
+            user_id, user_name, bet = args
+            game, joined = use_case.join_game(channel_id, user_id, user_name)
+            if joined and bet:
+                # Worker không có sổ cái: ghi tiền cược coordinator đã giữ vào game
+                game.players[user_id].bet = bet
+                use_case.repo.save_game(game)
+            extra = joined, use_case.next_round_true_count(channel_id)
+        elif method == "start":
+            use_case.start_new_game(channel_id, *args)
+        elif method == "action":
+            use_case.player_action(channel_id, *args)
+        elif method == "end":
+            use_case.end_game(channel_id)
+        elif method == "evict":
+            # Bản sao đã loại game (TTL/giới hạn số game)
+            use_case.repo.delete_game(channel_id)
+            use_case.shoes.discard(channel_id)
+        elif method == "shoe":
+            return req_id, None, None, None, use_case.get_shoe_stats(channel_id)
+        elif method == "dump":
+            snapshots = [encode_game(game) for game in use_case.repo.all_games()]
+            return req_id, None, None, None, snapshots
+        elif method == "restore":
+            return req_id, None, None, None, _restore(use_case, *args)
+        else:
+            raise RuntimeError(f"Yêu cầu không hợp lệ: {method}.")
+    except tuple(_ERRORS.values()) as e:
+        return req_id, (type(e).__name__, str(e)), None, None, None
+    except Exception as e:
+        logger.exception(f"Lỗi xử lý {method} ở channel {channel_id}: {e}")
+        return (
+            req_id,
+            ("RuntimeError", "Lỗi nội bộ, vui lòng thử lại."),
+            None,
+            None,
+            None,
+        )
+    game = use_case.repo.get_game(channel_id)
+    return req_id, None, channel_id, encode_game(game) if game else None, extra
+
+
+def _touch(active: OrderedDict, channel_id: int, now: float):
+    active[channel_id] = now
+    active.move_to_end(channel_id)
+
+
+def _evict_expired(use_case: GameUseCase, active: OrderedDict, deadline: float):
+    """Loại game và shoe của các kênh không hoạt động từ trước deadline.
+
+    active xếp theo lần hoạt động cuối nên chỉ duyệt các kênh hết hạn. Trả về
+    các kênh có game bị loại (để báo cho coordinator).
+    """
+    evicted = []
+    while active:
+        channel_id, last_active = next(iter(active.items()))
+        if last_active > deadline:
+            break
+        del active[channel_id]
+        if use_case.repo.get_game(channel_id) is not None:
+            use_case.repo.delete_game(channel_id)
+            evicted.append(channel_id)
+        use_case.shoes.discard(channel_id)
+    return evicted
+
+
+def _worker_main(
+    conn,
+    index: int,
+    db_path: str,
+    num_decks: int,
+    penetration: float,
+    flush_interval: float,
+    event_log_path: str,
+    log_level: int,
+    game_ttl: float = 0.0,
+):
+    """Vòng lặp của process worker: trả lời từng yêu cầu, ghi SQLite định kỳ.
+
+    Với game_ttl > 0, kênh không có yêu cầu nào trong game_ttl giây bị loại
+    game và shoe; coordinator nhận danh sách kênh bị loại qua tin (None, ...).
+    """
+    # Ctrl+C gửi tới cả nhóm process; worker dừng khi coordinator đóng pipe
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s [%(levelname)s] %(name)s[shard {index}]: %(message)s",
+    )
+    repo = SqliteGameRepository(db_path, flush_interval=flush_interval)
+    shoes = ShoeManager(num_decks=num_decks, penetration=penetration)
+    events = FileGameEventLog(f"{event_log_path}.{index}") if event_log_path else None
+    use_case = GameUseCase(repo, shoes=shoes, events=events)
+    # channel_id -> lần có yêu cầu cuối, xếp từ kênh lâu không hoạt động nhất
+    active: OrderedDict[int, float] = OrderedDict(
+        (game.channel_id, time.monotonic()) for game in repo.all_games()
+    )
+    next_flush = time.monotonic() + flush_interval
+    try:
+        while True:
+            if conn.poll(max(0.0, next_flush - time.monotonic())):
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+                conn.send(_handle(use_case, request))
+                method, channel_id = request[1], request[2]
+                if method == "evict":
+                    active.pop(channel_id, None)
+                elif channel_id is not None:
+                    _touch(active, channel_id, time.monotonic())
+                elif method == "restore":
+                    active = OrderedDict(
+                        (game.channel_id, time.monotonic()) for game in repo.all_games()
+                    )
+            if time.monotonic() >= next_flush:
+                if game_ttl:
+                    evicted = _evict_expired(
+                        use_case, active, time.monotonic() - game_ttl
+                    )
+                    if evicted:
+                        conn.send((None, None, None, None, evicted))
+                try:
+                    repo.flush()
+                except Exception as e:
+                    logger.warning(f"Lỗi ghi game xuống SQLite: {e}")
+                next_flush = time.monotonic() + flush_interval
+    finally:
+        repo.close()
+        shoes.close()
+        if events:
+            events.close()
+
+
+# --- Phía coordinator ---
+class _Shard:
+    __slots__ = ("index", "process", "conn", "pending", "ready", "restarting")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        # req_id -> future chờ trả lời
+        self.pending: dict[int, asyncio.Future] = {}
+        # Được set khi worker sẵn sàng nhận yêu cầu
+        self.ready = asyncio.Event()
+        self.restarting = False
+
+
+class ShardedGameUseCase(GameUseCase):
+    """GameUseCase chia kênh cho nhiều process worker.
+
+    join_game, start_new_game, player_action và end_game là coroutine (gọi qua
+    IPC); các phương thức còn lại và `repo` (bản sao các game) chạy tại chỗ.
+    Gọi `start()` trước khi dùng và `close()` khi tắt. max_games và game_ttl
+    giới hạn bản sao như MemoryGameRepository; worker cũng loại game theo
+    game_ttl, và game bị loại ở một bên được loại nốt ở bên kia.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        directory: str,
+        num_decks: int = 1,
+        penetration: float = 1.0,
+        flush_interval: float = 1.0,
+        event_log_path: str = "",
+        strategy: StrategyTable | None = None,
+        ledger: ChipLedger | None = None,
+        leaderboards: Leaderboards | None = None,
+        bet_monitor: BetSpreadMonitor | None = None,
+        max_games: int = 0,
+        game_ttl: float = 0.0,
+    ):
+        super().__init__(
+            MemoryGameRepository(max_games=max_games, ttl=game_ttl),
+            strategy=strategy,
+            ledger=ledger,
+            leaderboards=leaderboards,
+            bet_monitor=bet_monitor,
+        )
+        self.ring = HashRing(workers)
+        self.directory = directory
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.flush_interval = flush_interval
+        self.event_log_path = event_log_path
+        self.game_ttl = game_ttl
+        self.restarts = 0
+        # spawn: không fork một process đang chạy event loop và luồng nền
+        self._mp = multiprocessing.get_context("spawn")
+        self._shards = [_Shard(index) for index in range(workers)]
+        self._ids = itertools.count()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self.repo.add_eviction_listener(self._on_mirror_evicted)
+
+    def shard_of(self, channel_id: int) -> int:
+        return self.ring.node_for(channel_id)
+
+    # --- Vòng đời worker ---
+    def _db_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"shard-{index}.db")
+
+    def _load_orphans(self) -> list[str]:
+        """Nạp game từ file của các worker không còn (khi giảm số worker)."""
+        orphans = []
+        for name in sorted(os.listdir(self.directory)):
+            match = _SHARD_FILE.match(name)
+            if not match or int(match.group(1)) < len(self._shards):
+                continue
+            path = os.path.join(self.directory, name)
+            repo = SqliteGameRepository(path)
+            for game in repo.all_games():
+                if self.repo.get_game(game.channel_id) is None:
+                    self.repo.save_game(game)
+            repo.close()
+            orphans.append(path)
+        return orphans
+
+    def _spawn(self, shard: _Shard):
+        parent, child = self._mp.Pipe()
+        shard.process = self._mp.Process(
+            target=_worker_main,
+            args=(
+                child,
+                shard.index,
+                self._db_path(shard.index),
+                self.num_decks,
+                self.penetration,
+                self.flush_interval,
+                self.event_log_path,
+                logging.getLogger().level,
+                self.game_ttl,
+            ),
+            name=f"blackjack-shard-{shard.index}",
+            daemon=True,
+        )
+        shard.process.start()
+        # Đóng đầu pipe của worker ở đây để nhận EOF khi worker chết
+        child.close()
+        shard.conn = parent
+        self._loop.add_reader(parent.fileno(), self._on_readable, shard)
+
+    def _detach(self, shard: _Shard):
+        """Ngắt kết nối với worker; các yêu cầu đang chờ nhận WorkerLost."""
+        shard.ready.clear()
+        if shard.conn is not None:
+            self._loop.remove_reader(shard.conn.fileno())
+            shard.conn.close()
+            shard.conn = None
+        pending, shard.pending = shard.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(
+                    WorkerLost("Máy chủ game đang khởi động lại, vui lòng thử lại.")
+                )
+
+    async def _join_process(self, shard: _Shard):
+        process = shard.process
+        if process is None:
+            return
+        await self._loop.run_in_executor(None, process.join, 5.0)
+        if process.is_alive():
+            logger.warning(f"Worker {shard.index} không tự dừng, buộc dừng.")
+            process.kill()
+            await self._loop.run_in_executor(None, process.join)
+
+    def _shard_snapshots(self, shard: _Shard) -> list[bytes]:
+        return [
+            encode_game(game)
+            for game in self.repo.all_games()
+            if self.ring.node_for(game.channel_id) == shard.index
+        ]
+
+    async def _respawn(self, shard: _Shard, delay: float = 0.0):
+        """Khởi động lại worker và nạp lại game của nó từ bản sao."""
+        shard.restarting = True
+        try:
+            await self._join_process(shard)
+            while not self._closing:
+                await asyncio.sleep(delay)
+                self._spawn(shard)
+                try:
+                    _, count = await self._send(
+                        shard, "restore", None, self._shard_snapshots(shard)
+                    )
+                except WorkerLost:
+                    self._detach(shard)
+                    await self._join_process(shard)
+                    delay = RESTART_DELAY
+                    continue
+                self.restarts += 1
+                logger.info(f"Worker {shard.index} đã khởi động lại với {count} game.")
+                shard.ready.set()
+                return
+        finally:
+            shard.restarting = False
+
+    def _on_worker_lost(self, shard: _Shard):
+        exitcode = shard.process.exitcode if shard.process else None
+        self._detach(shard)
+        if self._closing or shard.restarting:
+            return
+        logger.error(f"Worker {shard.index} đã dừng (exit code {exitcode}).")
+        task = self._loop.create_task(self._respawn(shard, RESTART_DELAY))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self):
+        """Chạy các worker, gom game đã lưu của chúng rồi chia lại theo vòng băm.
+
+        Nhờ vậy đổi số worker vẫn giữ được mọi game (game chuyển sang worker mới).
+        """
+        self._loop = asyncio.get_running_loop()
+        os.makedirs(self.directory, exist_ok=True)
+        for shard in self._shards:
+            self._spawn(shard)
+        dumps = await asyncio.gather(
+            *(self._send(shard, "dump", None) for shard in self._shards)
+        )
+        for _, snapshots in dumps:
+            for data in snapshots:
+                self.repo.save_game(decode_game(data))
+        orphans = self._load_orphans()
+        await asyncio.gather(
+            *(
+                self._send(shard, "restore", None, self._shard_snapshots(shard))
+                for shard in self._shards
+            )
+        )
+        # Game của worker cũ đã được ghi vào file của worker mới
+        for path in orphans:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            logger.info(f"Đã chuyển game từ {path} sang các worker hiện tại.")
+        for shard in self._shards:
+            shard.ready.set()
+        logger.info(
+            f"Đã chạy {len(self._shards)} worker với "
+            f"{sum(1 for _ in self.repo.all_games())} game."
+        )
+
+    async def restart_worker(self, index: int):
+        """Khởi động lại một worker (sau khi xong các yêu cầu đang chạy)."""
+        shard = self._shards[index]
+        await shard.ready.wait()
+        shard.ready.clear()
+        shard.restarting = True
+        await asyncio.gather(*shard.pending.values(), return_exceptions=True)
+        self._detach(shard)
+        await self._respawn(shard)
+
+    def close(self):
+        """Đóng pipe (worker ghi nốt game rồi tự dừng) và chờ các worker."""
+        self._closing = True
+        for task in self._tasks:
+            task.cancel()
+        for shard in self._shards:
+            self._detach(shard)
+        for shard in self._shards:
+            if shard.process is None:
+                continue
+            shard.process.join(5.0)
+            if shard.process.is_alive():
+                logger.warning(f"Worker {shard.index} không tự dừng, buộc dừng.")
+                shard.process.kill()
+
+    # --- IPC ---
+    def _on_readable(self, shard: _Shard):
+        conn = shard.conn
+        try:
+            while conn.poll():
+                req_id, error, channel_id, data, extra = conn.recv()
+                if req_id is None:
+                    self._on_worker_evicted(extra)
+                    continue
+                future = shard.pending.pop(req_id, None)
+                if error is not None:
+                    if future is not None and not future.done():
+                        future.set_exception(_ERRORS[error[0]](error[1]))
+                    continue
+                # Cập nhật bản sao ngay cả khi người gọi đã bỏ chờ
+                game = self._apply(channel_id, data) if channel_id is not None else None
+                if future is not None and not future.done():
+                    future.set_result((game, extra))
+        except (EOFError, OSError):
+            self._on_worker_lost(shard)
+
+    def _apply(self, channel_id: int, data: Optional[bytes]) -> Optional[Game]:
+        if data is None:
+            self.repo.delete_game(channel_id)
+            return None
+        game = decode_game(data)
+        self.repo.save_game(game)
+        return game
+
+    def _on_worker_evicted(self, channel_ids: list[int]):
+        """Worker đã loại các game quá TTL: loại bản sao và báo cho listener."""
+        for channel_id in channel_ids:
+            self.repo.evict(channel_id, EVICT_WORKER)
+
+    def _on_mirror_evicted(self, channel_id: int, game: Game, reason: str):
+        """Bản sao đã loại game: yêu cầu worker của kênh loại theo."""
+        if reason == EVICT_WORKER:
+            return
+        shard = self._shards[self.ring.node_for(channel_id)]
+        if not shard.ready.is_set():
+            # Worker đang nạp lại từ bản sao (hoặc chưa chạy) nên sẽ không có game này
+            return
+        try:
+            # Gửi ngay (không chờ trả lời) để đi trước mọi yêu cầu sau đó của kênh
+            self._post(shard, "evict", channel_id).add_done_callback(_ignore_result)
+        except WorkerLost:
+            pass
+
+    def _post(
+        self, shard: _Shard, method: str, channel_id: Optional[int], *args
+    ) -> asyncio.Future:
+        """Gửi yêu cầu cho worker; trả về Future chờ trả lời."""
+        if shard.conn is None:
+            raise WorkerLost("Máy chủ game đang khởi động lại, vui lòng thử lại.")
+        req_id = next(self._ids)
+        future = self._loop.create_future()
+        shard.pending[req_id] = future
+        try:
+            shard.conn.send((req_id, method, channel_id, args))
+        except OSError:
+            shard.pending.pop(req_id, None)
+            raise WorkerLost("Máy chủ game đang khởi động lại, vui lòng thử lại.")
+        return future
+
+    async def _send(
+        self, shard: _Shard, method: str, channel_id: Optional[int], *args
+    ) -> Any:
+        return await self._post(shard, method, channel_id, *args)
+
+    async def _request(self, channel_id: int, method: str, *args) -> tuple:
+        """Gửi yêu cầu cho worker của kênh; trả về (game sau khi xử lý, kết quả phụ)."""
+        shard = self._shards[self.ring.node_for(channel_id)]
+        await shard.ready.wait()
+        return await self._send(shard, method, channel_id, *args)
+
+    # --- Các hành động game ---
+    async def join_game(
+        self, channel_id: int, user_id: int, user_name: str, bet: int | None = None
+    ) -> tuple[Game, bool]:
+        game = self.repo.get_game(channel_id)
+        if game and game.state != GameState.WAITING_FOR_PLAYERS:
+            raise RuntimeError("Ván chơi đã bắt đầu, không thể tham gia.")
+        if game and user_id in game.players:
+            return game, False
+        if self.ledger:
+            if bet is None:
+                bet = self.ledger.default_bet
+            self.ledger.place_bet(channel_id, user_id, bet)
+        try:
+            game, (joined, true_count) = await self._request(
+                channel_id, "join", user_id, user_name, bet if self.ledger else 0
+            )
+        except Exception:
+            if self.ledger:
+                self.ledger.cancel_bet(channel_id, user_id)
+            raise
+        if joined and self.ledger and self.bet_monitor:
+            self.bet_monitor.record(user_id, true_count, bet)
+        return game, joined
+
+    async def get_shoe_stats(self, channel_id: int) -> ShoeStats:
+        # Shoe của kênh nằm ở worker (phòng chờ không có trong snapshot)
+        _, stats = await self._request(channel_id, "shoe")
+        return stats
+
+    async def start_new_game(
+        self,
+        channel_id: int,
+        players: dict[int, str],
+        seed: int | None = None,
+        guild_id: int = GLOBAL,
+    ) -> Game:
+        game, _ = await self._request(channel_id, "start", players, seed, guild_id)
+        self._finish_if_over(game)
+        return game
+
+    async def player_action(
+        self, channel_id: int, user_id: int, action: str, timed_out: bool = False
+    ) -> Game:
+        game, _ = await self._request(channel_id, "action", user_id, action, timed_out)
+        self._finish_if_over(game)
+        return game
+
+    async def end_game(self, channel_id: int):
+        # Bản sao là nguồn gốc khi khôi phục worker, nên xóa ở đây trước: worker có
+        # chết giữa chừng thì lần khôi phục cũng bỏ game này
+        self.repo.delete_game(channel_id)
+        if self.ledger:
+            self.ledger.release(channel_id)
+        if self.leaderboards:
+            self.leaderboards.forget(channel_id)
+        try:
+            await self._request(channel_id, "end")
+        except WorkerLost:
+            pass
@@ -0,0 +1,76 @@
+# ==============================================================================
+# File: blackjack/adapters/sqlite_ledger.py
+# Mô tả: Lớp Adapter - Triển khai ILedgerStore trên SQLite (WAL). Mỗi lô thanh
+# toán là một transaction; bảng settlements có khóa chính (round_id, user_id)
+# nên INSERT OR IGNORE cho biết lần thanh toán nào là mới, và chỉ lần mới mới
+# được cộng vào số dư.
+# ==============================================================================
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from ..interfaces import ILedgerStore
+
+
+class SqliteLedgerStore(ILedgerStore):
+    """Lưu số dư chip và lịch sử thanh toán trong SQLite."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS balances ("
+            " user_id INTEGER PRIMARY KEY,"
+            " chips INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS settlements ("
+            " round_id TEXT NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " delta INTEGER NOT NULL,"
+            " settled_at REAL NOT NULL,"
+            " PRIMARY KEY (round_id, user_id))"
+        )
+        # Khóa bảo vệ kết nối khi ghi từ luồng executor
+        self._lock = threading.Lock()
+
+    def get_balance(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chips FROM balances WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, settlements: list[tuple[str, int, int]], starting_chips: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for round_id, user_id, delta in settlements:
+                    inserted = self._conn.execute(
+                        "INSERT OR IGNORE INTO settlements"
+                        " (round_id, user_id, delta, settled_at) VALUES (?, ?, ?, ?)",
+                        (round_id, user_id, delta, now),
+                    ).rowcount
+                    if not inserted:
+                        continue  # Đã thanh toán ở một lô trước
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO balances (user_id, chips) VALUES (?, ?)",
+                        (user_id, starting_chips),
+                    )
+                    self._conn.execute(
+                        "UPDATE balances SET chips = chips + ? WHERE user_id = ?",
+                        (delta, user_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
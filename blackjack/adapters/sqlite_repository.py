@@ -0,0 +1,133 @@
+# ==============================================================================
+# File: blackjack/adapters/sqlite_repository.py
+# Mô tả: Lớp Adapter - Triển khai IGameRepository lưu game vào SQLite (WAL).
+# Mọi lần đọc đều lấy từ cache trong bộ nhớ; các lần save_game chỉ đánh dấu
+# "bẩn" và được gom lại ghi xuống đĩa theo lô định kỳ (write-behind).
+# ==============================================================================
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from ..entities import Game
+from ..interfaces import IGameRepository
+from ..snapshot import decode_game, encode_game
+
+logger = logging.getLogger("blackjack-bot.sqlite")
+
+
+class SqliteGameRepository(IGameRepository):
+    """Lưu trữ game trong SQLite, đọc từ cache nóng và ghi trễ theo lô."""
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS games ("
+            " channel_id INTEGER PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        # Khóa bảo vệ kết nối khi ghi từ luồng executor
+        self._lock = threading.Lock()
+        self._games: Dict[int, Game] = self._load_all()
+        # channel_id -> Game cần ghi, hoặc None nếu cần xóa
+        self._dirty: Dict[int, Optional[Game]] = {}
+
+    def _load_all(self) -> Dict[int, Game]:
+        games = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT channel_id, data FROM games").fetchall()
+        for channel_id, data in rows:
+            try:
+                games[channel_id] = decode_game(data)
+            except Exception as e:
+                logger.warning(f"Bỏ qua game lỗi ở channel {channel_id}: {e}")
+        logger.info(f"Đã nạp {len(games)} game từ SQLite.")
+        return games
+
+    def get_game(self, channel_id: int) -> Optional[Game]:
+        return self._games.get(channel_id)
+
+    def save_game(self, game: Game):
+        self._games[game.channel_id] = game
+        self._dirty[game.channel_id] = game
+
+    def delete_game(self, channel_id: int):
+        self._games.pop(channel_id, None)
+        self._dirty[channel_id] = None
+
+    def all_games(self) -> Iterable[Game]:
+        return self._games.values()
+
+    def _collect(self) -> list[tuple[int, Optional[bytes]]]:
+        """Lấy các thay đổi đang chờ và mã hóa ngay trên luồng gọi (event loop)."""
+        dirty, self._dirty = self._dirty, {}
+        return [
+            (channel_id, encode_game(game) if game is not None else None)
+            for channel_id, game in dirty.items()
+        ]
+
+    def _write(self, batch: list[tuple[int, Optional[bytes]]]):
+        """Ghi một lô thay đổi trong một transaction duy nhất."""
+        now = time.time()
+        upserts = [(cid, data, now) for cid, data in batch if data is not None]
+        deletes = [(cid,) for cid, data in batch if data is None]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO games (channel_id, data, updated_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(channel_id) DO UPDATE SET"
+                    " data = excluded.data, updated_at = excluded.updated_at",
+                    upserts,
+                )
+                self._conn.executemany(
+                    "DELETE FROM games WHERE channel_id = ?", deletes
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _requeue(self, batch: list[tuple[int, Optional[bytes]]]):
+        """Đưa lại các thay đổi ghi lỗi vào hàng chờ (trừ khi đã có bản mới hơn)."""
+        for channel_id, _ in batch:
+            self._dirty.setdefault(channel_id, self._games.get(channel_id))
+
+    def flush(self):
+        """Ghi ngay mọi thay đổi đang chờ (đồng bộ)."""
+        batch = self._collect()
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except sqlite3.Error:
+            self._requeue(batch)
+            raise
+
+    async def run_flusher(self):
+        """Vòng lặp nền: định kỳ ghi các thay đổi đang chờ trong executor."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                await loop.run_in_executor(None, self._write, batch)
+            except sqlite3.Error as e:
+                logger.warning(f"Lỗi ghi {len(batch)} game xuống SQLite: {e}")
+                self._requeue(batch)
+
+    def close(self):
+        """Ghi nốt các thay đổi và đóng kết nối."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,64 @@
+# ==============================================================================
+# File: blackjack/adapters/sqlite_stats.py
+# Mô tả: Lớp Adapter - Triển khai IStatsStore trên SQLite (WAL): thành tích
+# người chơi theo (guild_id, user_id), ghi theo lô trong một transaction.
+# ==============================================================================
+import sqlite3
+import threading
+from typing import Iterable
+
+from ..interfaces import IStatsStore
+
+
+class SqliteStatsStore(IStatsStore):
+    """Lưu thành tích người chơi (cho bảng xếp hạng) trong SQLite."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS player_stats ("
+            " guild_id INTEGER NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " name TEXT NOT NULL,"
+            " wins INTEGER NOT NULL,"
+            " losses INTEGER NOT NULL,"
+            " pushes INTEGER NOT NULL,"
+            " chips INTEGER NOT NULL,"
+            " PRIMARY KEY (guild_id, user_id))"
+        )
+        # Khóa bảo vệ kết nối khi ghi từ luồng executor
+        self._lock = threading.Lock()
+
+    def load_all(self) -> Iterable[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT guild_id, user_id, name, wins, losses, pushes, chips"
+                " FROM player_stats"
+            ).fetchall()
+
+    def save(self, rows: list[tuple]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO player_stats"
+                    " (guild_id, user_id, name, wins, losses, pushes, chips)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(guild_id, user_id) DO UPDATE SET"
+                    " name = excluded.name, wins = excluded.wins,"
+                    " losses = excluded.losses, pushes = excluded.pushes,"
+                    " chips = excluded.chips",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
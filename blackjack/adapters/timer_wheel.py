@@ -0,0 +1,154 @@
+# ==============================================================================
+# File: blackjack/adapters/timer_wheel.py
+# Mô tả: Bộ hẹn giờ dạng bánh xe phân cấp (hierarchical timer wheel) chạy trên
+# asyncio. Chỉ có một task điều khiển cho mọi timeout; đặt và hủy hẹn giờ là
+# O(1), không phải tạo/hủy một asyncio.Task cho mỗi lần đổi lượt.
+# ==============================================================================
+import asyncio
+import inspect
+import logging
+import math
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("blackjack-bot.timers")
+
+
+class TimerHandle:
+    """Một hẹn giờ đã đặt; gọi cancel() để hủy (giống asyncio.Task.cancel)."""
+
+    __slots__ = ("deadline", "callback", "args", "_wheel", "_bucket")
+
+    def __init__(self, wheel: "TimerWheel", deadline: int, callback, args):
+        self.deadline = deadline  # tính bằng tick
+        self.callback = callback
+        self.args = args
+        self._wheel = wheel
+        self._bucket: Optional[set] = None
+
+    def cancel(self) -> bool:
+        """Hủy hẹn giờ; trả về False nếu đã chạy hoặc đã hủy trước đó."""
+        if self._bucket is None:
+            return False
+        self._bucket.discard(self)
+        self._bucket = None
+        self._wheel._count -= 1
+        return True
+
+    def pending(self) -> bool:
+        return self._bucket is not None
+
+
+class TimerWheel:
+    """Bánh xe hẹn giờ nhiều tầng: tầng L có `slots` ô, mỗi ô rộng slots**L tick."""
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._spans = [slots**level for level in range(levels + 1)]
+        self._current = 0  # tick đã xử lý gần nhất
+        self._origin = 0.0  # thời điểm (loop.time) của tick 0
+        self._count = 0
+        self._driver: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        """Số hẹn giờ đang chờ."""
+        return self._count
+
+    def schedule(
+        self, delay: float, callback: Callable[..., Any], *args
+    ) -> TimerHandle:
+        """Gọi callback(*args) sau ít nhất `delay` giây; callback có thể là coroutine."""
+        loop = asyncio.get_running_loop()
+        if self._driver is None or self._driver.done():
+            # Bánh xe đang rảnh: đặt lại gốc thời gian theo tick hiện tại.
+            self._origin = loop.time() - self._current * self.tick
+            self._driver = loop.create_task(self._drive())
+
+        deadline = math.ceil((loop.time() + delay - self._origin) / self.tick)
+        deadline = max(deadline, self._current + 1)
+        if deadline - self._current >= self._spans[self.levels]:
+            raise ValueError("Thời gian hẹn vượt quá phạm vi của bánh xe.")
+
+        handle = TimerHandle(self, deadline, callback, args)
+        self._place(handle)
+        self._count += 1
+        return handle
+
+    def _place(self, handle: TimerHandle):
+        """Đặt hẹn giờ vào tầng thấp nhất mà tick hiện tại và hạn cùng khối."""
+        for level in range(self.levels):
+            block = self._spans[level + 1]
+            if handle.deadline // block == self._current // block:
+                break
+        index = (handle.deadline // self._spans[level]) % self.slots
+        bucket = self._wheels[level][index]
+        bucket.add(handle)
+        handle._bucket = bucket
+
+    def _advance(self):
+        """Xử lý tick kế tiếp: hạ các ô tầng cao xuống, rồi chạy các hẹn giờ đến hạn."""
+        self._current += 1
+        now = self._current
+        for level in range(self.levels - 1, 0, -1):
+            if now % self._spans[level]:
+                continue
+            index = (now // self._spans[level]) % self.slots
+            bucket = self._wheels[level][index]
+            self._wheels[level][index] = set()
+            for handle in bucket:
+                self._place(handle)
+
+        index = now % self.slots
+        due = self._wheels[0][index]
+        if not due:
+            return
+        self._wheels[0][index] = set()
+        for handle in due:
+            handle._bucket = None
+            self._count -= 1
+            self._fire(handle)
+
+    def _fire(self, handle: TimerHandle):
+        try:
+            result = handle.callback(*handle.args)
+        except Exception:
+            logger.exception("Lỗi khi chạy hẹn giờ")
+            return
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._running.add(task)
+            task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Lỗi khi chạy hẹn giờ", exc_info=task.exception())
+
+    async def _drive(self):
+        """Task điều khiển duy nhất: thức dậy mỗi tick, tự dừng khi không còn hẹn."""
+        loop = asyncio.get_running_loop()
+        while self._count:
+            next_tick = self._origin + (self._current + 1) * self.tick
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Bắt kịp nếu event loop bị trễ nhiều tick.
+            target = int((loop.time() - self._origin) / self.tick)
+            while self._current < target and self._count:
+                self._advance()
+            if self._current < target:
+                self._current = target
+
+    def close(self):
+        """Dừng task điều khiển và bỏ mọi hẹn giờ đang chờ."""
+        if self._driver:
+            self._driver.cancel()
+        for wheel in self._wheels:
+            for bucket in wheel:
+                for handle in bucket:
+                    handle._bucket = None
+                bucket.clear()
+        self._count = 0
@@ -4,7 +4,9 @@
 # Hoàn toàn không phụ thuộc vào Discord hay bất kỳ framework nào khác.
 # ==============================================================================
 import random
+import uuid
 from enum import Enum
+from itertools import count
 
 # --- Enums and Constants ---
 
@@ -27,6 +29,38 @@ VALUES = {
 }
 
 
+# --- Bảng tra cứu cho biểu diễn nén ---
+# Mỗi lá bài được mã hóa bằng một số nguyên 0..51: code = suit_index * 13 + rank_index.
+# Thứ tự này trùng với thứ tự tạo bộ bài [Card(s, r) for s in SUITS for r in RANKS].
+
+NUM_CARD_CODES = len(SUITS) * len(RANKS)
+CARD_VALUES = bytes(VALUES[RANKS[code % 13]] for code in range(NUM_CARD_CODES))
+CARD_IS_ACE = bytes(RANKS[code % 13] == "A" for code in range(NUM_CARD_CODES))
+_FULL_DECK = bytes(range(NUM_CARD_CODES))
+
+# Thành phần shoe theo loại điểm: số lá có giá trị 2, 3, ..., 10, Át (11).
+NUM_VALUE_CLASSES = 10
+DECK_COMPOSITION = (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+# Mã lá bài -> chỉ số loại điểm (0..9), đệm đủ 256 byte để dùng với bytes.translate
+VALUE_CLASS = bytes(CARD_VALUES[code] - 2 for code in range(NUM_CARD_CODES)) + bytes(
+    256 - NUM_CARD_CODES
+)
+
+
+def hilo_running_count(composition) -> int:
+    """Hi-Lo running count (lá thấp 2-6 +1, lá cao 10/Át -1) theo bài còn lại.
+
+    Shoe đầy có số lá thấp bằng số lá cao, nên count của các lá đã chia chính
+    là số lá cao còn lại trừ số lá thấp còn lại.
+    """
+    return composition[8] + composition[9] - sum(composition[:5])
+
+
+# Bộ đếm phiên bản dùng chung cho mọi Hand: mỗi lần tay bài thay đổi sẽ nhận một
+# số mới chưa từng dùng, nên phiên bản có thể làm khóa cache hiển thị.
+_HAND_VERSIONS = count(1)
+
+
 class GameState(Enum):
     WAITING_FOR_PLAYERS = 1
     PLAYERS_TURN = 2
@@ -44,52 +78,226 @@ class GameResult(Enum):
 
 
 class Card:
-    """Đại diện cho một lá bài."""
+    """Đại diện cho một lá bài.
+
+    Trong game, lá bài được lưu dưới dạng mã số (xem CARD_VALUES); Card chỉ là
+    một "flyweight" dùng chung để hiển thị, lấy qua Card.from_code().
+    """
+
+    __slots__ = ("suit", "rank", "value", "code")
 
     def __init__(self, suit: str, rank: str):
         self.suit = suit
         self.rank = rank
         self.value = VALUES[rank]
+        self.code = SUITS.index(suit) * len(RANKS) + RANKS.index(rank)
+
+    @staticmethod
+    def from_code(code: int) -> "Card":
+        """Lấy lá bài dùng chung ứng với mã số."""
+        return _CARDS[code]
 
     def __str__(self):
         return f"{self.rank}{self.suit}"
 
 
-class Deck:
-    """Đại diện cho một bộ bài."""
+# Mỗi mã số chỉ có đúng một đối tượng Card, tạo một lần khi import.
+_CARDS = tuple(Card(s, r) for s in SUITS for r in RANKS)
+
 
-    def __init__(self, num_decks: int = 1):
-        self.cards = [Card(s, r) for s in SUITS for r in RANKS] * num_decks
+class Deck:
+    """Đại diện cho một bộ bài (shoe), lưu dưới dạng bytearray các mã lá bài.
+
+    penetration là tỉ lệ số lá được chia trước khi chạm lá cắt; sau đó shoe
+    chỉ nên được thay giữa hai ván (xem needs_shuffle).
+    """
+
+    __slots__ = ("cards", "num_decks", "cut_card", "seed", "shuffles", "rng", "counts")
+
+    def __init__(
+        self, num_decks: int = 1, penetration: float = 1.0, seed: int | None = None
+    ):
+        if num_decks < 1:
+            raise ValueError("Số bộ bài phải lớn hơn 0.")
+        if not 0.0 < penetration <= 1.0:
+            raise ValueError("Penetration phải nằm trong khoảng (0, 1].")
+        self.num_decks = num_decks
+        self.cards = bytearray(_FULL_DECK * num_decks)
+        # Số lá còn lại trong shoe tại vị trí lá cắt
+        self.cut_card = len(self.cards) - int(len(self.cards) * penetration)
+        self._init_rng(seed, 0)
+        self._fill_counts()
         self.shuffle()
 
+    @classmethod
+    def restore(
+        cls,
+        num_decks: int,
+        cut_card: int,
+        cards: bytes,
+        seed: int | None = None,
+        shuffles: int = 0,
+    ) -> "Deck":
+        """Dựng lại một shoe đã lưu mà không xáo lại."""
+        deck = cls.__new__(cls)
+        deck.num_decks = num_decks
+        deck.cut_card = cut_card
+        deck.cards = bytearray(cards)
+        deck._init_rng(seed, shuffles)
+        deck.counts = None  # đếm lại khi cần (xem composition)
+        return deck
+
+    def _init_rng(self, seed: int | None, shuffles: int):
+        # Mỗi shoe có bộ sinh số ngẫu nhiên riêng và ghi lại seed để phát lại
+        if seed is None:
+            seed = random.getrandbits(64)
+        elif not 0 <= seed < 1 << 64:
+            raise ValueError("Seed phải là số nguyên không âm 64 bit.")
+        self.seed = seed
+        self.shuffles = shuffles
+        self.rng: random.Random | None = None  # tạo khi xáo lần đầu
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """Đã chạm lá cắt, cần thay shoe mới trước ván tiếp theo."""
+        return len(self.cards) <= self.cut_card
+
     def shuffle(self):
-        """Xáo trộn bộ bài."""
-        random.shuffle(self.cards)
+        """Xáo trộn bộ bài.
+
+        Lần xáo thứ n dùng seed (seed, n), nên (seed, shuffles) đủ để tái hiện mọi
+        lần xáo về sau, kể cả khi shoe hết bài giữa ván.
+        """
+        if self.rng is None:
+            self.rng = random.Random()
+        self.rng.seed(self.seed << 32 | self.shuffles)
+        self.rng.shuffle(self.cards)
+        self.shuffles += 1
+
+    def deal_code(self) -> int:
+        """Rút một lá bài, trả về mã số (không cấp phát đối tượng mới)."""
+        if not self.cards:
+            # Tự động tạo và xáo trộn lại bộ bài nếu hết bài giữa ván
+            self.cards = bytearray(_FULL_DECK * self.num_decks)
+            self._fill_counts()
+            self.shuffle()
+        code = self.cards.pop()
+        counts = self.counts
+        if counts is not None:
+            counts[VALUE_CLASS[code]] -= 1
+        return code
 
     def deal(self) -> Card:
         """Rút một lá bài từ bộ bài."""
+        return _CARDS[self.deal_code()]
+
+    def _fill_counts(self):
+        self.counts = [n * self.num_decks for n in DECK_COMPOSITION]
+
+    @property
+    def composition(self) -> tuple[int, ...]:
+        """Số lá còn lại theo loại điểm (2..10, Át), cập nhật dần mỗi lần chia.
+
+        Shoe vừa khôi phục hoặc bị gán cards trực tiếp được đếm lại một lần.
+        """
+        counts = self.counts
+        if counts is None:
+            classes = bytes(self.cards).translate(VALUE_CLASS)
+            counts = self.counts = [classes.count(i) for i in range(NUM_VALUE_CLASSES)]
+        return tuple(counts)
+
+    @property
+    def running_count(self) -> int:
+        """Hi-Lo running count của các lá đã chia từ lần xáo gần nhất."""
+        return hilo_running_count(self.composition)
+
+    @property
+    def true_count(self) -> float:
+        """Running count chia cho số bộ bài còn lại."""
         if not self.cards:
-            # Tự động tạo và xáo trộn lại bộ bài nếu hết bài
-            self.cards = [Card(s, r) for s in SUITS for r in RANKS]
-            self.shuffle()
-        return self.cards.pop()
+            return 0.0
+        return self.running_count * NUM_CARD_CODES / len(self.cards)
+
+    def stats(self) -> "ShoeStats":
+        """Ảnh chụp thống kê hiện tại của shoe (gửi được qua tiến trình khác)."""
+        return ShoeStats(
+            self.num_decks, len(self.cards), self.cut_card, self.composition
+        )
+
+
+class ShoeStats:
+    """Thống kê một shoe: số lá còn lại, thành phần và Hi-Lo count."""
+
+    __slots__ = ("num_decks", "remaining", "cut_card", "composition")
+
+    def __init__(
+        self,
+        num_decks: int,
+        remaining: int,
+        cut_card: int,
+        composition: tuple[int, ...],
+    ):
+        self.num_decks = num_decks
+        self.remaining = remaining
+        self.cut_card = cut_card
+        self.composition = composition
+
+    @property
+    def total(self) -> int:
+        return self.num_decks * NUM_CARD_CODES
+
+    @property
+    def dealt_ratio(self) -> float:
+        """Tỉ lệ số lá đã chia của shoe."""
+        return 1 - self.remaining / self.total
+
+    @property
+    def penetration(self) -> float:
+        """Tỉ lệ số lá được chia trước lá cắt."""
+        return 1 - self.cut_card / self.total
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.remaining <= self.cut_card
+
+    @property
+    def running_count(self) -> int:
+        return hilo_running_count(self.composition)
+
+    @property
+    def true_count(self) -> float:
+        if not self.remaining:
+            return 0.0
+        return self.running_count * NUM_CARD_CODES / self.remaining
 
 
 class Hand:
     """Đại diện cho bài trên tay của một người chơi."""
 
+    __slots__ = ("codes", "value", "aces", "version")
+
     def __init__(self):
-        self.cards: list[Card] = []
+        self.codes = bytearray()
         self.value = 0
         self.aces = 0
+        self.version = next(_HAND_VERSIONS)
+
+    @property
+    def cards(self) -> list[Card]:
+        """Danh sách lá bài (flyweight) để hiển thị."""
+        return [_CARDS[code] for code in self.codes]
+
+    def add_code(self, code: int):
+        """Thêm một lá bài (theo mã số) vào tay."""
+        self.codes.append(code)
+        self.version = next(_HAND_VERSIONS)
+        self.value += CARD_VALUES[code]
+        self.aces += CARD_IS_ACE[code]
+        self.adjust_for_ace()
 
     def add_card(self, card: Card):
         """Thêm một lá bài vào tay."""
-        self.cards.append(card)
-        self.value += card.value
-        if card.rank == "A":
-            self.aces += 1
-        self.adjust_for_ace()
+        self.add_code(card.code)
 
     def adjust_for_ace(self):
         """Điều chỉnh giá trị nếu có Át và tổng điểm > 21."""
@@ -99,7 +307,7 @@ class Hand:
 
     def is_blackjack(self) -> bool:
         """Kiểm tra có phải là Blackjack (21 điểm với 2 lá)."""
-        return self.value == 21 and len(self.cards) == 2
+        return self.value == 21 and len(self.codes) == 2
 
 
 class Player:
@@ -110,6 +318,8 @@ class Player:
         self.name = name
         self.hand = Hand()
         self.is_standing = False
+        # Tiền cược đang giữ ở sổ cái chip (0 = không cược), lưu cùng snapshot
+        self.bet = 0
 
     def reset(self):
         """Reset lại tay bài và trạng thái của người chơi cho ván mới."""
@@ -120,15 +330,25 @@ class Player:
 class Game:
     """Quản lý trạng thái và logic của một ván Xì Dách."""
 
-    def __init__(self, channel_id: int):
+    def __init__(self, channel_id: int, deck: Deck | None = None):
         self.channel_id = channel_id
-        self.deck = Deck()
+        self.deck = deck if deck is not None else Deck()
         self.players: dict[int, Player] = {}
         self.dealer = Player(user_id=0, name="Nhà Cái")
         self.state = GameState.WAITING_FOR_PLAYERS
         self.current_player_index = -1
         self.results: dict[int, GameResult] = {}
         self.player_order: list[int] = []
+        # Mã ván (mới cho mỗi lần chia bài) và số chip thắng/thua của từng người
+        self.round_id = ""
+        self.payouts: dict[int, int] = {}
+        # Máy chủ (guild) của kênh, dùng cho bảng xếp hạng; 0 = không rõ
+        self.guild_id = 0
+
+    @property
+    def seed(self) -> int:
+        """Seed của shoe đang dùng; cùng seed và cùng chuỗi hành động cho cùng ván."""
+        return self.deck.seed
 
     def add_player(self, user_id: int, name: str):
         """Thêm người chơi mới vào ván."""
@@ -153,12 +373,14 @@ class Game:
             player.reset()
         self.dealer.reset()
         self.results = {}
+        self.payouts = {}
+        self.round_id = uuid.uuid4().hex
 
         # Chia bài
         for _ in range(2):
             for player_id in self.player_order:
-                self.players[player_id].hand.add_card(self.deck.deal())
-            self.dealer.hand.add_card(self.deck.deal())
+                self.players[player_id].hand.add_code(self.deck.deal_code())
+            self.dealer.hand.add_code(self.deck.deal_code())
 
         self._check_all_blackjacks()
 
@@ -178,7 +400,7 @@ class Game:
         if not player or self.get_current_player() != player:
             return False  # Không phải lượt của người này
 
-        player.hand.add_card(self.deck.deal())
+        player.hand.add_code(self.deck.deal_code())
         if player.hand.value >= 21:
             self._next_player_turn()
         return True
@@ -225,7 +447,7 @@ class Game:
         self.state = GameState.DEALER_TURN
         # Nhà cái rút bài cho đến khi đạt 17 điểm trở lên
         while self.dealer.hand.value < 17:
-            self.dealer.hand.add_card(self.deck.deal())
+            self.dealer.hand.add_code(self.deck.deal_code())
         self._end_game()
 
     def _end_game(self):
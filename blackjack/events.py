@@ -0,0 +1,167 @@
+# ==============================================================================
+# File: blackjack/events.py
+# Mô tả: Sự kiện của game (event sourcing). Mỗi thay đổi trạng thái (join,
+# start kèm thứ tự shoe đã xáo, hit, stand, tự stand do hết giờ, end) là một
+# bản ghi nhị phân có tiền tố độ dài; Game được dựng lại bằng cách phát lại
+# (replay) các sự kiện của kênh.
+#
+# Bố cục bản ghi (little-endian):
+#   độ dài phần sau (I), loại (B), channel_id (Q), user_id (Q), thời điểm (d),
+#   payload:
+#     JOIN  : tên UTF-8
+#     START : số người chơi (H), [id (Q), độ dài tên (H), tên]...,
+#             num_decks (B), cut_card (H), số lá (H), các mã lá (trước khi chia),
+#             seed (Q), số lần đã xáo (I) của shoe
+#     khác  : rỗng
+# ==============================================================================
+import struct
+import time
+from enum import IntEnum
+from typing import Iterable, Optional
+
+from .entities import Deck, Game, GameState
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<BQQd")
+_PLAYER = struct.Struct("<QH")
+_COUNT = struct.Struct("<H")
+_DECK = struct.Struct("<BHH")
+_SEED = struct.Struct("<QI")
+
+# Độ dài tối thiểu của phần sau tiền tố độ dài
+HEADER_SIZE = _HEADER.size
+LENGTH_SIZE = _LENGTH.size
+
+
+class EventType(IntEnum):
+    JOIN = 1
+    START = 2
+    HIT = 3
+    STAND = 4
+    TIMEOUT_STAND = 5
+    END = 6
+
+
+class GameEvent:
+    """Một sự kiện của game; payload là bytes đã mã hóa theo loại sự kiện."""
+
+    __slots__ = ("type", "channel_id", "user_id", "timestamp", "payload")
+
+    def __init__(
+        self,
+        type: EventType,
+        channel_id: int,
+        user_id: int = 0,
+        payload: bytes = b"",
+        timestamp: Optional[float] = None,
+    ):
+        self.type = type
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.payload = payload
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __repr__(self):
+        return (
+            f"GameEvent({self.type.name}, channel={self.channel_id}, "
+            f"user={self.user_id}, {len(self.payload)}B)"
+        )
+
+
+def join_event(channel_id: int, user_id: int, name: str) -> GameEvent:
+    return GameEvent(EventType.JOIN, channel_id, user_id, name.encode("utf-8"))
+
+
+def start_event(game: Game) -> GameEvent:
+    """Sự kiện START, phải tạo trước khi game.start_game() chia bài."""
+    parts = [_COUNT.pack(len(game.players))]
+    for player in game.players.values():
+        name = player.name.encode("utf-8")
+        parts.append(_PLAYER.pack(player.id, len(name)))
+        parts.append(name)
+    deck = game.deck
+    parts.append(_DECK.pack(deck.num_decks, deck.cut_card, len(deck.cards)))
+    parts.append(bytes(deck.cards))
+    parts.append(_SEED.pack(deck.seed, deck.shuffles))
+    return GameEvent(EventType.START, game.channel_id, payload=b"".join(parts))
+
+
+def decode_start(payload: bytes) -> tuple[list[tuple[int, str]], Deck]:
+    """Giải mã payload START thành (danh sách (id, tên) người chơi, shoe)."""
+    try:
+        (count,) = _COUNT.unpack_from(payload, 0)
+        offset = _COUNT.size
+        players = []
+        for _ in range(count):
+            user_id, name_len = _PLAYER.unpack_from(payload, offset)
+            offset += _PLAYER.size
+            name = payload[offset:offset + name_len].decode("utf-8")
+            offset += name_len
+            players.append((user_id, name))
+        num_decks, cut_card, num_cards = _DECK.unpack_from(payload, offset)
+        offset += _DECK.size
+        cards = payload[offset:offset + num_cards]
+        if len(cards) != num_cards:
+            raise ValueError("thiếu lá bài")
+        seed, shuffles = _SEED.unpack_from(payload, offset + num_cards)
+    except (struct.error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Sự kiện START bị hỏng: {e}") from e
+    return players, Deck.restore(num_decks, cut_card, cards, seed, shuffles)
+
+
+def encode_event(event: GameEvent) -> bytes:
+    """Mã hóa sự kiện thành một bản ghi có tiền tố độ dài."""
+    return (
+        _LENGTH.pack(HEADER_SIZE + len(event.payload))
+        + _HEADER.pack(event.type, event.channel_id, event.user_id, event.timestamp)
+        + event.payload
+    )
+
+
+def decode_header(buffer, offset: int) -> tuple[int, int, int, int, float]:
+    """Đọc (độ dài, loại, channel_id, user_id, thời điểm) của bản ghi tại offset."""
+    (length,) = _LENGTH.unpack_from(buffer, offset)
+    return (length, *_HEADER.unpack_from(buffer, offset + LENGTH_SIZE))
+
+
+def decode_event(buffer, offset: int) -> tuple[GameEvent, int]:
+    """Giải mã bản ghi tại offset; trả về (sự kiện, offset của bản ghi kế tiếp)."""
+    try:
+        length, type_, channel_id, user_id, timestamp = decode_header(buffer, offset)
+        event_type = EventType(type_)
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Bản ghi sự kiện tại {offset} bị hỏng: {e}") from e
+    end = offset + LENGTH_SIZE + length
+    if length < HEADER_SIZE or end > len(buffer):
+        raise ValueError(f"Bản ghi sự kiện tại {offset} bị cắt cụt.")
+    payload = bytes(buffer[offset + LENGTH_SIZE + HEADER_SIZE:end])
+    return GameEvent(event_type, channel_id, user_id, payload, timestamp), end
+
+
+def replay(events: Iterable[GameEvent]) -> Optional[Game]:
+    """Dựng lại Game của một kênh từ các sự kiện của kênh đó (theo thứ tự ghi).
+
+    Trả về None nếu ván cuối đã kết thúc bằng END.
+    """
+    game: Optional[Game] = None
+    for event in events:
+        kind = event.type
+        if kind == EventType.JOIN:
+            if game is None or game.state != GameState.WAITING_FOR_PLAYERS:
+                game = Game(event.channel_id)
+            game.add_player(event.user_id, event.payload.decode("utf-8"))
+        elif kind == EventType.START:
+            players, deck = decode_start(event.payload)
+            game = Game(event.channel_id, deck=deck)
+            for user_id, name in players:
+                game.add_player(user_id, name)
+            game.start_game()
+        elif kind == EventType.HIT:
+            if game is None or not game.player_hit(event.user_id):
+                raise ValueError(f"Không thể phát lại {event!r}.")
+        elif kind in (EventType.STAND, EventType.TIMEOUT_STAND):
+            if game is None or not game.player_stand(event.user_id):
+                raise ValueError(f"Không thể phát lại {event!r}.")
+        elif kind == EventType.END:
+            game = None
+    return game
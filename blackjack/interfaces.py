@@ -4,7 +4,7 @@
 # mà các lớp bên ngoài phải tuân theo. Điều này giúp đảo ngược sự phụ thuộc.
 # ==============================================================================
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
 
 
 # Forward declaration để tránh circular import
@@ -26,3 +26,63 @@ class IGameRepository(ABC):
     @abstractmethod
     def delete_game(self, channel_id: int):
         pass
+
+    @abstractmethod
+    def all_games(self) -> Iterable[Game]:
+        """Các game đang được lưu (dùng cho metrics, không nên sửa trong lúc duyệt)."""
+        pass
+
+
+class GameEvent:
+    pass
+
+
+class IGameEventLog(ABC):
+    """Giao diện cho nhật ký sự kiện game (chỉ ghi nối tiếp)."""
+
+    @abstractmethod
+    def append(self, event: GameEvent):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class ILedgerStore(ABC):
+    """Giao diện cho nơi lưu bền số dư chip và các lần thanh toán."""
+
+    @abstractmethod
+    def get_balance(self, user_id: int) -> Optional[int]:
+        """Số dư đã lưu của người chơi, None nếu chưa có."""
+        pass
+
+    @abstractmethod
+    def apply(self, settlements: list[tuple[str, int, int]], starting_chips: int):
+        """Ghi một lô (round_id, user_id, delta) trong một transaction.
+
+        Phải idempotent: một cặp (round_id, user_id) chỉ được cộng vào số dư một lần.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class IStatsStore(ABC):
+    """Giao diện cho nơi lưu bền thành tích người chơi (cho bảng xếp hạng)."""
+
+    @abstractmethod
+    def load_all(self) -> Iterable[tuple]:
+        """Mọi dòng (guild_id, user_id, name, wins, losses, pushes, chips)."""
+        pass
+
+    @abstractmethod
+    def save(self, rows: list[tuple]):
+        """Ghi đè (upsert) một lô dòng cùng định dạng với load_all()."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
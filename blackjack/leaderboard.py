@@ -0,0 +1,323 @@
+# ==============================================================================
+# File: blackjack/leaderboard.py
+# Mô tả: Bảng xếp hạng theo máy chủ (guild) và toàn cục, cập nhật dần sau mỗi
+# ván. Mỗi bảng là một skiplist có chỉ số (mỗi liên kết lưu số phần tử nó bỏ
+# qua), nên cập nhật điểm, lấy top-N và "hạng của tôi" đều là O(log n) thay vì
+# sắp xếp lại toàn bộ người chơi ở mỗi lần hỏi.
+# ==============================================================================
+import asyncio
+import logging
+import math
+import random
+from typing import Iterable, Optional
+
+from .entities import Game, GameResult
+from .interfaces import IStatsStore
+
+logger = logging.getLogger("blackjack-bot.leaderboard")
+
+WINS = "wins"
+CHIPS = "chips"
+METRICS = (WINS, CHIPS)
+# guild_id của bảng toàn cục
+GLOBAL = 0
+
+_MAX_LEVEL = 32
+_NIL_KEY = (math.inf,)
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: tuple, level: int):
+        self.key = key
+        self.next: list = [None] * level
+        # width[i]: số bước (theo thứ tự) từ nút này tới nút next[i]
+        self.width = [1] * level
+
+
+class RankedSet:
+    """Tập thành viên có điểm, xếp điểm giảm dần (hòa điểm thì id nhỏ đứng trước).
+
+    Skiplist có chỉ số: update/discard/rank/range đều O(log n) kỳ vọng.
+    """
+
+    def __init__(self, items: Iterable[tuple[int, int]] = (), seed=None):
+        self._rng = random.Random(seed)
+        self._scores: dict[int, int] = {}
+        self._nil = _Node(_NIL_KEY, 0)
+        self._head = _Node(None, _MAX_LEVEL)
+        self._build(items)
+
+    def _random_level(self) -> int:
+        # Phân phối hình học p = 1/2: số bit 1 liên tiếp ở cuối + 1
+        bits = self._rng.getrandbits(_MAX_LEVEL)
+        return min(_MAX_LEVEL, (~bits & (bits + 1)).bit_length())
+
+    def _build(self, items: Iterable[tuple[int, int]]):
+        """Dựng skiplist từ đầu trong O(n log n) (sắp xếp) thay vì chèn từng phần tử."""
+        scores = self._scores
+        scores.update(items)
+        head = self._head
+        last = [head] * _MAX_LEVEL
+        last_pos = [0] * _MAX_LEVEL
+        pos = 0
+        for pos, key in enumerate(sorted((-s, m) for m, s in scores.items()), 1):
+            node = _Node(key, self._random_level())
+            for level in range(len(node.next)):
+                prev = last[level]
+                prev.next[level] = node
+                prev.width[level] = pos - last_pos[level]
+                last[level] = node
+                last_pos[level] = pos
+        for level in range(_MAX_LEVEL):
+            last[level].next[level] = self._nil
+            last[level].width[level] = pos + 1 - last_pos[level]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, member: int) -> bool:
+        return member in self._scores
+
+    def score(self, member: int) -> Optional[int]:
+        return self._scores.get(member)
+
+    def _insert(self, key: tuple):
+        chain = [None] * _MAX_LEVEL
+        steps_at_level = [0] * _MAX_LEVEL
+        node = self._head
+        for level in range(_MAX_LEVEL - 1, -1, -1):
+            while node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        new = _Node(key, self._random_level())
+        steps = 0
+        for level in range(len(new.next)):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(new.next), _MAX_LEVEL):
+            chain[level].width[level] += 1
+
+    def _remove(self, key: tuple):
+        chain = [None] * _MAX_LEVEL
+        node = self._head
+        for level in range(_MAX_LEVEL - 1, -1, -1):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), _MAX_LEVEL):
+            chain[level].width[level] -= 1
+
+    def update(self, member: int, score: int):
+        """Đặt điểm của thành viên (thêm mới nếu chưa có)."""
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._remove((-old, member))
+        self._scores[member] = score
+        self._insert((-score, member))
+
+    def discard(self, member: int):
+        score = self._scores.pop(member, None)
+        if score is not None:
+            self._remove((-score, member))
+
+    def rank(self, member: int) -> Optional[int]:
+        """Hạng (tính từ 0) của thành viên, None nếu không có."""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = (-score, member)
+        node = self._head
+        pos = 0
+        for level in range(_MAX_LEVEL - 1, -1, -1):
+            while node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+        return pos
+
+    def range(self, start: int, stop: int) -> list[tuple[int, int]]:
+        """Các (thành viên, điểm) ở hạng [start, stop)."""
+        start = max(start, 0)
+        stop = min(stop, len(self._scores))
+        if start >= stop:
+            return []
+        # Tìm nút ở hạng start rồi đi tiếp theo tầng dưới cùng
+        node = self._head
+        remaining = start + 1
+        for level in range(_MAX_LEVEL - 1, -1, -1):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        result = []
+        for _ in range(stop - start):
+            score, member = node.key
+            result.append((member, -score))
+            node = node.next[0]
+        return result
+
+
+class PlayerStats:
+    """Thành tích của một người chơi trong một phạm vi (guild hoặc toàn cục)."""
+
+    __slots__ = ("name", "wins", "losses", "pushes", "chips")
+
+    def __init__(self, name: str, wins=0, losses=0, pushes=0, chips=0):
+        self.name = name
+        self.wins = wins
+        self.losses = losses
+        self.pushes = pushes
+        self.chips = chips  # Tổng chip thắng/thua
+
+    @property
+    def rounds(self) -> int:
+        return self.wins + self.losses + self.pushes
+
+
+class Leaderboards:
+    """Thành tích và bảng xếp hạng (theo số ván thắng và chip) của mọi phạm vi.
+
+    Thành tích đổi được ghi trễ xuống IStatsStore theo lô (nếu có).
+    """
+
+    def __init__(self, store: Optional[IStatsStore] = None, flush_interval=5.0):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._stats: dict[tuple[int, int], PlayerStats] = {}
+        self._boards: dict[tuple[int, str], RankedSet] = {}
+        # (guild_id, user_id) có thành tích chưa ghi xuống store
+        self._dirty: set[tuple[int, int]] = set()
+        # channel_id -> round_id đã ghi nhận gần nhất (ghi nhận mỗi ván một lần);
+        # chỉ giữ các kênh còn game, xem forget
+        self._recorded: dict[int, str] = {}
+        if store is not None:
+            self._load(store.load_all())
+
+    def _load(self, rows: Iterable[tuple]):
+        per_board: dict[tuple[int, str], list[tuple[int, int]]] = {}
+        for guild_id, user_id, name, wins, losses, pushes, chips in rows:
+            self._stats[(guild_id, user_id)] = PlayerStats(
+                name, wins, losses, pushes, chips
+            )
+            per_board.setdefault((guild_id, WINS), []).append((user_id, wins))
+            per_board.setdefault((guild_id, CHIPS), []).append((user_id, chips))
+        for board, items in per_board.items():
+            self._boards[board] = RankedSet(items)
+        logger.info(f"Đã nạp thành tích của {len(self._stats)} người chơi.")
+
+    def board(self, guild_id: int, metric: str) -> RankedSet:
+        if metric not in METRICS:
+            raise ValueError(
+                f"Tiêu chí xếp hạng phải là một trong {', '.join(METRICS)}."
+            )
+        ranked = self._boards.get((guild_id, metric))
+        if ranked is None:
+            ranked = self._boards[(guild_id, metric)] = RankedSet()
+        return ranked
+
+    def stats(self, guild_id: int, user_id: int) -> Optional[PlayerStats]:
+        return self._stats.get((guild_id, user_id))
+
+    def record(self, game: Game, guild_id: int = GLOBAL):
+        """Ghi nhận kết quả một ván đã kết thúc vào bảng của guild và toàn cục."""
+        if self._recorded.get(game.channel_id) == game.round_id:
+            return
+        self._recorded[game.channel_id] = game.round_id
+        scopes = (GLOBAL,) if guild_id == GLOBAL else (guild_id, GLOBAL)
+        for user_id, result in game.results.items():
+            name = game.players[user_id].name
+            chips = game.payouts.get(user_id, 0)
+            for scope in scopes:
+                key = (scope, user_id)
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = PlayerStats(name)
+                stats.name = name
+                if result == GameResult.PLAYER_WINS:
+                    stats.wins += 1
+                elif result == GameResult.DEALER_WINS:
+                    stats.losses += 1
+                else:
+                    stats.pushes += 1
+                stats.chips += chips
+                # update() bỏ qua nếu điểm không đổi
+                self.board(scope, WINS).update(user_id, stats.wins)
+                self.board(scope, CHIPS).update(user_id, stats.chips)
+                self._dirty.add(key)
+
+    def forget(self, channel_id: int):
+        """Bỏ dấu ván đã ghi nhận của kênh khi game kết thúc hoặc bị loại."""
+        self._recorded.pop(channel_id, None)
+
+    def top(
+        self, guild_id: int, metric: str, n: int = 10, offset: int = 0
+    ) -> list[tuple[int, PlayerStats, int]]:
+        """(user_id, thành tích, điểm) của n người đứng đầu từ hạng offset."""
+        return [
+            (user_id, self._stats[(guild_id, user_id)], score)
+            for user_id, score in self.board(guild_id, metric).range(offset, offset + n)
+        ]
+
+    def rank(
+        self, guild_id: int, metric: str, user_id: int
+    ) -> Optional[tuple[int, int, int]]:
+        """(hạng tính từ 1, tổng số người, điểm), None nếu chưa chơi ván nào."""
+        ranked = self.board(guild_id, metric)
+        position = ranked.rank(user_id)
+        if position is None:
+            return None
+        return position + 1, len(ranked), ranked.score(user_id)
+
+    def _collect(self) -> list[tuple]:
+        dirty, self._dirty = self._dirty, set()
+        rows = []
+        for guild_id, user_id in dirty:
+            s = self._stats[(guild_id, user_id)]
+            rows.append(
+                (guild_id, user_id, s.name, s.wins, s.losses, s.pushes, s.chips)
+            )
+        return rows
+
+    def flush(self):
+        """Ghi ngay (đồng bộ) các thành tích đã đổi."""
+        if self.store is None:
+            return
+        rows = self._collect()
+        if rows:
+            self.store.save(rows)
+
+    async def run_flusher(self):
+        """Vòng lặp nền: định kỳ ghi các thành tích đã đổi trong executor."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            rows = self._collect()
+            if not rows:
+                continue
+            try:
+                await loop.run_in_executor(None, self.store.save, rows)
+            except Exception as e:
+                # Ghi lại ở lần sau với giá trị mới nhất
+                logger.warning(f"Lỗi ghi thành tích của {len(rows)} người chơi: {e}")
+                self._dirty.update((row[0], row[1]) for row in rows)
+
+    def close(self):
+        """Ghi nốt thành tích đã đổi và đóng store."""
+        if self.store is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.store.close()
@@ -0,0 +1,219 @@
+# ==============================================================================
+# File: blackjack/ledger.py
+# Mô tả: Sổ cái chip. Tiền cược được giữ (hold) khi người chơi /join và thanh
+# toán từ game.results khi ván kết thúc (Xì Dách trả 3:2). Số dư nằm trong bộ
+# nhớ; các lần thanh toán được gom lại và ghi xuống ILedgerStore theo lô, mỗi
+# lô một transaction idempotent theo (round_id, user_id), nên ghi lại một lô
+# hay khởi động lại bot không bao giờ trả tiền hai lần. Tiền cược được lưu cùng
+# snapshot của game (Player.bet) và được giữ lại khi game được nạp lại.
+# ==============================================================================
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from typing import Iterable, Optional
+
+from .entities import Game, GameResult, GameState
+from .interfaces import ILedgerStore
+
+logger = logging.getLogger("blackjack-bot.ledger")
+
+
+def payout(bet: int, result: Optional[GameResult], blackjack: bool) -> int:
+    """Số chip thắng (dương) hoặc thua (âm) của một cược; Xì Dách trả 3:2."""
+    if result == GameResult.PLAYER_WINS:
+        return bet * 3 // 2 if blackjack else bet
+    if result == GameResult.DEALER_WINS:
+        return -bet
+    return 0
+
+
+class ChipLedger:
+    """Số dư chip của người chơi, tiền cược đang giữ và các lần thanh toán chờ ghi.
+
+    Mọi thao tác chạy đồng bộ trên event loop nên không bị xen kẽ giữa các kênh;
+    việc ghi lô xuống store và nạp số dư (load) chạy trong executor. Chỉ giữ số
+    dư của max_cached người dùng gần nhất (0 = không giới hạn); người đang cược
+    hoặc có thanh toán chưa ghi không bao giờ bị bỏ khỏi cache.
+    """
+
+    def __init__(
+        self,
+        store: ILedgerStore,
+        starting_chips: int = 1000,
+        default_bet: int = 10,
+        flush_interval: float = 1.0,
+        max_cached: int = 10000,
+    ):
+        self.store = store
+        self.starting_chips = starting_chips
+        self.default_bet = default_bet
+        self.flush_interval = flush_interval
+        self.max_cached = max_cached
+        # Số dư (đã gồm các lần thanh toán chưa ghi), nạp từ store khi dùng lần đầu;
+        # thứ tự theo lần dùng cuối để bỏ người lâu không chơi nhất trước
+        self._balances: OrderedDict[int, int] = OrderedDict()
+        # Tổng tiền đang giữ của mỗi người (có thể cược ở nhiều kênh cùng lúc)
+        self._held: dict[int, int] = {}
+        # channel_id -> {user_id: tiền cược} của ván đang chờ/đang chơi
+        self._wagers: dict[int, dict[int, int]] = {}
+        # Các lần thanh toán (round_id, user_id, delta) chưa ghi xuống store
+        self._pending: list[tuple[str, int, int]] = []
+        # user_id -> số lần thanh toán chưa ghi (số dư trong cache mới hơn store)
+        self._unflushed: Counter = Counter()
+
+    def _cache(self, user_id: int, stored: Optional[int]) -> int:
+        balance = self.starting_chips if stored is None else stored
+        self._balances[user_id] = balance
+        if self.max_cached and len(self._balances) > self.max_cached:
+            for cached in self._balances:
+                if cached not in self._held and cached not in self._unflushed:
+                    del self._balances[cached]
+                    break
+        return balance
+
+    def balance(self, user_id: int) -> int:
+        """Số dư của người chơi (gồm cả tiền đang cược).
+
+        Nếu chưa có trong cache thì đọc store ngay trên luồng gọi; lệnh chạy trên
+        event loop nên gọi load trước.
+        """
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return self._cache(user_id, self.store.get_balance(user_id))
+        self._balances.move_to_end(user_id)
+        return balance
+
+    async def load(self, user_id: int):
+        """Nạp số dư của người chơi vào cache, đọc store trong executor."""
+        if user_id in self._balances:
+            self._balances.move_to_end(user_id)
+            return
+        loop = asyncio.get_running_loop()
+        stored = await loop.run_in_executor(None, self.store.get_balance, user_id)
+        if user_id not in self._balances:
+            # Trong lúc chờ, một thanh toán có thể đã nạp và cập nhật số dư
+            self._cache(user_id, stored)
+
+    def available(self, user_id: int) -> int:
+        """Số chip còn có thể đặt cược."""
+        return self.balance(user_id) - self._held.get(user_id, 0)
+
+    def bet_of(self, channel_id: int, user_id: int) -> int:
+        return self._wagers.get(channel_id, {}).get(user_id, 0)
+
+    def place_bet(self, channel_id: int, user_id: int, amount: int):
+        """Giữ tiền cược của người chơi cho ván của kênh."""
+        if amount <= 0:
+            raise ValueError("Tiền cược phải lớn hơn 0.")
+        if self.bet_of(channel_id, user_id):
+            raise ValueError("Bạn đã đặt cược cho ván này rồi.")
+        available = self.available(user_id)
+        if amount > available:
+            raise ValueError(f"Không đủ chip để cược {amount} (còn {available}).")
+        self._wagers.setdefault(channel_id, {})[user_id] = amount
+        self._held[user_id] = self._held.get(user_id, 0) + amount
+
+    def _unhold(self, user_id: int, amount: int):
+        held = self._held[user_id] - amount
+        if held:
+            self._held[user_id] = held
+        else:
+            del self._held[user_id]
+
+    def cancel_bet(self, channel_id: int, user_id: int):
+        """Trả lại tiền cược của một người (ví dụ tham gia không thành công)."""
+        wagers = self._wagers.get(channel_id)
+        if not wagers or user_id not in wagers:
+            return
+        self._unhold(user_id, wagers.pop(user_id))
+        if not wagers:
+            del self._wagers[channel_id]
+
+    def restore(self, games: Iterable[Game]) -> int:
+        """Giữ lại tiền cược (Player.bet) của các ván chưa kết thúc được nạp lại.
+
+        Gọi một lần khi khởi động; trả về số ván được khôi phục tiền cược.
+        """
+        restored = 0
+        for game in games:
+            if game.state == GameState.GAME_OVER or game.channel_id in self._wagers:
+                continue
+            wagers = {
+                player.id: player.bet for player in game.players.values() if player.bet
+            }
+            if not wagers:
+                continue
+            self._wagers[game.channel_id] = wagers
+            for user_id, amount in wagers.items():
+                self._held[user_id] = self._held.get(user_id, 0) + amount
+            restored += 1
+        if restored:
+            logger.info(f"Đã giữ lại tiền cược của {restored} ván đang chơi.")
+        return restored
+
+    def release(self, channel_id: int):
+        """Trả lại tiền cược của ván bị hủy (không thanh toán); gọi lại không sao."""
+        for user_id, amount in self._wagers.pop(channel_id, {}).items():
+            self._unhold(user_id, amount)
+
+    def settle(self, game: Game) -> dict[int, int]:
+        """Thanh toán ván đã kết thúc; chỉ có tác dụng ở lần gọi đầu tiên.
+
+        Trả về số chip thắng/thua của từng người, cũng được ghi vào game.payouts.
+        """
+        wagers = self._wagers.pop(game.channel_id, None)
+        if not wagers:
+            return game.payouts
+        for user_id, bet in wagers.items():
+            self._unhold(user_id, bet)
+            player = game.players.get(user_id)
+            if player is None:
+                continue  # Không vào ván: tiền cược được trả lại
+            delta = payout(bet, game.results.get(user_id), player.hand.is_blackjack())
+            game.payouts[user_id] = delta
+            if delta:
+                self._balances[user_id] = self.balance(user_id) + delta
+            # Ghi cả ván hòa để lịch sử thanh toán đầy đủ
+            self._pending.append((game.round_id, user_id, delta))
+            self._unflushed[user_id] += 1
+        return game.payouts
+
+    def flush(self):
+        """Ghi ngay (đồng bộ) các lần thanh toán đang chờ."""
+        batch, self._pending = self._pending, []
+        if batch:
+            self.store.apply(batch, self.starting_chips)
+            self._flushed(batch)
+
+    def _flushed(self, batch: list[tuple[str, int, int]]):
+        # Store đã có các lần thanh toán này: số dư trong cache lại bỏ được
+        for _, user_id, _ in batch:
+            self._unflushed[user_id] -= 1
+            if not self._unflushed[user_id]:
+                del self._unflushed[user_id]
+
+    async def run_flusher(self):
+        """Vòng lặp nền: định kỳ ghi các lần thanh toán theo lô trong executor."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            batch, self._pending = self._pending, []
+            if not batch:
+                continue
+            try:
+                await loop.run_in_executor(
+                    None, self.store.apply, batch, self.starting_chips
+                )
+            except Exception as e:
+                # Ghi lại cả lô ở lần sau; store bỏ qua các phần đã ghi
+                logger.warning(f"Lỗi ghi {len(batch)} lần thanh toán: {e}")
+                self._pending[:0] = batch
+                continue
+            self._flushed(batch)
+
+    def close(self):
+        """Ghi nốt các lần thanh toán đang chờ và đóng store."""
+        try:
+            self.flush()
+        finally:
+            self.store.close()
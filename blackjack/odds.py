@@ -0,0 +1,143 @@
+# ==============================================================================
+# File: blackjack/odds.py
+# Mô tả: Tính chính xác phân phối điểm cuối của nhà cái (17-21, Xì Dách, quắc)
+# theo thành phần bài còn lại trong shoe, bằng quy hoạch động trên số lá mỗi
+# loại điểm. Kết quả được nhớ (LRU) theo bộ đếm thành phần nên gọi lại rất rẻ.
+# ==============================================================================
+from functools import lru_cache
+from typing import Iterable
+
+from .entities import (
+    CARD_VALUES,
+    DECK_COMPOSITION,
+    NUM_VALUE_CLASSES,
+    VALUE_CLASS,
+    Game,
+)
+
+# Thành phần shoe là tuple 10 phần tử: số lá có giá trị 2, 3, ..., 10, Át (11).
+FULL_DECK_COMPOSITION = DECK_COMPOSITION
+
+# Chỉ số các kết quả trong tuple xác suất trả về.
+OUTCOME_17 = 0
+OUTCOME_18 = 1
+OUTCOME_19 = 2
+OUTCOME_20 = 3
+OUTCOME_21 = 4
+OUTCOME_BLACKJACK = 5
+OUTCOME_BUST = 6
+OUTCOME_LABELS = ("17", "18", "19", "20", "21", "Xì Dách", "Quắc")
+
+# Luật nhà cái trong Game._start_dealer_turn: rút khi điểm < 17.
+DEALER_STAND_ON = 17
+
+
+def composition_from_codes(codes: Iterable[int]) -> tuple[int, ...]:
+    """Đếm số lá mỗi loại điểm trong một dãy mã lá bài (ví dụ Deck.cards)."""
+    classes = bytes(codes).translate(VALUE_CLASS)
+    return tuple(classes.count(i) for i in range(NUM_VALUE_CLASSES))
+
+
+def _terminal(total: int, ncards: int) -> tuple[float, ...]:
+    outcome = [0.0] * len(OUTCOME_LABELS)
+    if total > 21:
+        outcome[OUTCOME_BUST] = 1.0
+    elif total == 21 and ncards == 2:
+        outcome[OUTCOME_BLACKJACK] = 1.0
+    else:
+        outcome[total - DEALER_STAND_ON] = 1.0
+    return tuple(outcome)
+
+
+@lru_cache(maxsize=1 << 18)
+def _dealer_from(
+    counts: tuple[int, ...],
+    total: int,
+    aces: int,
+    ncards: int,
+    refill: tuple[int, ...] = FULL_DECK_COMPOSITION,
+) -> tuple[float, ...]:
+    """Phân phối kết quả của nhà cái từ trạng thái (shoe, điểm, số Át mềm, số lá).
+
+    refill là thành phần shoe mới khi bài hết giữa ván.
+    """
+    if total >= DEALER_STAND_ON:
+        return _terminal(total, ncards)
+
+    remaining = sum(counts)
+    if not remaining:
+        # Deck.deal tự thay shoe mới (num_decks bộ) khi hết bài giữa ván.
+        counts = refill
+        remaining = sum(counts)
+
+    acc = [0.0] * len(OUTCOME_LABELS)
+    next_ncards = min(ncards + 1, 3)  # chỉ cần phân biệt 2 lá cho Xì Dách
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        value = i + 2
+        new_total = total + value
+        new_aces = aces + (value == 11)
+        while new_total > 21 and new_aces:
+            new_total -= 10
+            new_aces -= 1
+        next_counts = counts[:i] + (count - 1,) + counts[i + 1:]
+        sub = _dealer_from(next_counts, new_total, new_aces, next_ncards, refill)
+        p = count / remaining
+        for k, prob in enumerate(sub):
+            acc[k] += p * prob
+    return tuple(acc)
+
+
+def shoe_composition(num_decks: int) -> tuple[int, ...]:
+    """Thành phần của một shoe mới gồm num_decks bộ bài."""
+    if num_decks < 1:
+        raise ValueError("Số bộ bài phải lớn hơn 0.")
+    return tuple(n * num_decks for n in FULL_DECK_COMPOSITION)
+
+
+def dealer_outcome_distribution(
+    composition: tuple[int, ...], up_value: int, num_decks: int = 1
+) -> tuple[float, ...]:
+    """Xác suất các kết quả cuối của nhà cái khi biết lá ngửa.
+
+    composition là thành phần các lá chưa lộ (gồm cả lá úp của nhà cái), không
+    tính lá ngửa. num_decks là số bộ của shoe, dùng khi bài hết giữa ván (lá cắt
+    chỉ được xét giữa hai ván nên không ảnh hưởng lượt của nhà cái). Trả về
+    tuple theo thứ tự OUTCOME_LABELS.
+    """
+    if len(composition) != NUM_VALUE_CLASSES:
+        raise ValueError("Thành phần shoe phải có đúng 10 loại điểm.")
+    return _dealer_from(
+        tuple(composition),
+        up_value,
+        int(up_value == 11),
+        1,
+        shoe_composition(num_decks),
+    )
+
+
+def unseen_composition(game: Game) -> tuple[int, ...]:
+    """Thành phần các lá người chơi chưa thấy: bài còn trong shoe và lá úp nhà cái.
+
+    Dùng thành phần shoe được Deck cập nhật dần, không phải quét lại cả shoe.
+    """
+    counts = list(game.deck.composition)
+    for code in game.dealer.hand.codes[1:]:
+        counts[VALUE_CLASS[code]] += 1
+    return tuple(counts)
+
+
+def dealer_distribution_for_game(game: Game) -> tuple[float, ...]:
+    """Phân phối kết quả nhà cái cho ván đang diễn ra, theo lá ngửa hiện tại."""
+    if not game.dealer.hand.codes:
+        raise ValueError("Nhà cái chưa có bài.")
+    up_value = CARD_VALUES[game.dealer.hand.codes[0]]
+    return dealer_outcome_distribution(
+        unseen_composition(game), up_value, game.deck.num_decks
+    )
+
+
+def clear_cache():
+    """Xóa bộ nhớ đệm (ví dụ khi cần giải phóng bộ nhớ)."""
+    _dealer_from.cache_clear()
@@ -0,0 +1,216 @@
+# ==============================================================================
+# File: blackjack/shoe.py
+# Mô tả: Quản lý shoe nhiều bộ bài cho từng kênh qua các ván. Shoe chỉ được
+# thay giữa hai ván khi đã chạm lá cắt, và shoe thay thế luôn được xáo sẵn
+# trong một executor nền để start_game không phải chờ xáo bài. Shoe của kênh
+# lâu không chơi bị bỏ theo TTL và số shoe tối đa (giống MemoryGameRepository).
+# BetSpreadMonitor (phía nhà cái) theo dõi mức cược theo true count để phát hiện
+# người chơi đếm bài, tận dụng shoe được chia sâu.
+# ==============================================================================
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable
+
+from .entities import Deck
+
+logger = logging.getLogger("blackjack-bot.shoe")
+
+
+class ShoeManager:
+    """Giữ shoe hiện tại của mỗi kênh và một nhóm shoe dự phòng đã xáo sẵn.
+
+    max_shoes giới hạn số kênh được giữ shoe (bỏ kênh lâu không chơi nhất trước)
+    và ttl bỏ shoe của kênh không bắt đầu ván nào trong ttl giây; 0 = không giới
+    hạn. Shoe hết hạn được bỏ dần mỗi lần get_shoe hoặc qua evict_expired.
+    """
+
+    def __init__(
+        self,
+        num_decks: int = 1,
+        penetration: float = 1.0,
+        spares: int = 2,
+        executor: Executor | None = None,
+        max_shoes: int = 0,
+        ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.max_shoes = max_shoes
+        self.ttl = ttl
+        self.clock = clock
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="shoe"
+        )
+        # Thứ tự theo ván cuối: kênh đầu tiên là kênh lâu không chơi nhất
+        self._shoes: OrderedDict[int, Deck] = OrderedDict()
+        self._last_used: dict[int, float] = {}
+        self._spares: list[Future] = [self._prepare() for _ in range(spares)]
+
+    def _new_shoe(self, seed: int | None = None) -> Deck:
+        return Deck(self.num_decks, self.penetration, seed=seed)
+
+    def _prepare(self) -> Future:
+        return self._executor.submit(self._new_shoe)
+
+    def _take_spare(self) -> Deck:
+        """Lấy một shoe dự phòng đã xáo xong và đặt chuẩn bị shoe khác thay vào."""
+        for i, future in enumerate(self._spares):
+            if future.done() and not future.cancelled():
+                del self._spares[i]
+                self._spares.append(self._prepare())
+                return future.result()
+        # Chưa có shoe nào sẵn sàng (rất hiếm): tự xáo ngay để không chặn ván.
+        return self._new_shoe()
+
+    def get_shoe(self, channel_id: int, seed: int | None = None) -> Deck:
+        """Shoe cho ván mới của kênh; thay shoe nếu đã chạm lá cắt.
+
+        Có seed thì luôn thay bằng shoe mới xáo theo seed đó.
+        """
+        self.evict_expired()
+        shoe = self._shoes.get(channel_id)
+        if seed is not None:
+            shoe = self._new_shoe(seed)
+        elif shoe is None or shoe.needs_shuffle:
+            shoe = self._take_spare()
+        self._shoes[channel_id] = shoe
+        self._shoes.move_to_end(channel_id)
+        self._last_used[channel_id] = self.clock()
+        if self.max_shoes and len(self._shoes) > self.max_shoes:
+            self.discard(next(iter(self._shoes)))
+        return shoe
+
+    def current(self, channel_id: int) -> Deck | None:
+        """Shoe đang dùng của kênh (không thay shoe), None nếu chưa có."""
+        return self._shoes.get(channel_id)
+
+    def discard(self, channel_id: int):
+        """Bỏ shoe của kênh (ví dụ khi phòng chơi bị đóng)."""
+        self._shoes.pop(channel_id, None)
+        self._last_used.pop(channel_id, None)
+
+    def evict_expired(self) -> int:
+        """Bỏ shoe của các kênh quá TTL; chỉ duyệt các shoe hết hạn."""
+        if not self.ttl:
+            return 0
+        deadline = self.clock() - self.ttl
+        evicted = 0
+        while self._shoes:
+            channel_id = next(iter(self._shoes))
+            if self._last_used[channel_id] > deadline:
+                break
+            self.discard(channel_id)
+            evicted += 1
+        return evicted
+
+    def close(self):
+        """Dừng executor nền."""
+        for future in self._spares:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+
+class _BetHistory:
+    """Các lần cược gần nhất của một người, kèm tổng theo nhóm true count."""
+
+    __slots__ = ("bets", "sums", "counts", "flagged")
+
+    def __init__(self, window: int):
+        self.bets: deque[tuple[int, int]] = deque(maxlen=window)
+        # Nhóm 0: true count thấp, 1: trung tính, 2: cao
+        self.sums = [0, 0, 0]
+        self.counts = [0, 0, 0]
+        self.flagged = False
+
+    def add(self, group: int, bet: int):
+        if len(self.bets) == self.bets.maxlen:
+            old_group, old_bet = self.bets[0]
+            self.sums[old_group] -= old_bet
+            self.counts[old_group] -= 1
+        self.bets.append((group, bet))
+        self.sums[group] += bet
+        self.counts[group] += 1
+
+
+class BetSpreadMonitor:
+    """Theo dõi độ chênh cược của từng người giữa lúc true count cao và thấp.
+
+    Người đếm bài cược lớn khi true count cao (shoe còn nhiều lá 10/Át) và cược
+    nhỏ khi thấp; ai có tỉ lệ cược trung bình cao/thấp từ ratio trở lên (đủ
+    min_bets lần mỗi nhóm trong window lần gần nhất) bị đánh dấu. Mỗi lần ghi
+    là O(1). Chỉ giữ lịch sử của max_users người cược gần nhất (0 = không giới
+    hạn); người lâu không cược bị bỏ trước.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 4.0,
+        min_bets: int = 10,
+        high: float = 2.0,
+        low: float = 0.0,
+        window: int = 200,
+        max_users: int = 10000,
+    ):
+        self.ratio = ratio
+        self.min_bets = min_bets
+        self.high = high
+        self.low = low
+        self.window = window
+        self.max_users = max_users
+        # Thứ tự theo lần cược cuối: người đầu tiên là người lâu không cược nhất
+        self._histories: OrderedDict[int, _BetHistory] = OrderedDict()
+
+    def record(self, user_id: int, true_count: float, bet: int):
+        """Ghi một lần cược cùng true count của shoe lúc đặt cược."""
+        history = self._histories.get(user_id)
+        if history is None:
+            history = self._histories[user_id] = _BetHistory(self.window)
+            if self.max_users and len(self._histories) > self.max_users:
+                self._histories.popitem(last=False)
+        else:
+            self._histories.move_to_end(user_id)
+        if true_count >= self.high:
+            group = 2
+        elif true_count <= self.low:
+            group = 0
+        else:
+            group = 1
+        history.add(group, bet)
+        flagged = self._spread(history) >= self.ratio
+        if flagged and not history.flagged:
+            logger.warning(
+                f"Người chơi {user_id} cược chênh x{self._spread(history):.1f}"
+                f" theo true count, có thể đang đếm bài."
+            )
+        history.flagged = flagged
+
+    def _spread(self, history: _BetHistory) -> float:
+        low_n, high_n = history.counts[0], history.counts[2]
+        if low_n < self.min_bets or high_n < self.min_bets:
+            return 0.0
+        low_avg = history.sums[0] / low_n
+        high_avg = history.sums[2] / high_n
+        return high_avg / low_avg if low_avg > 0 else float("inf")
+
+    def spread(self, user_id: int) -> float:
+        """Tỉ lệ cược trung bình khi true count cao / thấp (0 nếu chưa đủ dữ liệu)."""
+        history = self._histories.get(user_id)
+        return self._spread(history) if history else 0.0
+
+    def suspects(self, user_ids=None) -> list[tuple[int, float]]:
+        """Những người đang bị đánh dấu (user_id, tỉ lệ), chênh nhiều nhất trước.
+
+        user_ids giới hạn việc tìm trong một nhóm người (ví dụ người trong kênh).
+        """
+        if user_ids is None:
+            user_ids = self._histories.keys()
+        found = []
+        for user_id in user_ids:
+            history = self._histories.get(user_id)
+            if history is not None and history.flagged:
+                found.append((user_id, self._spread(history)))
+        found.sort(key=lambda item: -item[1])
+        return found
@@ -0,0 +1,254 @@
+# ==============================================================================
+# File: blackjack/simulation.py
+# Mô tả: Mô phỏng Monte Carlo dạng vector (NumPy) cho đúng luật của Game:
+# nhà cái dừng ở mọi điểm 17, luật Xì Dách/21 khi hòa điểm, tự thay bộ bài mới
+# khi hết bài. Dùng để ước lượng lợi thế nhà cái trước khi đổi luật.
+#
+# Chạy: python -m blackjack.simulation --rounds 1000000 --players 1
+# ==============================================================================
+import argparse
+import time
+
+import numpy as np
+
+from .entities import (
+    CARD_IS_ACE,
+    CARD_VALUES,
+    NUM_CARD_CODES,
+    Game,
+    GameResult,
+    GameState,
+)
+
+_VALUES = np.frombuffer(CARD_VALUES, dtype=np.uint8).astype(np.int16)
+_ACES = np.frombuffer(CARD_IS_ACE, dtype=np.uint8).astype(np.int16)
+
+# Số ván mô phỏng trong một lô để giới hạn bộ nhớ (mỗi ván một hàng uint8).
+DEFAULT_BATCH_SIZE = 100_000
+
+
+class SimulationResult:
+    """Tổng hợp kết quả của nhiều ván mô phỏng."""
+
+    def __init__(self, num_players: int):
+        self.num_players = num_players
+        self.rounds = 0
+        self.counts = {result: 0 for result in GameResult}
+        self.dealer_busts = 0
+        self.player_blackjacks = 0
+
+    @property
+    def hands(self) -> int:
+        return self.rounds * self.num_players
+
+    def frequencies(self) -> dict[GameResult, float]:
+        """Tần suất mỗi GameResult trên tổng số tay bài của người chơi."""
+        hands = self.hands or 1
+        return {result: count / hands for result, count in self.counts.items()}
+
+    @property
+    def dealer_bust_rate(self) -> float:
+        return self.dealer_busts / (self.rounds or 1)
+
+    @property
+    def house_edge(self) -> float:
+        """Lợi thế nhà cái với cược 1 ăn 1 (chưa có trả thưởng Xì Dách)."""
+        wins = self.counts[GameResult.PLAYER_WINS]
+        losses = self.counts[GameResult.DEALER_WINS]
+        return (losses - wins) / (self.hands or 1)
+
+    def merge(self, other: "SimulationResult"):
+        """Cộng dồn kết quả của một lô khác vào kết quả này."""
+        self.rounds += other.rounds
+        for result, count in other.counts.items():
+            self.counts[result] += count
+        self.dealer_busts += other.dealer_busts
+        self.player_blackjacks += other.player_blackjacks
+
+
+def make_shoes(
+    num_rounds: int, num_players: int = 1, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """Tạo các shoe đã xáo, mỗi hàng là thứ tự rút bài của một ván.
+
+    Mỗi ván dùng một bộ bài mới như Game; các bộ bài nối thêm phía sau mô phỏng
+    việc Deck.deal tự tạo bộ bài mới khi hết bài giữa ván.
+    """
+    rng = rng or np.random.default_rng()
+    num_decks = 2 + num_players // 4
+    decks = np.tile(np.arange(NUM_CARD_CODES, dtype=np.uint8), (num_rounds, num_decks))
+    for i in range(num_decks):
+        block = slice(i * NUM_CARD_CODES, (i + 1) * NUM_CARD_CODES)
+        decks[:, block] = rng.permuted(decks[:, block], axis=1)
+    return decks
+
+
+def _add_cards(total, aces, ncards, codes, mask):
+    """Thêm lá bài vào các tay được chọn bởi mask (giống Hand.add_code)."""
+    mask = mask.astype(np.int16)
+    total += _VALUES[codes] * mask
+    aces += _ACES[codes] * mask
+    ncards += mask
+    # Một lá bài mới có thể làm phải hạ tối đa hai Át (ví dụ A+10 rồi thêm A).
+    for _ in range(2):
+        reduce = ((total > 21) & (aces > 0)).astype(np.int16)
+        total -= 10 * reduce
+        aces -= reduce
+
+
+def _play_shoes(shoes: np.ndarray, num_players: int, stand_on: int):
+    """Chơi mỗi hàng của shoes như một ván Game.
+
+    Trả về (wins, losses, player_bj, dealer_bust): các mask bool, mask của người
+    chơi có dạng (num_players, num_rounds).
+    """
+    num_rounds, width = shoes.shape
+    rows = np.arange(num_rounds)
+    pos = np.zeros(num_rounds, dtype=np.int32)
+
+    shape = (num_players + 1, num_rounds)  # hàng cuối là nhà cái
+    total = np.zeros(shape, dtype=np.int16)
+    aces = np.zeros(shape, dtype=np.int16)
+    ncards = np.zeros(shape, dtype=np.int16)
+    everyone = np.ones(num_rounds, dtype=bool)
+
+    def draw(seat, mask):
+        codes = shoes[rows, np.minimum(pos, width - 1)]
+        _add_cards(total[seat], aces[seat], ncards[seat], codes, mask)
+        pos[mask] += 1
+
+    # Chia bài ban đầu: hai vòng, mỗi vòng lần lượt từng người chơi rồi nhà cái.
+    for _ in range(2):
+        for seat in range(num_players + 1):
+            draw(seat, everyone)
+
+    blackjack = (total == 21) & (ncards == 2)
+
+    # Người chơi Xì Dách tự dằn bài; những người còn lại rút tới khi đủ stand_on.
+    for seat in range(num_players):
+        active = ~blackjack[seat] & (total[seat] < stand_on)
+        while active.any():
+            draw(seat, active)
+            active &= total[seat] < stand_on
+
+    # Nhà cái luôn rút tới khi đạt 17 điểm trở lên.
+    dealer = num_players
+    active = total[dealer] < 17
+    while active.any():
+        draw(dealer, active)
+        active &= total[dealer] < 17
+
+    if (pos > width).any():
+        raise ValueError("Shoe không đủ bài cho số người chơi này.")
+
+    dealer_total = total[dealer]
+    dealer_bj = blackjack[dealer]
+    dealer_bust = dealer_total > 21
+
+    player_total = total[:num_players]
+    player_bj = blackjack[:num_players]
+    player_bust = player_total > 21
+    alive = ~player_bust
+    tie = alive & ~dealer_bust & (player_total == dealer_total)
+    wins = alive & (
+        dealer_bust | (player_total > dealer_total) | (tie & player_bj & ~dealer_bj)
+    )
+    losses = player_bust | (
+        ~dealer_bust & ((player_total < dealer_total) | (tie & ~player_bj & dealer_bj))
+    )
+    return wins, losses, player_bj, dealer_bust
+
+
+def simulate_shoes(
+    shoes: np.ndarray, num_players: int = 1, stand_on: int = 17
+) -> SimulationResult:
+    """Chơi mỗi hàng của shoes như một ván Game, người chơi rút khi điểm < stand_on."""
+    num_rounds = shoes.shape[0]
+    wins, losses, player_bj, dealer_bust = _play_shoes(shoes, num_players, stand_on)
+
+    result = SimulationResult(num_players)
+    result.rounds = num_rounds
+    result.dealer_busts = int(dealer_bust.sum())
+    result.player_blackjacks = int(player_bj.sum())
+    result.counts[GameResult.PLAYER_WINS] = int(wins.sum())
+    result.counts[GameResult.DEALER_WINS] = int(losses.sum())
+    result.counts[GameResult.PUSH] = int(
+        num_rounds * num_players - wins.sum() - losses.sum()
+    )
+    return result
+
+
+def simulate_shoes_rounds(
+    shoes: np.ndarray, num_players: int = 1, stand_on: int = 17
+) -> np.ndarray:
+    """Kết quả từng ván: mảng (num_rounds, num_players) các GameResult.value."""
+    wins, losses, _, _ = _play_shoes(shoes, num_players, stand_on)
+    outcomes = np.full(wins.shape, GameResult.PUSH.value, dtype=np.int8)
+    outcomes[wins] = GameResult.PLAYER_WINS.value
+    outcomes[losses] = GameResult.DEALER_WINS.value
+    return outcomes.T
+
+
+def simulate_rounds(
+    num_rounds: int,
+    num_players: int = 1,
+    stand_on: int = 17,
+    seed: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> SimulationResult:
+    """Mô phỏng num_rounds ván theo từng lô để giữ bộ nhớ ổn định."""
+    rng = np.random.default_rng(seed)
+    result = SimulationResult(num_players)
+    remaining = num_rounds
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        shoes = make_shoes(size, num_players, rng)
+        result.merge(simulate_shoes(shoes, num_players, stand_on))
+        remaining -= size
+    return result
+
+
+def simulate_shoes_scalar(
+    shoes: np.ndarray, num_players: int = 1, stand_on: int = 17
+) -> list[list[GameResult]]:
+    """Chơi cùng các shoe bằng lớp Game thật, dùng để đối chiếu với bản vector."""
+    outcomes = []
+    for row in shoes:
+        game = Game(channel_id=0)
+        for user_id in range(1, num_players + 1):
+            game.add_player(user_id, f"P{user_id}")
+        # Deck.deal rút từ cuối danh sách nên đảo ngược thứ tự rút bài.
+        game.deck.cards = bytearray(row[::-1].tobytes())
+        game.deck.counts = None  # đếm lại thành phần theo shoe mới
+        game.start_game()
+        while game.state == GameState.PLAYERS_TURN:
+            player = game.get_current_player()
+            if player.hand.value < stand_on:
+                game.player_hit(player.id)
+            else:
+                game.player_stand(player.id)
+        outcomes.append([game.results[uid] for uid in game.player_order])
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mô phỏng lợi thế nhà cái.")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--stand-on", type=int, default=17)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = simulate_rounds(args.rounds, args.players, args.stand_on, args.seed)
+    elapsed = time.perf_counter() - started
+
+    print(f"Số ván: {result.rounds:,} ({result.rounds / elapsed:,.0f} ván/giây)")
+    for game_result, freq in result.frequencies().items():
+        print(f"  {game_result.name:<12} {freq:.4%}")
+    print(f"Nhà cái quắc: {result.dealer_bust_rate:.4%}")
+    print(f"Lợi thế nhà cái: {result.house_edge:.4%}")
+
+
+if __name__ == "__main__":
+    main()
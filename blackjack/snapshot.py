@@ -0,0 +1,187 @@
+# ==============================================================================
+# File: blackjack/snapshot.py
+# Mô tả: Mã hóa/giải mã trạng thái Game sang dạng nhị phân gọn (struct), có đánh
+# phiên bản. Bài được lưu bằng mã lá (1 byte/lá); điểm và số Át được tính lại
+# khi giải mã nên không cần lưu.
+#
+# Bố cục (little-endian), phiên bản 1:
+#   header  : magic "BJG", version (B)
+#   game    : channel_id (Q), state (B), current_player_index (h),
+#             số người chơi (H), độ dài player_order (H), guild_id (Q),
+#             round_id (16s, UUID dạng byte; toàn 0 = chưa chia bài)
+#   deck    : num_decks (B), cut_card (H), số lá (H), seed (Q), số lần đã xáo (I),
+#             các mã lá
+#   dealer  : số lá (B), các mã lá
+#   player  : id (Q), is_standing (B), result (B, 0 = chưa có), độ dài tên (H),
+#             tiền cược (I), tên UTF-8, số lá (B), các mã lá
+#                                                  -- lặp cho từng người chơi
+#   order   : chỉ số người chơi (H)                 -- lặp theo player_order
+# ==============================================================================
+import struct
+
+from .entities import (
+    CARD_IS_ACE,
+    CARD_VALUES,
+    NUM_CARD_CODES,
+    Deck,
+    Game,
+    GameResult,
+    GameState,
+    Hand,
+    Player,
+)
+
+MAGIC = b"BJG"
+VERSION = 1
+
+_HEADER = struct.Struct("<3sB")
+_GAME = struct.Struct("<QBhHHQ16s")
+_DECK = struct.Struct("<BHHQI")
+_PLAYER = struct.Struct("<QBBHI")
+_COUNT = struct.Struct("<B")
+_INDEX = struct.Struct("<H")
+
+# Bảng dịch mã lá -> điểm / cờ Át, dùng với bytes.translate khi dựng lại tay bài.
+_PADDING = bytes(256 - NUM_CARD_CODES)
+_VALUE_TABLE = CARD_VALUES + _PADDING
+_ACE_TABLE = CARD_IS_ACE + _PADDING
+
+_STATES = {state.value: state for state in GameState}
+_RESULTS = {result.value: result for result in GameResult}
+
+
+def _pack_hand(parts: list, hand: Hand):
+    parts.append(_COUNT.pack(len(hand.codes)))
+    parts.append(bytes(hand.codes))
+
+
+def encode_game(game: Game) -> bytes:
+    """Mã hóa Game thành bytes."""
+    players = list(game.players.values())
+    index_of = {player.id: i for i, player in enumerate(players)}
+    deck = game.deck
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION),
+        _GAME.pack(
+            game.channel_id,
+            game.state.value,
+            game.current_player_index,
+            len(players),
+            len(game.player_order),
+            game.guild_id,
+            bytes.fromhex(game.round_id) if game.round_id else bytes(16),
+        ),
+        _DECK.pack(
+            deck.num_decks, deck.cut_card, len(deck.cards), deck.seed, deck.shuffles
+        ),
+        bytes(deck.cards),
+    ]
+    _pack_hand(parts, game.dealer.hand)
+
+    for player in players:
+        name = player.name.encode("utf-8")
+        result = game.results.get(player.id)
+        parts.append(
+            _PLAYER.pack(
+                player.id,
+                player.is_standing,
+                result.value if result else 0,
+                len(name),
+                player.bet,
+            )
+        )
+        parts.append(name)
+        _pack_hand(parts, player.hand)
+
+    for player_id in game.player_order:
+        parts.append(_INDEX.pack(index_of[player_id]))
+    return b"".join(parts)
+
+
+class _Reader:
+    """Đọc tuần tự từ một buffer, báo ValueError nếu dữ liệu bị cắt cụt."""
+
+    def __init__(self, data: bytes):
+        self.view = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        try:
+            values = fmt.unpack_from(self.view, self.offset)
+        except struct.error as e:
+            raise ValueError(f"Snapshot bị hỏng: {e}") from e
+        self.offset += fmt.size
+        return values
+
+    def take(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.view):
+            raise ValueError("Snapshot bị hỏng: thiếu dữ liệu.")
+        chunk = self.view[self.offset:end].tobytes()
+        self.offset = end
+        return chunk
+
+    def hand(self) -> Hand:
+        if self.offset >= len(self.view):
+            raise ValueError("Snapshot bị hỏng: thiếu dữ liệu.")
+        count = self.view[self.offset]
+        self.offset += _COUNT.size
+        codes = self.take(count)
+        hand = Hand()
+        hand.codes = bytearray(codes)
+        # Hạ Át một lần ở cuối cho kết quả giống hệt việc add_code từng lá.
+        hand.value = sum(codes.translate(_VALUE_TABLE))
+        hand.aces = sum(codes.translate(_ACE_TABLE))
+        hand.adjust_for_ace()
+        return hand
+
+
+def decode_game(data: bytes) -> Game:
+    """Giải mã bytes (tạo bởi encode_game) thành Game."""
+    reader = _Reader(data)
+    magic, version = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("Không phải snapshot Game.")
+    if version != VERSION:
+        raise ValueError(f"Không hỗ trợ snapshot phiên bản {version}.")
+
+    (
+        channel_id,
+        state,
+        current_index,
+        num_players,
+        order_len,
+        guild_id,
+        round_id,
+    ) = reader.unpack(_GAME)
+    num_decks, cut_card, num_cards, seed, shuffles = reader.unpack(_DECK)
+    deck = Deck.restore(num_decks, cut_card, reader.take(num_cards), seed, shuffles)
+
+    if state not in _STATES:
+        raise ValueError(f"Snapshot bị hỏng: trạng thái {state} không hợp lệ.")
+    game = Game(channel_id, deck=deck)
+    game.state = _STATES[state]
+    game.current_player_index = current_index
+    game.guild_id = guild_id
+    game.round_id = round_id.hex() if any(round_id) else ""
+    game.dealer.hand = reader.hand()
+
+    players = []
+    for _ in range(num_players):
+        user_id, is_standing, result, name_len, bet = reader.unpack(_PLAYER)
+        player = Player(user_id, reader.take(name_len).decode("utf-8"))
+        player.is_standing = bool(is_standing)
+        player.bet = bet
+        player.hand = reader.hand()
+        if result:
+            if result not in _RESULTS:
+                raise ValueError(f"Snapshot bị hỏng: kết quả {result} không hợp lệ.")
+            game.results[user_id] = _RESULTS[result]
+        game.players[user_id] = player
+        players.append(player)
+
+    for _ in range(order_len):
+        (index,) = reader.unpack(_INDEX)
+        game.player_order.append(players[index].id)
+    return game
@@ -0,0 +1,147 @@
+# ==============================================================================
+# File: blackjack/strategy.py
+# Mô tả: Bảng chiến thuật cơ bản (rút/dằn) kèm giá trị kỳ vọng (EV) cho đúng
+# luật của Game. Bảng được tính một lần khi khởi động, sau đó mỗi lần tra cứu
+# chỉ là một phép lấy phần tử theo chỉ số.
+# ==============================================================================
+from array import array
+from functools import lru_cache
+
+from .entities import CARD_VALUES, GameResult, Hand
+from .ledger import payout
+from .odds import (
+    NUM_VALUE_CLASSES,
+    OUTCOME_17,
+    OUTCOME_BLACKJACK,
+    OUTCOME_BUST,
+    dealer_outcome_distribution,
+    shoe_composition,
+)
+
+HIT = "hit"
+STAND = "stand"
+
+# Tiền thắng mỗi đơn vị cược của Xì Dách (3:2), lấy từ luật thanh toán của sổ cái
+BLACKJACK_PAYOUT = payout(2, GameResult.PLAYER_WINS, True) / 2
+
+MIN_TOTAL = 4
+MAX_TOTAL = 21
+_NUM_TOTALS = MAX_TOTAL - MIN_TOTAL + 1
+
+
+def _index(total: int, soft: bool, up_value: int) -> int:
+    return ((total - MIN_TOTAL) * 2 + soft) * NUM_VALUE_CLASSES + (up_value - 2)
+
+
+def _stand_ev(total: int, dealer: tuple[float, ...]) -> float:
+    """EV khi dằn với tổng điểm total (không phải Xì Dách)."""
+    ev = dealer[OUTCOME_BUST] - dealer[OUTCOME_BLACKJACK]
+    for dealer_total in range(17, 22):
+        p = dealer[OUTCOME_17 + dealer_total - 17]
+        if total > dealer_total:
+            ev += p
+        elif total < dealer_total:
+            ev -= p
+    return ev
+
+
+class StrategyTable:
+    """Bảng chiến thuật cơ bản: hành động tốt nhất và EV theo (điểm, mềm, lá ngửa).
+
+    EV tính theo cược 1 đơn vị. Xác suất rút bài của người chơi dùng thành phần
+    của shoe mới (xấp xỉ không phụ thuộc các lá đã ra), nên bảng phụ thuộc số
+    bộ bài của shoe (xem for_decks).
+    """
+
+    def __init__(self, actions: bytes, evs: array, blackjack_evs: array):
+        self._actions = actions
+        self._evs = evs
+        self._blackjack_evs = blackjack_evs
+
+    @classmethod
+    def build(
+        cls, composition: tuple[int, ...] | None = None, num_decks: int = 1
+    ) -> "StrategyTable":
+        """Tính toàn bộ bảng cho thành phần shoe cho trước.
+
+        Không truyền composition thì dùng shoe mới gồm num_decks bộ bài.
+        """
+        if composition is None:
+            composition = shoe_composition(num_decks)
+        size = _NUM_TOTALS * 2 * NUM_VALUE_CLASSES
+        actions = bytearray(size)
+        evs = array("d", bytes(8 * size))
+        blackjack_evs = array("d", bytes(8 * NUM_VALUE_CLASSES))
+
+        for up_index in range(NUM_VALUE_CLASSES):
+            up_value = up_index + 2
+            rest = list(composition)
+            rest[up_index] -= 1
+            dealer = dealer_outcome_distribution(tuple(rest), up_value, num_decks)
+            blackjack_evs[up_index] = BLACKJACK_PAYOUT * (1.0 - dealer[OUTCOME_BLACKJACK])
+
+            remaining = sum(rest)
+            draws = [
+                (i + 2, count / remaining) for i, count in enumerate(rest) if count
+            ]
+            memo: dict[tuple[int, bool], tuple[float, float]] = {}
+
+            def best(total: int, soft: bool) -> tuple[float, float]:
+                """Trả về (EV khi dằn, EV khi rút) tại trạng thái cho trước."""
+                key = (total, soft)
+                if key in memo:
+                    return memo[key]
+                stand = _stand_ev(total, dealer)
+                hit = 0.0
+                for value, p in draws:
+                    new_total = total + value
+                    aces = int(soft) + (value == 11)
+                    while new_total > 21 and aces:
+                        new_total -= 10
+                        aces -= 1
+                    if new_total > 21:
+                        hit -= p
+                    elif new_total == 21:
+                        # Game tự kết thúc lượt khi đạt 21.
+                        hit += p * _stand_ev(21, dealer)
+                    else:
+                        hit += p * max(best(new_total, aces > 0))
+                memo[key] = (stand, hit)
+                return memo[key]
+
+            for total in range(MIN_TOTAL, MAX_TOTAL + 1):
+                for soft in (False, True):
+                    index = _index(total, soft, up_value)
+                    if total == MAX_TOTAL:
+                        actions[index] = 0
+                        evs[index] = _stand_ev(total, dealer)
+                        continue
+                    stand, hit = best(total, soft)
+                    actions[index] = hit > stand
+                    evs[index] = max(stand, hit)
+
+        return cls(bytes(actions), evs, blackjack_evs)
+
+    @classmethod
+    def for_decks(cls, num_decks: int) -> "StrategyTable":
+        """Bảng cho shoe num_decks bộ bài, tính một lần mỗi process."""
+        return _table_for_decks(num_decks)
+
+    def lookup(self, total: int, soft: bool, up_value: int) -> tuple[str, float]:
+        """Tra hành động và EV cho tổng điểm và giá trị lá ngửa của nhà cái."""
+        if total > MAX_TOTAL:
+            return STAND, -1.0
+        index = _index(max(total, MIN_TOTAL), soft, up_value)
+        return (HIT if self._actions[index] else STAND), self._evs[index]
+
+    def lookup_hand(self, hand: Hand, dealer_up_code: int) -> tuple[str, float]:
+        """Tra cứu trực tiếp từ tay bài và mã lá ngửa của nhà cái."""
+        up_value = CARD_VALUES[dealer_up_code]
+        if hand.is_blackjack():
+            return STAND, self._blackjack_evs[up_value - 2]
+        return self.lookup(hand.value, hand.aces > 0, up_value)
+
+
+@lru_cache(maxsize=8)
+def _table_for_decks(num_decks: int) -> StrategyTable:
+    return StrategyTable.build(num_decks=num_decks)
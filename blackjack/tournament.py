@@ -0,0 +1,349 @@
+# ==============================================================================
+# File: blackjack/tournament.py
+# Mô tả: Giải đấu chiến thuật ngoại tuyến: cho các chiến thuật người chơi (dằn ở
+# N điểm, chiến thuật cơ bản, ngẫu nhiên, hàm tự viết) chơi nhiều ván trên lớp
+# Game thật, chia việc cho ProcessPoolExecutor theo từng phần (chunk) có seed
+# riêng rồi cộng dồn histogram kết quả. Báo cáo tỉ lệ thắng/thua/hòa với khoảng
+# tin cậy Wilson và EV mỗi tay bài, để kiểm tra một thay đổi luật trên các
+# chiến thuật thật trước khi triển khai.
+#
+# Seed của mỗi chunk chỉ phụ thuộc vào seed gốc và số thứ tự chunk, nên cùng
+# seed cho cùng kết quả dù chạy với bao nhiêu process.
+#
+# Chạy: python -m blackjack.tournament --rounds 1000000 --strategies basic stand:17
+# ==============================================================================
+import argparse
+import importlib
+import math
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+from typing import Callable, Iterable, Union
+
+from .entities import Deck, Game, GameResult, GameState, Hand
+from .ledger import payout
+from .strategy import HIT, STAND, StrategyTable
+
+# Chiến thuật: (tay bài, mã lá ngửa của nhà cái) -> HIT hoặc STAND. Có thể có
+# thêm phương thức seed(giá trị) để được cấp seed riêng ở mỗi chunk, và
+# set_decks(số bộ) để biết số bộ bài của shoe.
+Strategy = Callable[[Hand, int], str]
+# Chiến thuật dạng chuỗi ("basic", "stand:17", "random:0.3", "module:hàm") hoặc
+# đối tượng gọi được (phải pickle được để gửi sang process khác)
+StrategySpec = Union[str, Strategy]
+
+DEFAULT_STRATEGIES = ("basic", "stand:17", "stand:12", "random")
+DEFAULT_CHUNK_SIZE = 20_000
+
+
+class StandOn:
+    """Rút tới khi đạt ít nhất `total` điểm (giống nhà cái khi total = 17)."""
+
+    def __init__(self, total: int = 17):
+        self.total = total
+
+    def __call__(self, hand: Hand, dealer_up_code: int) -> str:
+        return HIT if hand.value < self.total else STAND
+
+
+class BasicStrategy:
+    """Chiến thuật cơ bản của /hint cho shoe num_decks bộ (bảng tính một lần mỗi process)."""
+
+    def __init__(self, num_decks: int = 1):
+        self.set_decks(num_decks)
+
+    def set_decks(self, num_decks: int):
+        self.num_decks = num_decks
+        self._table: StrategyTable | None = None  # tính khi dùng lần đầu
+
+    def __call__(self, hand: Hand, dealer_up_code: int) -> str:
+        table = self._table
+        if table is None:
+            table = self._table = StrategyTable.for_decks(self.num_decks)
+        return table.lookup_hand(hand, dealer_up_code)[0]
+
+
+class RandomStrategy:
+    """Rút với xác suất `hit_probability`, bất kể tay bài."""
+
+    def __init__(self, hit_probability: float = 0.5):
+        self.hit_probability = hit_probability
+        self.rng = random.Random()
+
+    def seed(self, value: int):
+        self.rng.seed(value)
+
+    def __call__(self, hand: Hand, dealer_up_code: int) -> str:
+        return HIT if self.rng.random() < self.hit_probability else STAND
+
+
+def resolve_strategy(spec: StrategySpec) -> Strategy:
+    """Dựng chiến thuật từ chuỗi mô tả; đối tượng gọi được thì giữ nguyên."""
+    if callable(spec):
+        return spec
+    name, _, arg = spec.partition(":")
+    if name == "stand":
+        return StandOn(int(arg) if arg else 17)
+    if name == "basic":
+        return BasicStrategy()
+    if name == "random":
+        return RandomStrategy(float(arg) if arg else 0.5)
+    if arg:
+        # "module:tên": hàm, đối tượng gọi được hoặc lớp (tạo không tham số)
+        target = getattr(importlib.import_module(name), arg)
+        return target() if isinstance(target, type) else target
+    raise ValueError(f"Không hiểu chiến thuật {spec!r}.")
+
+
+def wilson_interval(
+    successes: int, trials: int, z: float = 1.96
+) -> tuple[float, float]:
+    """Khoảng tin cậy Wilson cho tỉ lệ successes/trials."""
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+    half /= denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class StrategyResult:
+    """Histogram kết quả của một chiến thuật; cộng dồn được giữa các chunk."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = {result: 0 for result in GameResult}
+        # Tiền thắng/thua mỗi tay tính theo nửa mức cược (Xì Dách 3:2 = 3)
+        self.payouts: Counter = Counter()
+        # Điểm cuối của tay bài (quắc gộp thành 22)
+        self.totals: Counter = Counter()
+        self.blackjacks = 0
+
+    @property
+    def hands(self) -> int:
+        return sum(self.counts.values())
+
+    def rate(self, result: GameResult) -> float:
+        return self.counts[result] / (self.hands or 1)
+
+    def interval(self, result: GameResult, z: float = 1.96) -> tuple[float, float]:
+        return wilson_interval(self.counts[result], self.hands, z)
+
+    @property
+    def bust_rate(self) -> float:
+        return self.totals[22] / (self.hands or 1)
+
+    @property
+    def ev(self) -> float:
+        """Tiền thắng/thua trung bình mỗi tay, tính theo mức cược."""
+        total = sum(half * count for half, count in self.payouts.items())
+        return total / 2 / (self.hands or 1)
+
+    def ev_interval(self, z: float = 1.96) -> tuple[float, float]:
+        """Khoảng tin cậy (xấp xỉ chuẩn) của EV."""
+        hands = self.hands
+        if hands < 2:
+            return -1.5, 1.5
+        mean = self.ev
+        square = sum((half / 2) ** 2 * n for half, n in self.payouts.items()) / hands
+        half_width = z * math.sqrt(max(0.0, square - mean * mean) / hands)
+        return mean - half_width, mean + half_width
+
+    def merge(self, other: "StrategyResult"):
+        """Cộng dồn kết quả của một chunk khác vào kết quả này."""
+        for result, count in other.counts.items():
+            self.counts[result] += count
+        self.payouts.update(other.payouts)
+        self.totals.update(other.totals)
+        self.blackjacks += other.blackjacks
+
+
+def chunk_seed(seed: int, index: int) -> int:
+    """Seed 64 bit của chunk thứ `index` (không phụ thuộc số process)."""
+    return random.Random(f"{seed}:{index}").getrandbits(64)
+
+
+def play_rounds(
+    strategy: Strategy,
+    name: str,
+    rounds: int,
+    seed: int,
+    players: int = 1,
+    num_decks: int = 6,
+    penetration: float = 0.75,
+) -> StrategyResult:
+    """Chơi `rounds` ván trên Game với mọi ghế dùng cùng chiến thuật.
+
+    Shoe được thay khi chạm lá cắt, mỗi shoe một seed lấy từ `seed`, nên các
+    chiến thuật chơi với cùng seed sẽ bắt đầu từ cùng các shoe.
+    """
+    if hasattr(strategy, "seed"):
+        strategy.seed(seed)
+    if hasattr(strategy, "set_decks"):
+        strategy.set_decks(num_decks)
+    shoe_seeds = random.Random(seed)
+    result = StrategyResult(name)
+    counts, payouts, totals = result.counts, result.payouts, result.totals
+    shoe = Deck(num_decks, penetration, seed=shoe_seeds.getrandbits(64))
+    for _ in range(rounds):
+        if shoe.needs_shuffle:
+            shoe = Deck(num_decks, penetration, seed=shoe_seeds.getrandbits(64))
+        game = Game(0, deck=shoe)
+        for seat in range(1, players + 1):
+            game.add_player(seat, "")
+        game.start_game()
+        up_code = game.dealer.hand.codes[0]
+        while game.state == GameState.PLAYERS_TURN:
+            player = game.get_current_player()
+            if strategy(player.hand, up_code) == HIT:
+                game.player_hit(player.id)
+            else:
+                game.player_stand(player.id)
+        for seat, player in game.players.items():
+            outcome = game.results[seat]
+            blackjack = player.hand.is_blackjack()
+            counts[outcome] += 1
+            payouts[payout(2, outcome, blackjack)] += 1
+            totals[min(player.hand.value, 22)] += 1
+            result.blackjacks += blackjack
+    return result
+
+
+def _play_chunk(
+    strategies: list[tuple[str, StrategySpec]],
+    rounds: int,
+    seed: int,
+    players: int,
+    num_decks: int,
+    penetration: float,
+) -> list[StrategyResult]:
+    # Chạy trong process con: dựng chiến thuật tại đây để không phải pickle
+    # trạng thái (ví dụ bảng chiến thuật)
+    return [
+        play_rounds(
+            resolve_strategy(spec), name, rounds, seed, players, num_decks, penetration
+        )
+        for name, spec in strategies
+    ]
+
+
+def run_tournament(
+    strategies: Iterable[StrategySpec] | dict[str, StrategySpec],
+    rounds: int,
+    players: int = 1,
+    num_decks: int = 6,
+    penetration: float = 0.75,
+    seed: int | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple[list[StrategyResult], int]:
+    """Cho mỗi chiến thuật chơi `rounds` ván; trả về (kết quả, seed đã dùng).
+
+    workers = 1 chạy ngay trong process hiện tại; None dùng mọi CPU.
+    """
+    if not isinstance(strategies, dict):
+        strategies = {
+            (
+                spec if isinstance(spec, str) else getattr(spec, "__name__", repr(spec))
+            ): spec
+            for spec in strategies
+        }
+    named = list(strategies.items())
+    for _, spec in named:
+        resolve_strategy(spec)  # Báo lỗi chiến thuật trước khi chạy
+    if seed is None:
+        seed = random.getrandbits(64)
+    chunks = [
+        (min(chunk_size, rounds - start), chunk_seed(seed, index))
+        for index, start in enumerate(range(0, rounds, chunk_size))
+    ]
+    totals = [StrategyResult(name) for name, _ in named]
+
+    def merge(results: list[StrategyResult]):
+        for total, result in zip(totals, results):
+            total.merge(result)
+
+    if workers == 1:
+        for size, chunk in chunks:
+            merge(_play_chunk(named, size, chunk, players, num_decks, penetration))
+        return totals, seed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _play_chunk, named, size, chunk, players, num_decks, penetration
+            )
+            for size, chunk in chunks
+        ]
+        for future in as_completed(futures):
+            merge(future.result())
+    return totals, seed
+
+
+def _percent(value: float) -> str:
+    return f"{value * 100:.2f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giải đấu chiến thuật Xì Dách.")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=list(DEFAULT_STRATEGIES),
+        help='vd. basic, stand:17, random:0.3, "module:hàm"',
+    )
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    z = NormalDist().inv_cdf(0.5 + args.confidence / 2)
+    started = time.perf_counter()
+    results, seed = run_tournament(
+        args.strategies,
+        args.rounds,
+        players=args.players,
+        num_decks=args.decks,
+        penetration=args.penetration,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+
+    total_rounds = args.rounds * len(results)
+    print(
+        f"{len(results)} chiến thuật x {args.rounds:,} ván x {args.players} ghế,"
+        f" {args.workers} process: {elapsed:.2f}s"
+        f" ({total_rounds / elapsed:,.0f} ván/giây), seed {seed}"
+    )
+    print(f"Khoảng tin cậy {args.confidence:.0%} (Wilson cho tỉ lệ, chuẩn cho EV)")
+    width = max(14, *(len(result.name) + 2 for result in results))
+    header = f"{'chiến thuật':<{width}}"
+    for title in ("thắng", "thua", "hòa"):
+        header += f"{title:>24}"
+    print(f"{header}{'quắc':>9}{'EV/tay':>28}")
+    for result in sorted(results, key=lambda r: r.ev, reverse=True):
+        row = f"{result.name:<{width}}"
+        for outcome in GameResult:
+            low, high = result.interval(outcome, z)
+            cell = (
+                f"{_percent(result.rate(outcome))} [{_percent(low)}, {_percent(high)}]"
+            )
+            row += f"{cell:>24}"
+        low, high = result.ev_interval(z)
+        ev = f"{result.ev:+.4f} [{low:+.4f}, {high:+.4f}]"
+        print(f"{row}{_percent(result.bust_rate):>9}{ev:>28}")
+
+
+if __name__ == "__main__":
+    main()
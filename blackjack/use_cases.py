@@ -3,33 +3,82 @@
 # Mô tả: Lớp Use Cases - Chứa logic nghiệp vụ của ứng dụng.
 # Lớp này điều phối các entities và sử dụng các interfaces để thực hiện công việc.
 # ==============================================================================
-from .entities import Game, GameState
-from .interfaces import IGameRepository
+from .entities import Deck, Game, GameState, ShoeStats
+from .events import EventType, GameEvent, join_event, start_event
+from .interfaces import IGameEventLog, IGameRepository
+from .leaderboard import GLOBAL, Leaderboards, PlayerStats
+from .ledger import ChipLedger
+from .shoe import BetSpreadMonitor, ShoeManager
+from .strategy import StrategyTable
 
 
 class GameUseCase:
     """Bao gồm các hành động mà người dùng có thể thực hiện trong game."""
 
-    def __init__(self, repo: IGameRepository):
+    def __init__(
+        self,
+        repo: IGameRepository,
+        strategy: StrategyTable | None = None,
+        shoes: ShoeManager | None = None,
+        events: IGameEventLog | None = None,
+        ledger: ChipLedger | None = None,
+        leaderboards: Leaderboards | None = None,
+        bet_monitor: BetSpreadMonitor | None = None,
+    ):
         self.repo = repo
+        self.strategy = strategy
+        self.shoes = shoes
+        self.events = events
+        self.ledger = ledger
+        self.leaderboards = leaderboards
+        self.bet_monitor = bet_monitor
 
-    def start_new_game(self, channel_id: int, players: dict[int, str]) -> Game:
-        """Bắt đầu một ván chơi mới."""
-        game = Game(channel_id)
+    def start_new_game(
+        self,
+        channel_id: int,
+        players: dict[int, str],
+        seed: int | None = None,
+        guild_id: int = GLOBAL,
+    ) -> Game:
+        """Bắt đầu một ván chơi mới.
+
+        Có seed thì ván dùng shoe mới xáo theo seed đó, nên cùng seed và cùng chuỗi
+        hành động sẽ cho lại đúng ván này. guild_id chọn bảng xếp hạng của ván.
+        """
+        if self.shoes:
+            deck = self.shoes.get_shoe(channel_id, seed)
+        else:
+            deck = Deck(seed=seed) if seed is not None else None
+        waiting = self.repo.get_game(channel_id)
+        if waiting and waiting.state != GameState.WAITING_FOR_PLAYERS:
+            waiting = None
+        game = Game(channel_id, deck=deck)
+        game.guild_id = guild_id
         for user_id, name in players.items():
             game.add_player(user_id, name)
+            if waiting and user_id in waiting.players:
+                # Mang tiền cược đã lưu ở phòng chờ sang ván
+                game.players[user_id].bet = waiting.players[user_id].bet
 
         if not game.players:
             raise ValueError("Không có người chơi.")
 
+        if self.events:
+            # Ghi thứ tự shoe trước khi chia để replay chia lại y hệt
+            self.events.append(start_event(game))
         game.start_game()
+        self._finish_if_over(game)
         self.repo.save_game(game)
         return game
 
     def join_game(
-        self, channel_id: int, user_id: int, user_name: str
+        self, channel_id: int, user_id: int, user_name: str, bet: int | None = None
     ) -> tuple[Game, bool]:
-        """Cho phép người chơi tham gia vào ván đang chờ."""
+        """Cho phép người chơi tham gia vào ván đang chờ.
+
+        Nếu có sổ cái chip, tiền cược (mặc định default_bet) được giữ ngay khi
+        tham gia; ValueError nếu không đủ chip.
+        """
         game = self.repo.get_game(channel_id)
         if not game:
             game = Game(channel_id)
@@ -40,12 +89,29 @@ class GameUseCase:
         if user_id in game.players:
             return game, False  # Đã tham gia rồi
 
+        if self.ledger:
+            if bet is None:
+                bet = self.ledger.default_bet
+            self.ledger.place_bet(channel_id, user_id, bet)
+            if self.bet_monitor:
+                true_count = self.next_round_true_count(channel_id)
+                self.bet_monitor.record(user_id, true_count, bet)
         game.add_player(user_id, user_name)
+        if self.ledger:
+            # Lưu tiền cược cùng game để giữ lại được sau khi khởi động lại
+            game.players[user_id].bet = bet
         self.repo.save_game(game)
+        if self.events:
+            self.events.append(join_event(channel_id, user_id, user_name))
         return game, True
 
-    def player_action(self, channel_id: int, user_id: int, action: str) -> Game:
-        """Xử lý hành động 'hit' (rút) hoặc 'stand' (dừng) của người chơi."""
+    def player_action(
+        self, channel_id: int, user_id: int, action: str, timed_out: bool = False
+    ) -> Game:
+        """Xử lý hành động 'hit' (rút) hoặc 'stand' (dừng) của người chơi.
+
+        timed_out=True khi hệ thống tự stand do hết giờ (chỉ khác ở nhật ký).
+        """
         game = self.repo.get_game(channel_id)
         if not game:
             raise ValueError("Không có ván chơi nào đang diễn ra.")
@@ -55,15 +121,112 @@ class GameUseCase:
             raise PermissionError("Không phải lượt của bạn.")
 
         if action == "hit":
-            game.player_hit(user_id)
+            done = game.player_hit(user_id)
+            kind = EventType.HIT
         elif action == "stand":
-            game.player_stand(user_id)
+            done = game.player_stand(user_id)
+            kind = EventType.TIMEOUT_STAND if timed_out else EventType.STAND
         else:
             raise ValueError("Hành động không hợp lệ.")
 
+        self._finish_if_over(game)
         self.repo.save_game(game)
+        if done and self.events:
+            self.events.append(GameEvent(kind, channel_id, user_id))
         return game
 
+    def _finish_if_over(self, game: Game):
+        """Thanh toán chip và cập nhật bảng xếp hạng khi ván vừa kết thúc."""
+        if game.state != GameState.GAME_OVER:
+            return
+        if self.ledger:
+            self.ledger.settle(game)
+        if self.leaderboards:
+            self.leaderboards.record(game, game.guild_id)
+
+    def restore_wagers(self) -> int:
+        """Giữ lại tiền cược của các ván được nạp lại khi khởi động (nếu có sổ cái)."""
+        if self.ledger is None:
+            return 0
+        return self.ledger.restore(self.repo.all_games())
+
+    def get_balance(self, user_id: int) -> tuple[int, int]:
+        """(Số dư, số chip còn có thể cược) của người chơi."""
+        if self.ledger is None:
+            raise RuntimeError("Chưa bật chế độ cược chip.")
+        return self.ledger.balance(user_id), self.ledger.available(user_id)
+
+    def _require_leaderboards(self) -> Leaderboards:
+        if self.leaderboards is None:
+            raise RuntimeError("Chưa bật bảng xếp hạng.")
+        return self.leaderboards
+
+    def get_leaderboard(
+        self, guild_id: int, metric: str, n: int = 10
+    ) -> list[tuple[int, PlayerStats, int]]:
+        """n người đứng đầu bảng (guild_id = GLOBAL cho bảng toàn cục)."""
+        return self._require_leaderboards().top(guild_id, metric, n)
+
+    def get_rank(
+        self, guild_id: int, metric: str, user_id: int
+    ) -> tuple[int, int, int]:
+        """(Hạng, tổng số người, điểm) của người chơi trong bảng."""
+        ranked = self._require_leaderboards().rank(guild_id, metric, user_id)
+        if ranked is None:
+            raise ValueError("Bạn chưa có ván nào trong bảng xếp hạng này.")
+        return ranked
+
+    def get_hint(self, channel_id: int, user_id: int) -> tuple[Game, str, float]:
+        """Gợi ý rút/dằn và EV cho tay bài hiện tại của người chơi."""
+        if self.strategy is None:
+            raise RuntimeError("Chưa cấu hình bảng chiến thuật.")
+
+        game = self.repo.get_game(channel_id)
+        if not game or game.state != GameState.PLAYERS_TURN:
+            raise ValueError("Không có ván chơi nào đang diễn ra.")
+
+        player = game.get_player(user_id)
+        if not player:
+            raise PermissionError("Bạn không tham gia ván này.")
+
+        action, ev = self.strategy.lookup_hand(player.hand, game.dealer.hand.codes[0])
+        return game, action, ev
+
+    def _current_shoe(self, channel_id: int) -> Deck | None:
+        game = self.repo.get_game(channel_id)
+        if game and game.state != GameState.WAITING_FOR_PLAYERS:
+            return game.deck
+        if self.shoes:
+            return self.shoes.current(channel_id)
+        return None
+
+    def next_round_true_count(self, channel_id: int) -> float:
+        """True count của shoe mà ván tới của kênh sẽ dùng (0 nếu là shoe mới)."""
+        shoe = self.shoes.current(channel_id) if self.shoes else None
+        if shoe is None or shoe.needs_shuffle:
+            return 0.0
+        return shoe.true_count
+
+    def get_shoe_stats(self, channel_id: int) -> ShoeStats:
+        """Thống kê shoe hiện tại của kênh (thành phần, running/true count)."""
+        shoe = self._current_shoe(channel_id)
+        if shoe is None:
+            raise ValueError("Kênh này chưa chia ván nào.")
+        return shoe.stats()
+
+    def get_bet_suspects(self, user_ids=None) -> list[tuple[int, float]]:
+        """Những người cược chênh theo true count (nghi đếm bài)."""
+        if self.bet_monitor is None:
+            return []
+        return self.bet_monitor.suspects(user_ids)
+
     def end_game(self, channel_id: int):
         """Kết thúc và xóa game khỏi bộ nhớ."""
+        if self.events and self.repo.get_game(channel_id) is not None:
+            self.events.append(GameEvent(EventType.END, channel_id))
+        if self.ledger:
+            # Ván chưa được thanh toán (bị hủy giữa chừng) được trả lại tiền cược
+            self.ledger.release(channel_id)
+        if self.leaderboards:
+            self.leaderboards.forget(channel_id)
         self.repo.delete_game(channel_id)
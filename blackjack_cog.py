@@ -8,42 +8,247 @@ from discord.ext import commands
 from discord import app_commands
 from blackjack.use_cases import GameUseCase
 from blackjack.adapters.discord_presenter import DiscordPresenter
+from blackjack.adapters.timer_wheel import TimerWheel
+from blackjack.adapters.channel_actor import ChannelActors
+from blackjack.adapters.live_table import LiveTableMessages
+from blackjack.adapters.outbound import OutboundDispatcher
+from blackjack.adapters.metrics import MetricsRegistry
+from blackjack.adapters.profiling import (
+    MODES as PROFILE_MODES,
+    SAMPLE,
+    CommandTrace,
+    ProfilerController,
+    TracedProxy,
+    current_trace,
+    trace_phase,
+)
 from blackjack.entities import GameState
+from blackjack.leaderboard import CHIPS, GLOBAL, METRICS, WINS
+from settings import (
+    WAITING_ROOM_TIMEOUT,
+    PLAYER_TURN_TIMEOUT,
+    LIVE_TABLE,
+    LIVE_TABLE_DEBOUNCE,
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_CHANNEL_RATE,
+    OUTBOUND_CHANNEL_BURST,
+    PROFILING_ENABLED,
+    PROFILE_DIR,
+    PROFILE_INTERVAL,
+    PROFILE_MAX_SECONDS,
+    SLOW_COMMAND_MS,
+)
 import asyncio
-from settings import WAITING_ROOM_TIMEOUT, PLAYER_TURN_TIMEOUT
+import inspect
 import logging
+import time
+from collections import Counter
 from datetime import datetime
+from functools import partial, wraps
+from typing import Optional
+
+# Phạm vi của bảng xếp hạng: máy chủ hiện tại hoặc toàn cục
+SCOPES = ("server", "global")
+
+
+async def _resolve(result):
+    """Kết quả của use case; ShardedGameUseCase trả về coroutine (gọi qua IPC)."""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def _timed(name: str):
+    """Ghi thời gian xử lý lệnh vào histogram và log lệnh chậm (nếu được bật)."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            histogram = self._command_latency
+            threshold = self.slow_command_threshold
+            if histogram is None and not threshold:
+                return await func(self, *args, **kwargs)
+            trace = token = None
+            if threshold:
+                # Tham số đầu là ctx (lệnh prefix) hoặc interaction (slash)
+                channel = getattr(args[0], "channel", None) if args else None
+                trace = CommandTrace(name, getattr(channel, "id", None))
+                token = current_trace.set(trace)
+            started = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if histogram is not None:
+                    histogram.observe(elapsed, name)
+                if trace is not None:
+                    current_trace.reset(token)
+                    if elapsed >= threshold:
+                        self.logger.warning(
+                            f"Lệnh chậm /{name} ở channel {trace.channel_id}: "
+                            f"{elapsed * 1e3:.1f}ms ({trace.format(elapsed)})"
+                        )
+
+        return wrapper
+
+    return decorator
 
 
 class BlackjackCog(commands.Cog):
     """Một Cog chứa các lệnh để chơi game Xì Dách."""
 
     def __init__(
-        self, bot: commands.Bot, use_case: GameUseCase, presenter: DiscordPresenter
+        self,
+        bot: commands.Bot,
+        use_case: GameUseCase,
+        presenter: DiscordPresenter,
+        metrics: Optional[MetricsRegistry] = None,
     ):
         self.bot = bot
         self.use_case = use_case
         self.presenter = presenter
+        # Log lệnh chậm hơn ngưỡng, kèm thời gian theo giai đoạn
+        self.slow_command_threshold = SLOW_COMMAND_MS / 1000
+        if self.slow_command_threshold:
+            self.use_case = TracedProxy(use_case, "use_case")
+            self.presenter = TracedProxy(presenter, "render")
+        # Profiling theo yêu cầu của admin (/profile)
+        self.profiler = (
+            ProfilerController(PROFILE_DIR, PROFILE_INTERVAL, PROFILE_MAX_SECONDS)
+            if PROFILING_ENABLED
+            else None
+        )
+        self._profile_report: Optional[asyncio.Task] = None
         # Lưu trữ người khởi tạo phòng chờ để chỉ họ có quyền bắt đầu
         self.game_starters = {}
-        # Lưu trữ task timeout cho từng phòng chờ
-        self.waiting_room_timeouts = {}  # channel_id: asyncio.Task
-        self.player_turn_timeouts = {}  # channel_id: asyncio.Task
+        # Một bánh xe hẹn giờ dùng chung cho mọi timeout của mọi kênh
+        self.timers = TimerWheel(tick=1.0)
+        # Lưu trữ hẹn giờ timeout cho từng phòng chờ / lượt chơi
+        self.waiting_room_timeouts = {}  # channel_id: TimerHandle
+        self.player_turn_timeouts = {}  # channel_id: TimerHandle
+        # Mỗi kênh một actor: các thay đổi game được xử lý tuần tự theo kênh
+        self.actors = ChannelActors(on_render=self._render_table)
+        # Tin nhắn gửi đi được xếp hàng theo kênh và giữ nhịp theo giới hạn Discord
+        self.outbound = OutboundDispatcher(
+            global_rate=OUTBOUND_GLOBAL_RATE,
+            channel_rate=OUTBOUND_CHANNEL_RATE,
+            channel_burst=OUTBOUND_CHANNEL_BURST,
+        )
+        self.metrics = metrics
+        self._command_latency = None
+        if metrics is not None:
+            self._register_metrics(metrics)
+        # Chế độ bàn chơi sống: một tin nhắn mỗi ván, được sửa tại chỗ
+        self.live_tables = (
+            LiveTableMessages(debounce=LIVE_TABLE_DEBOUNCE, outbound=self.outbound)
+            if LIVE_TABLE
+            else None
+        )
         self.logger = logging.getLogger("blackjack-bot.cog")
 
-    async def _send_message(self, ctx, *args, **kwargs):
-        # Helper to send message correctly for both classic and slash commands
-        if hasattr(ctx, "interaction") and ctx.interaction is not None:
-            interaction = ctx.interaction
-            if not interaction.response.is_done():
+    def _register_metrics(self, metrics: MetricsRegistry):
+        """Khai báo các metric của Cog; gauge chỉ được tính khi scrape."""
+        self._command_latency = metrics.histogram(
+            "blackjack_command_duration_seconds",
+            "Thời gian xử lý lệnh (không gồm gửi tin trong hàng đợi).",
+            ("command",),
+        )
+        outbound = metrics.histogram(
+            "blackjack_outbound_duration_seconds",
+            "Thời gian tin nhắn chờ trong hàng (queue) và gửi lên Discord (send).",
+            ("phase",),
+        )
+        queued, sent = outbound.labels("queue"), outbound.labels("send")
+
+        def on_send(queue_seconds: float, send_seconds: float):
+            queued.observe(queue_seconds)
+            sent.observe(send_seconds)
+
+        self.outbound.on_send = on_send
+
+        def games_by_state():
+            counts = Counter(g.state.name for g in self.use_case.repo.all_games())
+            return {(state.name,): counts[state.name] for state in GameState}
+
+        metrics.gauge(
+            "blackjack_games", "Số game theo trạng thái.", games_by_state, ("state",)
+        )
+        metrics.gauge(
+            "blackjack_pending_timeouts",
+            "Số hẹn giờ timeout đang chờ theo loại.",
+            lambda: {
+                ("waiting_room",): len(self.waiting_room_timeouts),
+                ("player_turn",): len(self.player_turn_timeouts),
+            },
+            ("kind",),
+        )
+        metrics.gauge(
+            "blackjack_timer_wheel_pending",
+            "Tổng số hẹn giờ trong bánh xe hẹn giờ.",
+            lambda: len(self.timers),
+        )
+        metrics.gauge(
+            "blackjack_outbound_queue_depth",
+            "Số tin nhắn đang chờ gửi.",
+            lambda: len(self.outbound),
+        )
+        metrics.gauge(
+            "blackjack_channel_actors",
+            "Số actor kênh đang hoạt động.",
+            lambda: len(self.actors),
+        )
+
+    def cog_unload(self):
+        self.timers.close()
+        self.actors.close()
+        if self.profiler:
+            self.profiler.close()
+        if self.live_tables:
+            self.live_tables.close()
+        self.outbound.close()
+
+    async def _send_message(self, ctx, *args, key=None, **kwargs):
+        # Helper to send message correctly for both classic and slash commands.
+        # Phản hồi interaction phải tới trong 3 giây nên được gửi ngay; các tin
+        # còn lại vào hàng đợi của kênh (tin cùng `key` chưa gửi sẽ bị thay thế).
+        with trace_phase("send"):
+            interaction = getattr(ctx, "interaction", None)
+            if interaction is not None and not interaction.response.is_done():
                 await interaction.response.send_message(*args, **kwargs)
+                return
+            if interaction is not None:
+                send = partial(interaction.followup.send, *args, **kwargs)
             else:
-                await interaction.followup.send(*args, **kwargs)
-        else:
-            await ctx.send(*args, **kwargs)
+                send = partial(ctx.send, *args, **kwargs)
+            self.outbound.submit(ctx.channel.id, send, key=key)
+
+    async def _run_step(self, channel_id: int, step, ctx=None) -> bool:
+        """Chạy một bước trong actor của kênh, mang theo trace của lệnh (nếu có)."""
+        if self.slow_command_threshold:
+            trace = current_trace.get()
+            submitted = time.perf_counter()
+
+            async def traced_step(step=step):
+                # Chạy trong task của actor: đặt trace để bước này và phần vẽ
+                # bàn ngay sau lô được tính cho lệnh tương ứng
+                current_trace.set(trace)
+                if trace is not None:
+                    trace.add("queue", time.perf_counter() - submitted)
+                return await step()
+
+            return await self.actors.run(channel_id, traced_step, ctx)
+        return await self.actors.run(channel_id, step, ctx)
 
     async def _waiting_room_timeout(self, channel_id: int, ctx: commands.Context):
-        await asyncio.sleep(WAITING_ROOM_TIMEOUT)  # timeout lấy từ settings
+        # Được gọi bởi bánh xe hẹn giờ sau WAITING_ROOM_TIMEOUT giây
+        await self._run_step(
+            channel_id, partial(self._close_idle_waiting_room, channel_id, ctx)
+        )
+
+    async def _close_idle_waiting_room(
+        self, channel_id: int, ctx: commands.Context
+    ) -> bool:
+        self.waiting_room_timeouts.pop(channel_id, None)
         game = self.use_case.repo.get_game(channel_id)
         if (
             game
@@ -51,29 +256,42 @@ class BlackjackCog(commands.Cog):
             and len(game.players) <= 1
         ):
             self.logger.info(f"Timeout phòng chờ channel {channel_id}, tự động đóng.")
-            self.use_case.end_game(channel_id)
+            await _resolve(self.use_case.end_game(channel_id))
             if channel_id in self.game_starters:
                 del self.game_starters[channel_id]
-            await ctx.send(
-                "⏰ Phòng chờ đã bị đóng do không có ai tham gia sau 5 phút."
+            await self._send_message(
+                ctx, "⏰ Phòng chờ đã bị đóng do không có ai tham gia sau 5 phút."
             )
-        self.waiting_room_timeouts.pop(channel_id, None)
+        return False
 
     async def _start_player_turn_timeout(
-        self, channel_id: int, player_id: int, ctx: commands.Context
+        self, channel_id: int, player_id: int, ctx: commands.Context, mention=True
     ):
         self._cancel_player_turn_timeout(channel_id)
-        # Gửi mention khi tới lượt mới
-        mention_msg = f"<@{player_id}>, tới lượt bạn!"
-        await self._send_message(ctx, mention_msg)
-        self.player_turn_timeouts[channel_id] = asyncio.create_task(
-            self._player_turn_timeout(channel_id, player_id, ctx)
+        # Gửi mention khi tới lượt mới (tin cùng key "turn" chưa gửi được gộp)
+        if mention:
+            mention_msg = f"<@{player_id}>, tới lượt bạn!"
+            await self._send_message(ctx, mention_msg, key="turn")
+        self.player_turn_timeouts[channel_id] = self.timers.schedule(
+            PLAYER_TURN_TIMEOUT, self._player_turn_timeout, channel_id, player_id, ctx
         )
 
     async def _player_turn_timeout(
         self, channel_id: int, player_id: int, ctx: commands.Context
     ):
-        await asyncio.sleep(PLAYER_TURN_TIMEOUT)
+        # Được gọi bởi bánh xe hẹn giờ sau PLAYER_TURN_TIMEOUT giây
+        await self._run_step(
+            channel_id, partial(self._timeout_stand, channel_id, player_id, ctx), ctx
+        )
+
+    async def _timeout_stand(
+        self, channel_id: int, player_id: int, ctx: commands.Context
+    ) -> bool:
+        timer = self.player_turn_timeouts.get(channel_id)
+        if timer is not None and timer.pending():
+            # Một hành động xếp hàng trước đã mở lượt mới, timeout này hết hiệu lực
+            return False
+        self.player_turn_timeouts.pop(channel_id, None)
         game = self.use_case.repo.get_game(channel_id)
         if (
             game
@@ -85,32 +303,105 @@ class BlackjackCog(commands.Cog):
                 ctx, f"⏰ <@{player_id}> đã hết thời gian lượt chơi và bị bỏ lượt!"
             )
             try:
-                game = self.use_case.player_action(channel_id, player_id, "stand")
-                embed = self.presenter.create_channel_embed(game)
-                await self._send_message(ctx, embed=embed)
-                if game.state == GameState.GAME_OVER:
-                    final_embed = self.presenter.create_final_result_embed(game)
-                    await self._send_message(ctx, embed=final_embed)
-                    self.use_case.end_game(channel_id)
-                    if channel_id in self.game_starters:
-                        del self.game_starters[channel_id]
-                else:
-                    current = game.get_current_player()
-                    if current:
-                        await self._start_player_turn_timeout(
-                            channel_id, current.id, ctx
-                        )
+                await _resolve(
+                    self.use_case.player_action(
+                        channel_id, player_id, "stand", timed_out=True
+                    )
+                )
+                return True
             except Exception as e:
                 self.logger.warning(
                     f"Lỗi khi tự động stand cho player {player_id} ở channel {channel_id}: {e}"
                 )
-        self.player_turn_timeouts.pop(channel_id, None)
+        return False
+
+    def on_game_evicted(self, channel_id: int, game, reason: str):
+        """Repository đã loại game (TTL/giới hạn): dọn mọi bảng phụ của kênh."""
+        self.game_starters.pop(channel_id, None)
+        timer = self.waiting_room_timeouts.pop(channel_id, None)
+        if timer:
+            timer.cancel()
+        self._cancel_player_turn_timeout(channel_id)
+        if self.live_tables:
+            self.live_tables.finish(channel_id)
+        if self.use_case.shoes:
+            self.use_case.shoes.discard(channel_id)
+        if self.use_case.ledger:
+            # Ván bị loại khi chưa thanh toán: trả lại tiền cược
+            self.use_case.ledger.release(channel_id)
+        if self.use_case.leaderboards:
+            self.use_case.leaderboards.forget(channel_id)
+        self.logger.info(f"Đã dọn dữ liệu của game bị loại ở channel {channel_id}.")
+
+    async def _load_balance(self, user_id: int):
+        # Nạp số dư trong executor để không đọc SQLite trên event loop
+        if self.use_case.ledger:
+            await self.use_case.ledger.load(user_id)
 
     def _cancel_player_turn_timeout(self, channel_id: int):
         if channel_id in self.player_turn_timeouts:
             self.player_turn_timeouts[channel_id].cancel()
             del self.player_turn_timeouts[channel_id]
 
+    async def _render_table(self, channel_id: int, ctx: commands.Context):
+        """Vẽ lại bàn chơi một lần sau mỗi lô hành động của kênh (do actor gọi)."""
+        self._cancel_player_turn_timeout(channel_id)
+        game = self.use_case.repo.get_game(channel_id)
+        if not game or game.state == GameState.WAITING_FOR_PLAYERS:
+            return
+        if self.live_tables is not None:
+            await self._render_live_table(channel_id, ctx, game)
+            return
+        # Gửi trạng thái toàn bộ bàn chơi công khai
+        embed = self.presenter.create_channel_embed(game)
+        await self._send_message(ctx, embed=embed, key="table")
+        if game.state == GameState.GAME_OVER:
+            # Mention lượt chơi chưa kịp gửi không còn ý nghĩa
+            self.outbound.discard(channel_id, "turn")
+            final_embed = self.presenter.create_final_result_embed(game)
+            await self._send_message(ctx, embed=final_embed)
+            await _resolve(self.use_case.end_game(channel_id))
+            if channel_id in self.game_starters:
+                del self.game_starters[channel_id]
+        else:
+            current = game.get_current_player()
+            if current:
+                await self._start_player_turn_timeout(channel_id, current.id, ctx)
+
+    async def _render_live_table(self, channel_id: int, ctx: commands.Context, game):
+        """Sửa tin nhắn bàn chơi của ván thay vì gửi embed mới."""
+        embeds = [self.presenter.create_channel_embed(game)]
+        content = None
+        current = None
+        if game.state == GameState.GAME_OVER:
+            embeds.append(self.presenter.create_final_result_embed(game))
+        else:
+            current = game.get_current_player()
+            if current:
+                content = f"<@{current.id}>, tới lượt bạn!"
+        self.live_tables.update(channel_id, ctx.channel, content=content, embeds=embeds)
+        # Slash command vẫn phải được phản hồi: xác nhận riêng cho người gọi
+        if hasattr(ctx, "interaction") and ctx.interaction is not None:
+            if not ctx.interaction.response.is_done():
+                await ctx.interaction.response.send_message(
+                    "✅ Đã cập nhật bàn chơi.", ephemeral=True
+                )
+        if game.state == GameState.GAME_OVER:
+            self.outbound.discard(channel_id, "turn")
+            self.live_tables.finish(channel_id)
+            await _resolve(self.use_case.end_game(channel_id))
+            if channel_id in self.game_starters:
+                del self.game_starters[channel_id]
+        elif current:
+            # Mention trong tin nhắn được sửa không báo cho người chơi: ping riêng
+            # mỗi khi sang lượt người khác
+            await self._start_player_turn_timeout(
+                channel_id,
+                current.id,
+                ctx,
+                mention=self.live_tables.new_turn(channel_id, current.id),
+            )
+
     # XÓA các hàm và logic liên quan đến gửi DM/inbox
     # 1. Xóa _check_dm_permission
     # 2. Xóa _send_dm_to_all_players
@@ -120,10 +411,16 @@ class BlackjackCog(commands.Cog):
     # --- XÓA _check_dm_permission và _send_dm_to_all_players ---
     # (Không cần thay thế, chỉ xóa)
 
-    # --- Sửa các lệnh: bỏ kiểm tra DM và gửi DM ---
+    # --- Các lệnh: mọi thay đổi game đều đi qua actor của kênh ---
     @commands.command(name="blackjack", aliases=["bj"])
-    async def blackjack(self, ctx: commands.Context):
+    @_timed("blackjack")
+    async def blackjack(self, ctx: commands.Context, bet: Optional[int] = None):
         """Bắt đầu một phòng chờ game Xì Dách."""
+        await self._run_step(ctx.channel.id, partial(self._do_blackjack, ctx, bet))
+
+    async def _do_blackjack(
+        self, ctx: commands.Context, bet: Optional[int] = None
+    ) -> bool:
         game = self.use_case.repo.get_game(ctx.channel.id)
         if game and game.state in (
             GameState.WAITING_FOR_PLAYERS,
@@ -137,11 +434,18 @@ class BlackjackCog(commands.Cog):
             self.logger.warning(
                 f"Channel {ctx.channel.id} đã có game active, không tạo mới."
             )
-            return
+            return False
         # KHÔNG kiểm tra DM nữa
-        game, joined = self.use_case.join_game(
-            ctx.channel.id, ctx.author.id, ctx.author.display_name
-        )
+        try:
+            await self._load_balance(ctx.author.id)
+            game, joined = await _resolve(
+                self.use_case.join_game(
+                    ctx.channel.id, ctx.author.id, ctx.author.display_name, bet
+                )
+            )
+        except ValueError as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}")
+            return False
         self.game_starters[ctx.channel.id] = ctx.author.id
         self.logger.info(
             f"Tạo phòng chờ mới ở channel {ctx.channel.id} bởi user {ctx.author.id} ({ctx.author.display_name})"
@@ -149,27 +453,36 @@ class BlackjackCog(commands.Cog):
         embed = self.presenter.create_waiting_embed(game)
         await self._send_message(ctx, embed=embed)
         if ctx.channel.id not in self.waiting_room_timeouts:
-            self.waiting_room_timeouts[ctx.channel.id] = asyncio.create_task(
-                self._waiting_room_timeout(ctx.channel.id, ctx)
+            self.waiting_room_timeouts[ctx.channel.id] = self.timers.schedule(
+                WAITING_ROOM_TIMEOUT, self._waiting_room_timeout, ctx.channel.id, ctx
             )
+        return False
 
     @commands.command(name="join")
-    async def join(self, ctx: commands.Context):
-        """Tham gia vào một ván Xì Dách đang chờ."""
+    @_timed("join")
+    async def join(self, ctx: commands.Context, bet: Optional[int] = None):
+        """Tham gia vào một ván Xì Dách đang chờ (kèm tiền cược nếu bật chip)."""
+        await self._run_step(ctx.channel.id, partial(self._do_join, ctx, bet))
+
+    async def _do_join(self, ctx: commands.Context, bet: Optional[int] = None) -> bool:
         try:
             # KHÔNG kiểm tra DM nữa
-            game, joined = self.use_case.join_game(
-                ctx.channel.id, ctx.author.id, ctx.author.display_name
+            await self._load_balance(ctx.author.id)
+            game, joined = await _resolve(
+                self.use_case.join_game(
+                    ctx.channel.id, ctx.author.id, ctx.author.display_name, bet
+                )
             )
             # Gửi thông báo join thành công ngay lập tức (và defer nếu là slash command)
             join_msg = f"{ctx.author.display_name} đã tham gia ván đấu!"
-            if hasattr(ctx, "interaction") and ctx.interaction is not None:
-                interaction = ctx.interaction
-                if not interaction.response.is_done():
-                    await interaction.response.defer(thinking=False)
-                await interaction.followup.send(join_msg)
-            else:
-                await self._send_message(ctx, join_msg)
+            ledger = self.use_case.ledger
+            if joined and ledger:
+                wager = ledger.bet_of(ctx.channel.id, ctx.author.id)
+                join_msg = (
+                    f"{ctx.author.display_name} đã tham gia ván đấu "
+                    f"(cược {wager} chip)!"
+                )
+            await self._send_message(ctx, join_msg)
             if joined:
                 self.logger.info(
                     f"User {ctx.author.id} ({ctx.author.display_name}) join phòng chờ channel {ctx.channel.id}"
@@ -186,15 +499,20 @@ class BlackjackCog(commands.Cog):
                 await self._send_message(
                     ctx, f"{ctx.author.display_name}, bạn đã ở trong phòng chờ rồi."
                 )
-        except RuntimeError as e:
+        except (RuntimeError, ValueError) as e:
             self.logger.warning(
                 f"User {ctx.author.id} join phòng chờ channel {ctx.channel.id} lỗi: {e}"
             )
             await self._send_message(ctx, f"Lỗi: {e}")
+        return False
 
     @commands.command(name="start")
+    @_timed("start")
     async def start(self, ctx: commands.Context):
         """Bắt đầu ván chơi với những người đã tham gia."""
+        await self._run_step(ctx.channel.id, partial(self._do_start, ctx), ctx)
+
+    async def _do_start(self, ctx: commands.Context) -> bool:
         starter = self.game_starters.get(ctx.channel.id)
         if starter != ctx.author.id:
             await self._send_message(
@@ -203,133 +521,113 @@ class BlackjackCog(commands.Cog):
             self.logger.warning(
                 f"User {ctx.author.id} cố gắng start game ở channel {ctx.channel.id} nhưng không phải starter."
             )
-            return
+            return False
         game = self.use_case.repo.get_game(ctx.channel.id)
         if not game or not game.players:
             await self._send_message(ctx, "Không có ai trong phòng chờ để bắt đầu.")
             self.logger.warning(
                 f"Channel {ctx.channel.id} không có ai trong phòng chờ khi start."
             )
-            return
+            return False
         if game.state != GameState.WAITING_FOR_PLAYERS:
             await self._send_message(ctx, "Ván chơi đã bắt đầu rồi.")
             self.logger.warning(
                 f"Channel {ctx.channel.id} đã start game khi game đã chạy."
             )
-            return
+            return False
         players_data = {p.id: p.name for p in game.players.values()}
-        game = self.use_case.start_new_game(ctx.channel.id, players_data)
+        guild = getattr(ctx, "guild", None)
+        game = await _resolve(
+            self.use_case.start_new_game(
+                ctx.channel.id, players_data, guild_id=guild.id if guild else GLOBAL
+            )
+        )
         self.logger.info(
             f"Game bắt đầu ở channel {ctx.channel.id} với {len(players_data)} người chơi."
         )
         # Gửi bài riêng cho chính người gọi lệnh nếu là slash command
         if hasattr(ctx, "interaction") and ctx.interaction is not None:
-            interaction = ctx.interaction
             player = game.players.get(ctx.author.id)
             if player:
                 player_embed = self.presenter.create_player_dm_embed(game, player)
-                if not interaction.response.is_done():
-                    await interaction.response.send_message(
-                        embed=player_embed, ephemeral=True
-                    )
-                else:
-                    await interaction.followup.send(embed=player_embed, ephemeral=True)
+                await self._send_message(ctx, embed=player_embed, ephemeral=True)
         else:
             # Classic: gửi công khai cho tất cả
             for player in game.players.values():
                 player_embed = self.presenter.create_player_dm_embed(game, player)
                 await self._send_message(ctx, embed=player_embed)
-        # Gửi trạng thái toàn bộ bàn chơi công khai
-        embed = self.presenter.create_channel_embed(game)
-        await self._send_message(ctx, embed=embed)
-        if game.state == GameState.GAME_OVER:
-            final_embed = self.presenter.create_final_result_embed(game)
-            await self._send_message(ctx, embed=final_embed)
-            self.use_case.end_game(ctx.channel.id)
-            if ctx.channel.id in self.game_starters:
-                del self.game_starters[ctx.channel.id]
-        else:
-            current = game.get_current_player()
-            if current:
-                await self._start_player_turn_timeout(ctx.channel.id, current.id, ctx)
         if ctx.channel.id in self.waiting_room_timeouts:
             self.waiting_room_timeouts[ctx.channel.id].cancel()
             del self.waiting_room_timeouts[ctx.channel.id]
+        # Trạng thái bàn chơi được actor vẽ lại sau bước này
+        return True
 
     @commands.command(name="hit")
+    @_timed("hit")
     async def hit(self, ctx: commands.Context):
         """Rút thêm một lá bài."""
         try:
-            self._cancel_player_turn_timeout(ctx.channel.id)
-            game = self.use_case.player_action(ctx.channel.id, ctx.author.id, "hit")
-            # Gửi embed riêng cho người chơi (ephemeral nếu là slash command)
-            player = game.players.get(ctx.author.id)
-            if player:
-                player_embed = self.presenter.create_player_dm_embed(game, player)
-                if hasattr(ctx, "interaction") and ctx.interaction is not None:
-                    interaction = ctx.interaction
-                    if not interaction.response.is_done():
-                        await interaction.response.send_message(
-                            embed=player_embed, ephemeral=True
-                        )
-                    else:
-                        await interaction.followup.send(
-                            embed=player_embed, ephemeral=True
-                        )
-                else:
-                    await self._send_message(ctx, embed=player_embed)
-            # Sau đó gửi trạng thái toàn bộ bàn chơi (luôn công khai)
-            embed = self.presenter.create_channel_embed(game)
-            await self._send_message(ctx, embed=embed)
-            # KHÔNG gửi DM nữa
-            if game.state == GameState.GAME_OVER:
-                final_embed = self.presenter.create_final_result_embed(game)
-                await self._send_message(ctx, embed=final_embed)
-                self.use_case.end_game(ctx.channel.id)
-                if ctx.channel.id in self.game_starters:
-                    del self.game_starters[ctx.channel.id]
-            else:
-                current = game.get_current_player()
-                if current:
-                    await self._start_player_turn_timeout(
-                        ctx.channel.id, current.id, ctx
-                    )
+            await self._run_step(ctx.channel.id, partial(self._do_hit, ctx), ctx)
         except (ValueError, PermissionError) as e:
             await self._send_message(ctx, f"{ctx.author.mention}, {e}")
 
+    async def _do_hit(self, ctx: commands.Context) -> bool:
+        game = await _resolve(
+            self.use_case.player_action(ctx.channel.id, ctx.author.id, "hit")
+        )
+        # Gửi embed riêng cho người chơi (ephemeral nếu là slash command)
+        player = game.players.get(ctx.author.id)
+        if player:
+            player_embed = self.presenter.create_player_dm_embed(game, player)
+            if hasattr(ctx, "interaction") and ctx.interaction is not None:
+                await self._send_message(ctx, embed=player_embed, ephemeral=True)
+            else:
+                await self._send_message(ctx, embed=player_embed)
+        return True
+
     @commands.command(name="stand")
+    @_timed("stand")
     async def stand(self, ctx: commands.Context):
         """Dừng, không rút bài nữa."""
         try:
-            self._cancel_player_turn_timeout(ctx.channel.id)
-            game = self.use_case.player_action(ctx.channel.id, ctx.author.id, "stand")
-            embed = self.presenter.create_channel_embed(game)
-            await self._send_message(ctx, embed=embed)
-            # KHÔNG gửi DM nữa
-            if game.state == GameState.GAME_OVER:
-                final_embed = self.presenter.create_final_result_embed(game)
-                await self._send_message(ctx, embed=final_embed)
-                self.use_case.end_game(ctx.channel.id)
-                if ctx.channel.id in self.game_starters:
-                    del self.game_starters[ctx.channel.id]
-            else:
-                current = game.get_current_player()
-                if current:
-                    await self._start_player_turn_timeout(
-                        ctx.channel.id, current.id, ctx
-                    )
+            await self._run_step(ctx.channel.id, partial(self._do_stand, ctx), ctx)
         except (ValueError, PermissionError) as e:
             await self._send_message(ctx, f"{ctx.author.mention}, {e}")
 
+    async def _do_stand(self, ctx: commands.Context) -> bool:
+        await _resolve(
+            self.use_case.player_action(ctx.channel.id, ctx.author.id, "stand")
+        )
+        return True
+
+    @commands.command(name="hint")
+    @_timed("hint")
+    async def hint(self, ctx: commands.Context):
+        """Gợi ý nên rút hay dằn với tay bài hiện tại."""
+        try:
+            game, action, ev = self.use_case.get_hint(ctx.channel.id, ctx.author.id)
+        except (ValueError, PermissionError, RuntimeError) as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}", ephemeral=True)
+            return
+        player = game.players[ctx.author.id]
+        embed = self.presenter.create_hint_embed(game, player, action, ev)
+        await self._send_message(ctx, embed=embed, ephemeral=True)
+
     @commands.command(name="end", aliases=["stop"])
+    @_timed("end")
     async def end_game_command(self, ctx: commands.Context):
         """Buộc kết thúc ván chơi hiện tại."""
+        await self._run_step(ctx.channel.id, partial(self._do_end, ctx))
+
+    async def _do_end(self, ctx: commands.Context) -> bool:
         starter = self.game_starters.get(ctx.channel.id)
         # Cho phép người tạo phòng hoặc người có quyền quản lý kênh kết thúc
         if starter == ctx.author.id or ctx.author.guild_permissions.manage_channels:
-            self.use_case.end_game(ctx.channel.id)
+            await _resolve(self.use_case.end_game(ctx.channel.id))
             if ctx.channel.id in self.game_starters:
                 del self.game_starters[ctx.channel.id]
+            if self.live_tables:
+                self.live_tables.finish(ctx.channel.id)
             await self._send_message(ctx, "Đã kết thúc ván chơi hiện tại.")
             self.logger.info(
                 f"Game ở channel {ctx.channel.id} đã bị kết thúc bởi user {ctx.author.id} ({ctx.author.display_name})"
@@ -346,21 +644,145 @@ class BlackjackCog(commands.Cog):
             self.logger.warning(
                 f"User {ctx.author.id} cố gắng end game ở channel {ctx.channel.id} nhưng không có quyền."
             )
+        return False
+
+    @commands.command(name="balance", aliases=["chips"])
+    @_timed("balance")
+    async def balance(self, ctx: commands.Context):
+        """Xem số chip của bạn."""
+        await self._load_balance(ctx.author.id)
+        try:
+            balance, available = self.use_case.get_balance(ctx.author.id)
+        except RuntimeError as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}", ephemeral=True)
+            return
+        msg = f"💰 {ctx.author.display_name}: **{balance}** chip"
+        if available != balance:
+            msg += f" ({balance - available} chip đang cược)"
+        await self._send_message(ctx, msg, ephemeral=True)
+
+    def _board_scope(
+        self, ctx: commands.Context, metric: Optional[str], scope: str
+    ) -> tuple[int, str, str]:
+        """(guild_id, tiêu chí, tên phạm vi) cho lệnh bảng xếp hạng."""
+        if metric is None:
+            metric = CHIPS if self.use_case.ledger else WINS
+        if metric not in METRICS:
+            raise ValueError(f"Tiêu chí phải là một trong {', '.join(METRICS)}.")
+        if scope not in SCOPES:
+            raise ValueError(f"Phạm vi phải là một trong {', '.join(SCOPES)}.")
+        guild = getattr(ctx, "guild", None)
+        if scope == "global" or guild is None:
+            return GLOBAL, metric, "toàn cục"
+        return guild.id, metric, "máy chủ"
+
+    @commands.command(name="leaderboard", aliases=["top", "lb"])
+    @_timed("leaderboard")
+    async def leaderboard(
+        self, ctx: commands.Context, metric: Optional[str] = None, scope="server"
+    ):
+        """Xem bảng xếp hạng của máy chủ hoặc toàn cục."""
+        try:
+            guild_id, metric, label = self._board_scope(ctx, metric, scope)
+            rows = self.use_case.get_leaderboard(guild_id, metric)
+        except (ValueError, RuntimeError) as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}", ephemeral=True)
+            return
+        embed = self.presenter.create_leaderboard_embed(label, metric, rows)
+        await self._send_message(ctx, embed=embed)
+
+    @commands.command(name="rank")
+    @_timed("rank")
+    async def rank(
+        self, ctx: commands.Context, metric: Optional[str] = None, scope="server"
+    ):
+        """Xem hạng của bạn trên bảng xếp hạng."""
+        try:
+            guild_id, metric, label = self._board_scope(ctx, metric, scope)
+            rank = self.use_case.get_rank(guild_id, metric, ctx.author.id)
+        except (ValueError, RuntimeError) as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}", ephemeral=True)
+            return
+        msg = self.presenter.format_rank(ctx.author.display_name, label, metric, rank)
+        await self._send_message(ctx, msg, ephemeral=True)
+
+    @commands.command(name="shoe")
+    @_timed("shoe")
+    async def shoe(self, ctx: commands.Context):
+        """(Admin) Xem thành phần và Hi-Lo count của shoe trong kênh."""
+        if not ctx.author.guild_permissions.administrator:
+            await self._send_message(
+                ctx, "Chỉ admin mới có thể xem shoe.", ephemeral=True
+            )
+            return
+        try:
+            stats = await _resolve(self.use_case.get_shoe_stats(ctx.channel.id))
+        except (ValueError, RuntimeError) as e:
+            await self._send_message(ctx, f"{ctx.author.mention}, {e}", ephemeral=True)
+            return
+        suspects = self.use_case.get_bet_suspects()[:10]
+        embed = self.presenter.create_shoe_embed(stats, suspects)
+        await self._send_message(ctx, embed=embed, ephemeral=True)
+
+    @commands.command(name="profile")
+    async def profile(self, ctx: commands.Context, seconds: int = 30, mode=SAMPLE):
+        """(Admin) Profile bot trong một khoảng thời gian và ghi ra file."""
+        if self.profiler is None:
+            await self._send_message(
+                ctx, "Profiling chưa được bật (BLACKJACK_PROFILING).", ephemeral=True
+            )
+            return
+        if not ctx.author.guild_permissions.administrator:
+            await self._send_message(
+                ctx, "Chỉ admin mới có thể bật profiling.", ephemeral=True
+            )
+            return
+        try:
+            task = self.profiler.start(seconds, mode)
+        except (ValueError, RuntimeError) as e:
+            await self._send_message(ctx, f"Lỗi: {e}", ephemeral=True)
+            return
+        self.logger.info(
+            f"User {ctx.author.id} bật profiling ({mode}) trong {seconds}s."
+        )
+        await self._send_message(
+            ctx, f"🔬 Đang profiling ({mode}) trong {seconds} giây...", ephemeral=True
+        )
+        self._profile_report = asyncio.create_task(self._report_profile(ctx, task))
+
+    async def _report_profile(self, ctx: commands.Context, task: asyncio.Task):
+        try:
+            path = await task
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            self.logger.exception("Lỗi khi profiling")
+            await self._send_message(ctx, f"Lỗi khi profiling: {e}", ephemeral=True)
+            return
+        await self._send_message(
+            ctx, f"✅ Đã ghi kết quả profiling vào `{path}`.", ephemeral=True
+        )
 
     # --- SLASH COMMANDS ---
     @app_commands.command(
         name="blackjack", description="Bắt đầu một phòng chờ game Xì Dách."
     )
-    async def slash_blackjack(self, interaction: discord.Interaction):
+    @app_commands.describe(bet="Số chip cược (mặc định theo cấu hình)")
+    async def slash_blackjack(
+        self, interaction: discord.Interaction, bet: Optional[int] = None
+    ):
         ctx = await self.bot.get_context(interaction)
-        await self.blackjack(ctx)
+        await self.blackjack(ctx, bet)
 
     @app_commands.command(
         name="join", description="Tham gia vào một ván Xì Dách đang chờ."
     )
-    async def slash_join(self, interaction: discord.Interaction):
+    @app_commands.describe(bet="Số chip cược (mặc định theo cấu hình)")
+    async def slash_join(
+        self, interaction: discord.Interaction, bet: Optional[int] = None
+    ):
         ctx = await self.bot.get_context(interaction)
-        await self.join(ctx)
+        await self.join(ctx, bet)
 
     @app_commands.command(
         name="start", description="Bắt đầu ván chơi với những người đã tham gia."
@@ -379,14 +801,86 @@ class BlackjackCog(commands.Cog):
         ctx = await self.bot.get_context(interaction)
         await self.stand(ctx)
 
+    @app_commands.command(name="hint", description="Gợi ý nên rút hay dằn (ephemeral)")
+    async def slash_hint(self, interaction: discord.Interaction):
+        ctx = await self.bot.get_context(interaction)
+        await self.hint(ctx)
+
+    @app_commands.command(name="balance", description="Xem số chip của bạn (ephemeral)")
+    async def slash_balance(self, interaction: discord.Interaction):
+        ctx = await self.bot.get_context(interaction)
+        await self.balance(ctx)
+
+    @app_commands.command(
+        name="leaderboard", description="Xem bảng xếp hạng máy chủ hoặc toàn cục."
+    )
+    @app_commands.describe(
+        metric="Xếp theo số ván thắng hoặc chip", scope="Máy chủ này hoặc toàn cục"
+    )
+    @app_commands.choices(
+        metric=[app_commands.Choice(name=m, value=m) for m in METRICS],
+        scope=[app_commands.Choice(name=s, value=s) for s in SCOPES],
+    )
+    async def slash_leaderboard(
+        self,
+        interaction: discord.Interaction,
+        metric: Optional[str] = None,
+        scope: str = "server",
+    ):
+        ctx = await self.bot.get_context(interaction)
+        await self.leaderboard(ctx, metric, scope)
+
+    @app_commands.command(name="rank", description="Xem hạng của bạn (ephemeral)")
+    @app_commands.describe(
+        metric="Xếp theo số ván thắng hoặc chip", scope="Máy chủ này hoặc toàn cục"
+    )
+    @app_commands.choices(
+        metric=[app_commands.Choice(name=m, value=m) for m in METRICS],
+        scope=[app_commands.Choice(name=s, value=s) for s in SCOPES],
+    )
+    async def slash_rank(
+        self,
+        interaction: discord.Interaction,
+        metric: Optional[str] = None,
+        scope: str = "server",
+    ):
+        ctx = await self.bot.get_context(interaction)
+        await self.rank(ctx, metric, scope)
+
     @app_commands.command(name="end", description="Buộc kết thúc ván chơi hiện tại.")
     async def slash_end(self, interaction: discord.Interaction):
         ctx = await self.bot.get_context(interaction)
         await self.end_game_command(ctx)
 
+    @app_commands.command(
+        name="shoe", description="(Admin) Xem thành phần và Hi-Lo count của shoe."
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def slash_shoe(self, interaction: discord.Interaction):
+        ctx = await self.bot.get_context(interaction)
+        await self.shoe(ctx)
+
+    @app_commands.command(
+        name="profile", description="(Admin) Profile bot trong một khoảng thời gian."
+    )
+    @app_commands.describe(
+        seconds="Số giây profiling",
+        mode="sample: collapsed stack cho flamegraph, cprofile: file pstats",
+    )
+    @app_commands.choices(
+        mode=[app_commands.Choice(name=m, value=m) for m in PROFILE_MODES]
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def slash_profile(
+        self, interaction: discord.Interaction, seconds: int = 30, mode: str = SAMPLE
+    ):
+        ctx = await self.bot.get_context(interaction)
+        await self.profile(ctx, seconds, mode)
+
     @app_commands.command(
         name="myhand", description="Xem bài hiện tại của bạn (ephemeral)"
     )
+    @_timed("myhand")
     async def slash_myhand(self, interaction: discord.Interaction):
         """Trả về bài hiện tại của người gọi (ephemeral)."""
         ctx = await self.bot.get_context(interaction)
@@ -406,6 +900,7 @@ class BlackjackCog(commands.Cog):
             )
 
     @commands.command(name="help")
+    @_timed("help")
     async def help_command(self, ctx: commands.Context):
         """Hiển thị bảng hướng dẫn các lệnh."""
         embed = discord.Embed(
@@ -419,8 +914,8 @@ class BlackjackCog(commands.Cog):
             inline=False,
         )
         embed.add_field(
-            name="`/join`",
-            value="Tham gia vào phòng chờ đang mở trong kênh này.",
+            name="`/join [bet]`",
+            value="Tham gia vào phòng chờ đang mở trong kênh này (kèm số chip cược).",
             inline=False,
         )
         embed.add_field(
@@ -443,6 +938,27 @@ class BlackjackCog(commands.Cog):
             value="Xem bài hiện tại của bạn (chỉ mình bạn thấy).",
             inline=False,
         )
+        embed.add_field(
+            name="`/balance`",
+            value="Xem số chip của bạn (chỉ mình bạn thấy).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/leaderboard [metric] [scope]`",
+            value="Bảng xếp hạng theo ván thắng (wins) hoặc chip (chips), "
+            "của máy chủ (server) hoặc toàn cục (global).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/rank [metric] [scope]`",
+            value="Xem hạng của bạn (chỉ mình bạn thấy).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/hint`",
+            value="Gợi ý nên rút hay dằn kèm giá trị kỳ vọng (chỉ mình bạn thấy).",
+            inline=False,
+        )
         embed.add_field(
             name="`/end`",
             value="Buộc kết thúc ván chơi hiện tại. (Chỉ người tạo phòng hoặc admin)",
@@ -454,6 +970,7 @@ class BlackjackCog(commands.Cog):
         await self._send_message(ctx, embed=embed)
 
     @app_commands.command(name="help", description="Hiển thị bảng hướng dẫn các lệnh.")
+    @_timed("help")
     async def slash_help(self, interaction: discord.Interaction):
         embed = discord.Embed(
             title="♦️ Hướng dẫn chơi Xì Dách ♥️",
@@ -466,8 +983,8 @@ class BlackjackCog(commands.Cog):
             inline=False,
         )
         embed.add_field(
-            name="`/join`",
-            value="Tham gia vào phòng chờ đang mở trong kênh này.",
+            name="`/join [bet]`",
+            value="Tham gia vào phòng chờ đang mở trong kênh này (kèm số chip cược).",
             inline=False,
         )
         embed.add_field(
@@ -490,6 +1007,27 @@ class BlackjackCog(commands.Cog):
             value="Xem bài hiện tại của bạn (chỉ mình bạn thấy).",
             inline=False,
         )
+        embed.add_field(
+            name="`/balance`",
+            value="Xem số chip của bạn (chỉ mình bạn thấy).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/leaderboard [metric] [scope]`",
+            value="Bảng xếp hạng theo ván thắng (wins) hoặc chip (chips), "
+            "của máy chủ (server) hoặc toàn cục (global).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/rank [metric] [scope]`",
+            value="Xem hạng của bạn (chỉ mình bạn thấy).",
+            inline=False,
+        )
+        embed.add_field(
+            name="`/hint`",
+            value="Gợi ý nên rút hay dằn kèm giá trị kỳ vọng (chỉ mình bạn thấy).",
+            inline=False,
+        )
         embed.add_field(
             name="`/end`",
             value="Buộc kết thúc ván chơi hiện tại. (Chỉ người tạo phòng hoặc admin)",
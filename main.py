@@ -4,16 +4,59 @@
 # Thiết lập và chạy bot Discord.
 # ==============================================================================
 import os
+import asyncio
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 import logging
-from settings import LOG_LEVEL, COMMAND_PREFIX
+from settings import (
+    LOG_LEVEL,
+    COMMAND_PREFIX,
+    NUM_DECKS,
+    PENETRATION,
+    GAME_STORAGE,
+    SQLITE_PATH,
+    SQLITE_FLUSH_INTERVAL,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+    MEMORY_MAX_GAMES,
+    MEMORY_GAME_TTL,
+    MEMORY_SWEEP_INTERVAL,
+    COMMAND_SYNC_CACHE,
+    FORCE_COMMAND_SYNC,
+    EVENT_LOG_PATH,
+    LEDGER_ENABLED,
+    LEDGER_PATH,
+    STARTING_CHIPS,
+    DEFAULT_BET,
+    LEDGER_FLUSH_INTERVAL,
+    LEDGER_MAX_CACHED,
+    LEADERBOARD_ENABLED,
+    STATS_PATH,
+    STATS_FLUSH_INTERVAL,
+    BET_SPREAD_RATIO,
+    BET_SPREAD_MIN_BETS,
+    BET_SPREAD_MAX_USERS,
+    SHARD_WORKERS,
+    SHARD_DIR,
+)
 
 # Import các thành phần đã tạo
 from blackjack.use_cases import GameUseCase
+from blackjack.strategy import StrategyTable
+from blackjack.shoe import BetSpreadMonitor, ShoeManager
+from blackjack.ledger import ChipLedger
+from blackjack.leaderboard import Leaderboards
 from blackjack.adapters.memory_repository import MemoryGameRepository
+from blackjack.adapters.sqlite_repository import SqliteGameRepository
 from blackjack.adapters.discord_presenter import DiscordPresenter
+from blackjack.adapters.command_sync import sync_if_changed
+from blackjack.adapters.event_log import FileGameEventLog
+from blackjack.adapters.sqlite_ledger import SqliteLedgerStore
+from blackjack.adapters.sqlite_stats import SqliteStatsStore
+from blackjack.adapters.sharding import ShardedGameUseCase
+from blackjack.adapters.metrics import LoopLagMonitor, MetricsRegistry, MetricsServer
 from blackjack_cog import BlackjackCog
 
 # Thiết lập logging
@@ -29,9 +72,81 @@ logger = logging.getLogger("blackjack-bot")
 # Ví dụ, UseCase cần một Repository, và Cog cần UseCase và Presenter.
 def setup_dependencies() -> BlackjackCog:
     """Khởi tạo và kết nối các thành phần của ứng dụng."""
-    game_repository = MemoryGameRepository()
     game_presenter = DiscordPresenter()
-    game_use_case = GameUseCase(repo=game_repository)
+    # Bảng chiến thuật cho /hint được tính một lần khi khởi động, theo số bộ bài của shoe
+    strategy_table = StrategyTable.for_decks(NUM_DECKS)
+    # Sổ cái chip (tùy chọn): số dư trong bộ nhớ, thanh toán ghi xuống SQLite theo lô
+    ledger = (
+        ChipLedger(
+            SqliteLedgerStore(LEDGER_PATH),
+            starting_chips=STARTING_CHIPS,
+            default_bet=DEFAULT_BET,
+            flush_interval=LEDGER_FLUSH_INTERVAL,
+            max_cached=LEDGER_MAX_CACHED,
+        )
+        if LEDGER_ENABLED
+        else None
+    )
+    # Bảng xếp hạng (tùy chọn): nạp thành tích một lần, cập nhật dần sau mỗi ván
+    leaderboards = (
+        Leaderboards(SqliteStatsStore(STATS_PATH), flush_interval=STATS_FLUSH_INTERVAL)
+        if LEADERBOARD_ENABLED
+        else None
+    )
+    # Phía nhà cái: theo dõi mức cược theo true count để phát hiện đếm bài
+    bet_monitor = (
+        BetSpreadMonitor(
+            ratio=BET_SPREAD_RATIO,
+            min_bets=BET_SPREAD_MIN_BETS,
+            max_users=BET_SPREAD_MAX_USERS,
+        )
+        if ledger and BET_SPREAD_RATIO > 0
+        else None
+    )
+    if SHARD_WORKERS:
+        # Logic game chạy trong các process worker (khởi động trong main())
+        game_use_case = ShardedGameUseCase(
+            SHARD_WORKERS,
+            SHARD_DIR,
+            num_decks=NUM_DECKS,
+            penetration=PENETRATION,
+            flush_interval=SQLITE_FLUSH_INTERVAL,
+            event_log_path=EVENT_LOG_PATH,
+            strategy=strategy_table,
+            ledger=ledger,
+            leaderboards=leaderboards,
+            bet_monitor=bet_monitor,
+            max_games=MEMORY_MAX_GAMES,
+            game_ttl=MEMORY_GAME_TTL,
+        )
+    else:
+        if GAME_STORAGE == "sqlite":
+            game_repository = SqliteGameRepository(
+                SQLITE_PATH, flush_interval=SQLITE_FLUSH_INTERVAL
+            )
+        else:
+            game_repository = MemoryGameRepository(
+                max_games=MEMORY_MAX_GAMES, ttl=MEMORY_GAME_TTL
+            )
+        # Shoe nhiều bộ bài, shoe thay thế được xáo sẵn trong luồng nền; shoe của
+        # kênh lâu không chơi bị bỏ theo cùng giới hạn với game trong bộ nhớ
+        shoe_manager = ShoeManager(
+            num_decks=NUM_DECKS,
+            penetration=PENETRATION,
+            max_shoes=MEMORY_MAX_GAMES,
+            ttl=MEMORY_GAME_TTL,
+        )
+        # Nhật ký sự kiện nhị phân chỉ ghi nối tiếp (tùy chọn)
+        event_log = FileGameEventLog(EVENT_LOG_PATH) if EVENT_LOG_PATH else None
+        game_use_case = GameUseCase(
+            repo=game_repository,
+            strategy=strategy_table,
+            shoes=shoe_manager,
+            events=event_log,
+            ledger=ledger,
+            leaderboards=leaderboards,
+            bet_monitor=bet_monitor,
+        )
 
     # Intents là cần thiết để bot có thể đọc tin nhắn và thông tin người dùng
     intents = discord.Intents.default()
@@ -43,7 +158,15 @@ def setup_dependencies() -> BlackjackCog:
     bot = commands.Bot(
         command_prefix=COMMAND_PREFIX, intents=intents, help_command=None
     )
-    blackjack_cog = BlackjackCog(bot, use_case=game_use_case, presenter=game_presenter)
+    # Metrics Prometheus (tùy chọn)
+    metrics = MetricsRegistry() if METRICS_ENABLED else None
+    blackjack_cog = BlackjackCog(
+        bot, use_case=game_use_case, presenter=game_presenter, metrics=metrics
+    )
+    # Game bị loại khỏi bộ nhớ thì Cog dọn các bảng phụ (timeout, người tạo phòng...);
+    # khi chia worker, repo là bản sao trong bộ nhớ và cũng nhận game worker loại
+    if isinstance(game_use_case.repo, MemoryGameRepository):
+        game_use_case.repo.add_eviction_listener(blackjack_cog.on_game_evicted)
     return blackjack_cog
 
 
@@ -64,19 +187,81 @@ async def main():
     async def on_ready():
         logger.info(f"Bot đã đăng nhập với tên {blackjack_cog.bot.user}")
         logger.info("Bot đã sẵn sàng để nhận lệnh!")
-        await blackjack_cog.bot.tree.sync()
-        logger.info("Đã đồng bộ slash commands.")
         print("------")
 
+    # Chạy các worker và nạp lại game của chúng (nếu chia kênh cho nhiều process)
+    use_case = blackjack_cog.use_case
+    if SHARD_WORKERS:
+        await use_case.start()
+    # Giữ lại tiền cược của các ván đang chơi được nạp lại (nếu bật cược chip)
+    use_case.restore_wagers()
+    # Ghi trễ game xuống SQLite trong nền (nếu dùng SQLite)
+    repo = use_case.repo
+    flusher = None
+    if isinstance(repo, SqliteGameRepository):
+        flusher = asyncio.create_task(repo.run_flusher())
+    # Ghi các lần thanh toán chip theo lô trong nền (nếu bật cược chip)
+    ledger = use_case.ledger
+    ledger_flusher = asyncio.create_task(ledger.run_flusher()) if ledger else None
+    # Ghi thành tích cho bảng xếp hạng theo lô trong nền (nếu bật)
+    leaderboards = use_case.leaderboards
+    stats_flusher = (
+        asyncio.create_task(leaderboards.run_flusher()) if leaderboards else None
+    )
+    # Định kỳ dọn game bị bỏ quên khỏi bộ nhớ (nếu dùng bộ nhớ hoặc chia worker)
+    sweeper = None
+    if isinstance(repo, MemoryGameRepository) and repo.ttl:
+        sweeper = asyncio.create_task(repo.run_sweeper(MEMORY_SWEEP_INTERVAL))
+
+    # Server metrics và đo độ trễ event loop chạy ngay trên event loop của bot
+    metrics_server = None
+    lag_monitor = None
+    if blackjack_cog.metrics is not None:
+        lag = LoopLagMonitor(blackjack_cog.metrics)
+        lag_monitor = asyncio.create_task(lag.run())
+        metrics_server = MetricsServer(
+            blackjack_cog.metrics, host=METRICS_HOST, port=METRICS_PORT
+        )
+        await metrics_server.start()
+
     # Thêm Cog vào bot và chạy
     await blackjack_cog.bot.add_cog(blackjack_cog)
     logger.info("Đã thêm BlackjackCog vào bot.")
-    await blackjack_cog.bot.start(TOKEN)
+    bot = blackjack_cog.bot
+    try:
+        # Như bot.start() nhưng đồng bộ slash commands một lần giữa đăng nhập và
+        # kết nối gateway (không đồng bộ lại ở mỗi on_ready/kết nối lại), và chỉ
+        # khi định nghĩa lệnh khác lần đồng bộ trước
+        await bot.login(TOKEN)
+        await sync_if_changed(
+            bot.tree, bot.application_id, COMMAND_SYNC_CACHE, force=FORCE_COMMAND_SYNC
+        )
+        await bot.connect()
+    finally:
+        if sweeper:
+            sweeper.cancel()
+        if lag_monitor:
+            lag_monitor.cancel()
+        if metrics_server:
+            await metrics_server.close()
+        if flusher:
+            flusher.cancel()
+            repo.close()
+        if ledger_flusher:
+            ledger_flusher.cancel()
+            ledger.close()
+        if stats_flusher:
+            stats_flusher.cancel()
+            leaderboards.close()
+        if use_case.shoes:
+            use_case.shoes.close()
+        if use_case.events:
+            use_case.events.close()
+        if SHARD_WORKERS:
+            use_case.close()
 
 
 if __name__ == "__main__":
-    import asyncio
-
     try:
         logger.info("Starting bot...")
         asyncio.run(main())
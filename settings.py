@@ -14,3 +14,108 @@ COMMAND_PREFIX = os.getenv("BLACKJACK_COMMAND_PREFIX", "/")
 
 # Timeout cho lượt chơi của người chơi (giây)
 PLAYER_TURN_TIMEOUT = int(os.getenv("BLACKJACK_PLAYER_TURN_TIMEOUT", 60))
+
+# Số bộ bài trong một shoe
+NUM_DECKS = int(os.getenv("BLACKJACK_NUM_DECKS", 1))
+
+# Tỉ lệ shoe được chia trước lá cắt (0 < penetration <= 1); xáo lại giữa các ván
+PENETRATION = float(os.getenv("BLACKJACK_PENETRATION", 0.75))
+
+# Nơi lưu game: "memory" (mặc định) hoặc "sqlite"
+GAME_STORAGE = os.getenv("BLACKJACK_GAME_STORAGE", "memory")
+
+# Đường dẫn file SQLite và chu kỳ ghi theo lô (giây) khi dùng "sqlite"
+SQLITE_PATH = os.getenv("BLACKJACK_SQLITE_PATH", "blackjack.db")
+SQLITE_FLUSH_INTERVAL = float(os.getenv("BLACKJACK_SQLITE_FLUSH_INTERVAL", 1.0))
+
+# Chế độ bàn chơi sống: mỗi ván một tin nhắn được sửa tại chỗ thay vì gửi embed mới
+LIVE_TABLE = os.getenv("BLACKJACK_LIVE_TABLE", "false").lower() in ("1", "true", "yes")
+
+# Thời gian gom các lần sửa bàn chơi (giây); chỉ trạng thái mới nhất được gửi
+LIVE_TABLE_DEBOUNCE = float(os.getenv("BLACKJACK_LIVE_TABLE_DEBOUNCE", 0.5))
+
+# Giới hạn tốc độ gửi tin: toàn cục (lượt/giây) và theo kênh (lượt/giây, tối đa liền nhau)
+OUTBOUND_GLOBAL_RATE = float(os.getenv("BLACKJACK_OUTBOUND_GLOBAL_RATE", 45))
+OUTBOUND_CHANNEL_RATE = float(os.getenv("BLACKJACK_OUTBOUND_CHANNEL_RATE", 1.0))
+OUTBOUND_CHANNEL_BURST = int(os.getenv("BLACKJACK_OUTBOUND_CHANNEL_BURST", 5))
+
+# Bật server metrics Prometheus (GET /metrics) trên cổng đã EXPOSE của container
+METRICS_ENABLED = os.getenv("BLACKJACK_METRICS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+METRICS_HOST = os.getenv("BLACKJACK_METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("BLACKJACK_METRICS_PORT", 8080))
+
+# Cho phép admin bật profiling bằng /profile; thư mục ghi kết quả, chu kỳ lấy mẫu
+# (giây) và thời gian profiling tối đa (giây)
+PROFILING_ENABLED = os.getenv("BLACKJACK_PROFILING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+PROFILE_DIR = os.getenv("BLACKJACK_PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("BLACKJACK_PROFILE_INTERVAL", 0.005))
+PROFILE_MAX_SECONDS = float(os.getenv("BLACKJACK_PROFILE_MAX_SECONDS", 300))
+
+# Ghi log các lệnh chạy lâu hơn ngưỡng này (ms), kèm thời gian theo giai đoạn; 0 = tắt
+SLOW_COMMAND_MS = float(os.getenv("BLACKJACK_SLOW_COMMAND_MS", 0))
+
+# Giới hạn game lưu trong bộ nhớ (0 = không giới hạn), TTL tính từ lần hoạt động
+# cuối (giây, 0 = không hết hạn) và chu kỳ dọn game hết hạn (giây). Khi chia
+# worker, giới hạn áp dụng cho bản sao ở coordinator và TTL cho cả các worker.
+# Shoe giữ giữa các ván của mỗi kênh cũng bị giới hạn theo hai giá trị này.
+MEMORY_MAX_GAMES = int(os.getenv("BLACKJACK_MEMORY_MAX_GAMES", 10000))
+MEMORY_GAME_TTL = float(os.getenv("BLACKJACK_MEMORY_GAME_TTL", 3600))
+MEMORY_SWEEP_INTERVAL = float(os.getenv("BLACKJACK_MEMORY_SWEEP_INTERVAL", 60))
+
+# File lưu dấu vân tay slash commands đã đồng bộ; chỉ gọi tree.sync() khi lệnh đổi.
+# Đặt BLACKJACK_FORCE_COMMAND_SYNC=true để luôn đồng bộ khi khởi động.
+COMMAND_SYNC_CACHE = os.getenv("BLACKJACK_COMMAND_SYNC_CACHE", ".command_sync.json")
+FORCE_COMMAND_SYNC = os.getenv("BLACKJACK_FORCE_COMMAND_SYNC", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# File nhật ký sự kiện game (join/start/hit/stand/end) để kiểm toán và phát lại;
+# để trống để tắt
+EVENT_LOG_PATH = os.getenv("BLACKJACK_EVENT_LOG", "")
+
+# Cược chip: bật/tắt, file SQLite lưu số dư, số chip ban đầu của người chơi mới,
+# tiền cược mặc định khi /join không ghi số và chu kỳ ghi thanh toán theo lô (giây)
+LEDGER_ENABLED = os.getenv("BLACKJACK_LEDGER", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+LEDGER_PATH = os.getenv("BLACKJACK_LEDGER_PATH", "ledger.db")
+STARTING_CHIPS = int(os.getenv("BLACKJACK_STARTING_CHIPS", 1000))
+DEFAULT_BET = int(os.getenv("BLACKJACK_DEFAULT_BET", 10))
+LEDGER_FLUSH_INTERVAL = float(os.getenv("BLACKJACK_LEDGER_FLUSH_INTERVAL", 1.0))
+# Số người chơi tối đa giữ số dư trong bộ nhớ (0 = không giới hạn)
+LEDGER_MAX_CACHED = int(os.getenv("BLACKJACK_LEDGER_MAX_CACHED", 10000))
+
+# Bảng xếp hạng: bật/tắt, file SQLite lưu thành tích và chu kỳ ghi theo lô (giây)
+LEADERBOARD_ENABLED = os.getenv("BLACKJACK_LEADERBOARD", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+STATS_PATH = os.getenv("BLACKJACK_STATS_PATH", "stats.db")
+STATS_FLUSH_INTERVAL = float(os.getenv("BLACKJACK_STATS_FLUSH_INTERVAL", 5.0))
+
+# Phát hiện đếm bài (cần LEDGER): đánh dấu người có tiền cược trung bình khi true
+# count >= 2 gấp BET_SPREAD_RATIO lần khi true count <= 0, sau ít nhất
+# BET_SPREAD_MIN_BETS lần cược mỗi loại; 0 = tắt
+BET_SPREAD_RATIO = float(os.getenv("BLACKJACK_BET_SPREAD_RATIO", 4.0))
+BET_SPREAD_MIN_BETS = int(os.getenv("BLACKJACK_BET_SPREAD_MIN_BETS", 10))
+# Số người chơi tối đa được giữ lịch sử cược (bỏ người lâu không cược nhất trước)
+BET_SPREAD_MAX_USERS = int(os.getenv("BLACKJACK_BET_SPREAD_MAX_USERS", 10000))
+
+# Số process worker chạy logic game (chia kênh theo consistent hashing); 0 = chạy
+# tất cả trong process của bot. Mỗi worker lưu game vào SQLite riêng trong
+# SHARD_DIR (bỏ qua GAME_STORAGE), ghi theo lô mỗi SQLITE_FLUSH_INTERVAL giây
+SHARD_WORKERS = int(os.getenv("BLACKJACK_SHARD_WORKERS", 0))
+SHARD_DIR = os.getenv("BLACKJACK_SHARD_DIR", "shards")